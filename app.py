@@ -1,24 +1,45 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Response
+from fastapi.responses import PlainTextResponse
 from typing import Optional , Any
 from langchain_core.messages import HumanMessage
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import asyncio
+import json
+from sse_starlette.sse import EventSourceResponse
 from langgraph.types import Command
 from src.scripts.workflow import compiled_graph
 from src.utils.states import ChatResponse , ChatRequest
 from src.services.mcp_client import McpClient
-from src.controller.chat import Chat
+from src.controller.chat import Chat , thread_reaper , checkpoint_retention
+from src.controller.response import build_reply , shape_response , pending_job
+from src.services.jobs import jobs
+from src.services.thread_locks import thread_locks , ThreadBusyError
+from src.services.idempotency import idempotency_store , IdempotencyConflict
+import src.services.logger as logger
+import src.services.metrics as metrics
 from contextlib import asynccontextmanager
-from src.services.mcp_client import init_tool_service
+from src.services.mcp_client import init_tool_service , close_tool_service , get_mcpInstance
+from src.services.fast_path import fast_path
+from src.services.intent import intent_classifier
 import sys
 sys.stdout.reconfigure(encoding='utf-8')  # For Python 3.7+
+
+log = logger.get_logger("app")
     
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup logic
     await init_tool_service()
+    thread_reaper.start()
+    checkpoint_retention.start()
     yield
+    # Shutdown logic (uvicorn has already drained in-flight requests)
+    await thread_reaper.stop()
+    await checkpoint_retention.stop()
+    if hasattr(compiled_graph.checkpointer, "aflush"):
+        await compiled_graph.checkpointer.aflush()
+    await close_tool_service()
 
 
 # fast interafce
@@ -41,52 +62,139 @@ async def root():
     return {"message": "the api is working"}
 
 
-@app.post("/api/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    mcp_client = await get_mcpInstance()
+    health = mcp_client.health() if mcp_client else {"ready": False}
+    if not health["ready"]:
+        raise HTTPException(status_code=503, detail=health)
+    return health
+
+
+@app.get("/api/threads/stats")
+async def thread_stats():
+    return {**thread_reaper.stats(), "locks": thread_locks.stats(), "idempotency": idempotency_store.stats(),
+            "retention": checkpoint_retention.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/jobs/stats")
+async def job_stats():
+    return jobs.stats()
+
+
+@app.get("/api/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="unknown job")
+    return job.public()
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="unknown job")
+
+    async def events():
+        yield {"event": "status", "data": json.dumps(job.public(), default=str)}
+        await job.settled.wait()
+        yield {"event": "done", "data": json.dumps(job.public(), default=str)}
+
+    return EventSourceResponse(events())
+
+
+@app.get("/api/logging/stats")
+async def logging_stats():
+    return logger.stats()
+
+
+@app.get("/api/mcp/stats")
+async def mcp_stats():
+    mcp_client = await get_mcpInstance()
+    return mcp_client.stats() if mcp_client else {}
+
+
+@app.get("/api/fast-path/stats")
+async def fast_path_stats():
+    return fast_path.stats()
+
+
+@app.get("/api/classifier/stats")
+async def classifier_stats():
+    return intent_classifier.stats()
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    controller = Chat(
+        message=request.message,
+        checkpoint_id=request.checkpoint_id,
+    )
+
+    async def events():
+        try:
+            async with asyncio.timeout(120):
+                async for event in controller.stream():
+                    if event["event"] == "result":
+                        yield {"event": "done", "data": json.dumps({
+                            "content": build_reply(event["data"], request.checkpoint_id),
+                            "checkpoint_id": request.checkpoint_id,
+                            "status": "pending" if pending_job(event["data"]) else "complete",
+                        }, default=str)}
+                    else:
+                        yield {"event": event["event"], "data": json.dumps(event["data"], default=str)}
+        except TimeoutError:
+            yield {"event": "error", "data": json.dumps({"error": "Generation timed out"})}
+        except Exception as e:
+            log.exception("chat stream failed", checkpoint_id=request.checkpoint_id)
+            yield {"event": "error", "data": json.dumps({"error": "Generation failed", "type": e.__class__.__name__, "message": str(e)})}
+
+    return EventSourceResponse(events())
+
+
+@app.post("/api/chat", response_model=ChatResponse, response_model_exclude_none=True)
+async def chat(request: ChatRequest, response: Response, idempotency_key: Optional[str] = Header(None)):
     try:
         controller = Chat(
             message=request.message,
             checkpoint_id=request.checkpoint_id,
         )
+        key = request.idempotency_key or idempotency_key
+        if key:
+            # the store keeps what it is given for the TTL: the shaped reply,
+            # not the graph state (debug fields only when asked for explicitly)
+            async def run_shaped():
+                return shape_response(await controller.run(), request.checkpoint_id, request.debug is True)
+
+            # a retry after a timeout joins or replays the original run
+            fingerprint = idempotency_store.fingerprint(request.checkpoint_id, request.message)
+            shaped, replayed = await asyncio.wait_for(
+                idempotency_store.run(f"{request.checkpoint_id}:{key}", fingerprint, run_shaped), timeout=120
+            )
+            if replayed:
+                response.headers["Idempotent-Replayed"] = "true"
+            return ChatResponse(**shaped)
+
         content = await asyncio.wait_for(controller.run(), timeout=120)
-        
-        # Get messages list safely
-        messages = content.get("messages", [])
-        last_msg = messages[-1] if messages else None
-        
-        # Step 1: Check for interrupt
-        interrupt = content.get("__interrupt__", [])
-        if interrupt:
-            reply = interrupt[0].value
-
-        # Step 2: Fallback to last message content
-        else:
-            if messages and last_msg:
-                if hasattr(last_msg, "content"):
-                    reply = last_msg.content
-                elif isinstance(last_msg, dict):
-                    reply = last_msg.get("content", "No content found.")
-                else:
-                    reply = str(last_msg)
-            else:
-                reply = "No messages found."
-                
-        data = {"message": reply, "data": {}}
-        # Check if last_msg has 'client_events' attribute
-        if "client_events" in content:
-            data["data"] = {**data["data"], "client_events": content["client_events"]}
-            
-        print('prinitng data', data)
-        return ChatResponse(
-            content=data,
-            checkpoint_id=request.checkpoint_id,
-            status="complete",
-            state= content.get("data",{}),
-            full_data=content
-        )
+        return ChatResponse(**shape_response(content, request.checkpoint_id, request.debug))
 
     except asyncio.TimeoutError:
         raise HTTPException(status_code=504, detail="Generation timed out")
+    except ThreadBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         import traceback
         import sys
@@ -105,13 +213,7 @@ async def chat(request: ChatRequest):
         }
         
         # Log the full error for debugging
-        print(f"=== DETAILED ERROR INFORMATION ===")
-        print(f"Error Type: {error_details['error_type']}")
-        print(f"Error Message: {error_details['error_message']}")
-        print(f"Checkpoint ID: {error_details['checkpoint_id']}")
-        print(f"User Message: {error_details['message']}")
-        print(f"Full Traceback:\n{error_details['traceback']}")
-        print(f"=== END ERROR INFORMATION ===")
+        log.exception("chat failed", checkpoint_id=request.checkpoint_id, user_message=request.message)
         
         # Return detailed error to client
         raise HTTPException(
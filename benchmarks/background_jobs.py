@@ -0,0 +1,124 @@
+# benchmarks/background_jobs.py
+# Booking conversations through POST /api/chat with a slow `reservation` and
+# `payment2` on the fake MCP server, with background jobs off (the turn waits
+# for the backend) and on (the turn answers "pending" after job_inline_wait
+# and the client polls /api/jobs/{id} for the continuation). Reports how long
+# a turn holds the HTTP request (req_*) and how long until its outcome is
+# available (res_*, the request itself or the polled job), and checks each
+# final state like benchmarks.harness does.
+#
+#   python -m benchmarks.background_jobs --slow 3 --inline-wait 0.5 --conversations 40
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+
+import httpx
+
+import benchmarks.harness as harness
+import src.scripts.workflow as workflow
+import src.services.logger as logger
+import src.services.mcp_client as mcp_module
+import src.utils.constants as constants
+from benchmarks import fake_mcp_server
+from benchmarks.fake_mcp_server import FakeMcpServer, faults
+from src.services.jobs import jobs
+from src.services.mcp_client import McpClient
+from src.services.metrics import percentile
+
+
+async def turn(client: httpx.AsyncClient, thread_id: str, message: str, results: dict):
+    started = time.perf_counter()
+    response = await client.post("/api/chat", json={"message": message, "checkpoint_id": thread_id})
+    response.raise_for_status()
+    body = response.json()
+    results["request"].append(time.perf_counter() - started)
+    if body["status"] != "pending":
+        results["result"].append(results["request"][-1])
+        return
+    results["pending"] += 1
+    while True:
+        await asyncio.sleep(0.05)
+        job = (await client.get(body["job"]["poll"])).json()
+        if job["status"] != "pending":
+            break
+    results["result"].append(time.perf_counter() - started)
+    if job["status"] == "failed":
+        raise RuntimeError(job["error"])
+
+
+async def conversation(client: httpx.AsyncClient, scenario: str, results: dict):
+    turns, _, check = harness.SCENARIOS[scenario]
+    thread_id = f"{scenario}-{uuid.uuid4()}"
+    config = {"configurable": {"thread_id": thread_id}}
+    try:
+        for message in turns:
+            if message is None:
+                await workflow.compiled_graph.aupdate_state(config, {"current_step": constants.PAYMENT}, as_node=constants.CART)
+                continue
+            await turn(client, thread_id, message, results)
+        values = (await workflow.compiled_graph.aget_state(config)).values
+        results["ok" if check(values) else "wrong"] += 1
+    except Exception:
+        results["errors"] += 1
+
+
+async def workload(client: httpx.AsyncClient, scenarios: list, conversations: int, concurrency: int) -> dict:
+    results = {"request": [], "result": [], "pending": 0, "ok": 0, "wrong": 0, "errors": 0}
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with gate:
+            await conversation(client, scenarios[i % len(scenarios)], results)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(conversations)))
+    results["wall"] = time.perf_counter() - started
+    return results
+
+
+async def run(args):
+    logger.configure(level="CRITICAL")
+    logging.getLogger().setLevel(logging.CRITICAL)
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    workflow.llm = harness.ScriptedChatModel(latency=args.llm_latency, callbacks=workflow.llm.callbacks)
+    fake_mcp_server.tools["reservation"] = harness.standby_reservation
+    jobs.inline_wait = args.inline_wait
+
+    async with FakeMcpServer(args.port) as url:
+        mcp = McpClient(server_url=url)
+        await mcp.init()
+        mcp_module.mcp_client = mcp
+        from app import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            jobs.enabled = False
+            await workload(client, scenarios, len(scenarios), len(scenarios))  # warm up
+            faults["slow"] = {"reservation": args.slow, "payment2": args.slow}
+            print(f"slow reservation/payment2={args.slow}s inline_wait={args.inline_wait}s conversations={args.conversations} "
+                  f"concurrency={args.concurrency} scenarios={','.join(scenarios)}")
+            print(f"{'jobs':5s} {'pending':>7s} {'req_p50':>8s} {'req_p99':>8s} {'req_max':>8s} {'res_p50':>8s} {'res_p99':>8s} "
+                  f"{'conv/s':>7s} {'ok':>4s} {'wrong':>5s} {'errors':>6s}")
+            for enabled in (False, True):
+                jobs.enabled = enabled
+                r = await workload(client, scenarios, args.conversations, args.concurrency)
+                print(f"{'on' if enabled else 'off':5s} {r['pending']:7d} {percentile(r['request'], 0.5) * 1000:8.0f} "
+                      f"{percentile(r['request'], 0.99) * 1000:8.0f} {max(r['request']) * 1000:8.0f} "
+                      f"{percentile(r['result'], 0.5) * 1000:8.0f} {percentile(r['result'], 0.99) * 1000:8.0f} "
+                      f"{args.conversations / r['wall']:7.2f} {r['ok']:4d} {r['wrong']:5d} {r['errors']:6d}")
+            print(f"job store: {jobs.stats()}")
+        await mcp.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", default="single,payment")
+    parser.add_argument("--conversations", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--slow", type=float, default=3.0, help="seconds added to reservation and payment2")
+    parser.add_argument("--inline-wait", type=float, default=0.5)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8774)
+    asyncio.run(run(parser.parse_args()))
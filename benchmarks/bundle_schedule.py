@@ -0,0 +1,60 @@
+# benchmarks/bundle_schedule.py
+# Wall time of the ARRIVALBUNDLE schedule step against a delayed MCP
+# stand-in, compared with looking the two legs up one after the other.
+#
+#   python -m benchmarks.bundle_schedule --latency 0.5 --runs 5
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import src.services.mcp_client as mcp_module
+import src.utils.constants as constants
+from src.scripts.workflow import schedule
+from benchmarks.fakes import FakeMcpClient
+
+
+def bundle_state():
+    return {
+        "messages": [],
+        "current_step": constants.SCHEDULE,
+        "data": {
+            "product_type": constants.BUNDLE,
+            "schedule_info": {
+                "arrival": {"airportid": "SIA", "direction": "A", "traveldate": "20300608", "flightId": "AF2859"},
+                "departure": {"airportid": "SIA", "direction": "D", "traveldate": "20300615", "flightId": "AF2860"},
+                "pessanger_count": {"adult": 1, "children": 0},
+            },
+        },
+    }
+
+
+async def sequential(client: FakeMcpClient):
+    legs = bundle_state()["data"]["schedule_info"]
+    await client.invoke_tool("schedule", legs["arrival"])
+    await client.invoke_tool("schedule", legs["departure"])
+
+
+async def run(latency: float, runs: int):
+    client = FakeMcpClient(latency=latency)
+    mcp_module.mcp_client = client
+    config = {"metadata": {"thread_id": "bench"}}
+
+    for label, step in (
+        ("sequential", lambda: sequential(client)),
+        ("concurrent", lambda: schedule(bundle_state(), config)),
+    ):
+        start = time.perf_counter()
+        for _ in range(runs):
+            await step()
+        print(f"{label:10s} mcp_latency={latency:.3f}s per_booking={(time.perf_counter() - start) / runs:.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.latency, args.runs))
@@ -0,0 +1,121 @@
+# benchmarks/cart_formulator.py
+# cart_formulator on large carts, per-item memo (keyed on cartitemid plus a
+# content hash taken on every lookup) against formulating every item on
+# every call. Cart items are built like contact() builds them, single and bundle
+# mixed, and go through a checkpoint round trip before every call, as they
+# do between turns. Reported per cart size:
+#
+#   rebuild    every item formulated (the old path)
+#   cold       memo empty
+#   warm       show_cart re-prompt: same items, memo filled
+#   session    the cart grown one item at a time, the cart payload built
+#              after each add (contact) and once more (show_cart), total
+#
+# The memoized payloads are checked against a rebuild, also after an item
+# changed under the same cartitemid (as another worker may change it).
+#
+#   python -m benchmarks.cart_formulator --sizes 10,50,200 --repeat 5
+import argparse
+import time
+
+import benchmarks.harness as harness
+import src.utils.constants as constants
+import src.utils.helpers as helpers
+from benchmarks.fakes import fake_reservation, fake_schedule
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from src.utils.helpers import cart_formulator, formulate_item
+
+serde = JsonPlusSerializer()
+
+
+def cart_item(i: int) -> tuple[int, dict]:
+    bundle = i % 3 == 0
+    product = constants.BUNDLE if bundle else constants.ARRIVAL
+    reservation = fake_reservation({"adulttickets": 2, "productid": product})
+    if bundle:
+        schedule = {"arrival": fake_schedule(harness.ARRIVAL_INFO), "departure": fake_schedule(harness.DEPARTURE_INFO)}
+        schedule_info = {"arrival": harness.ARRIVAL_INFO, "departure": harness.DEPARTURE_INFO, "pessanger_count": harness.PASSENGERS}
+    else:
+        schedule = fake_schedule(harness.ARRIVAL_INFO)
+        schedule_info = {**harness.ARRIVAL_INFO, "pessanger_count": harness.PASSENGERS}
+    item = {
+        "summary": {"product": product, "Passengers": reservation["ticketsrequested"], "amount": reservation["retail"]},
+        "intermidiate": {
+            "contact_info": harness.CONTACT_INFO,
+            "contact": {},
+            "sessionId": f"cart-bench-{i}",
+            "reservation": reservation,
+            "product_type": product,
+            "schedule_info": schedule_info,
+            "schedule": schedule,
+        },
+    }
+    return reservation["data"]["cartitemid"], item
+
+
+def round_trip(cart: dict) -> dict:
+    return serde.loads_typed(serde.dumps_typed(cart))
+
+
+def rebuild(cart: dict) -> dict:
+    return {"cartData": [formulate_item(key, item) for key, item in cart.items()], "cartItemId": list(cart)[-1]}
+
+
+def best(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def session(items: list, formulate, fresh: bool = False) -> float:
+    if fresh:
+        helpers.formulated.clear()
+    cart, spent = {}, 0.0
+    for key, item in items:
+        cart = round_trip({**cart, key: item})
+        started = time.perf_counter()
+        formulate({key: item})  # contact(): add_to_cart with the new item
+        formulate(cart)         # show_cart: the whole cart
+        spent += time.perf_counter() - started
+    return spent
+
+
+def run(args):
+    print(f"cart payload build time in ms, best of {args.repeat}")
+    print(f"{'items':>5s} {'rebuild':>8s} {'cold':>8s} {'warm':>8s} {'warm_x':>7s} {'session_old':>11s} {'session_new':>11s} {'session_x':>9s}")
+    for size in (int(n) for n in args.sizes.split(",")):
+        items = [cart_item(i) for i in range(size)]
+        cart = round_trip(dict(items))
+        expected = rebuild(cart)
+
+        def cold():
+            helpers.formulated.clear()
+            return cart_formulator(cart)
+
+        if cold() != expected or cart_formulator(round_trip(cart)) != expected:
+            raise SystemExit(f"memoized cart payload differs from a rebuild at {size} items")
+        # an item changed under the same id, nothing forgotten
+        key = next(iter(cart))
+        item = round_trip(cart[key])
+        item["intermidiate"]["contact_info"]["contact"]["email"] = "changed@example.com"
+        changed = {**cart, key: item}
+        if cart_formulator(changed) != rebuild(changed):
+            raise SystemExit(f"memoized cart payload is stale after a change at {size} items")
+        t_rebuild = best(lambda: rebuild(cart), args.repeat)
+        t_cold = best(cold, args.repeat)
+        warm_cart = round_trip(cart)
+        t_warm = best(lambda: cart_formulator(warm_cart), args.repeat)
+        old = min(session(items, rebuild) for _ in range(args.repeat))
+        new = min(session(items, cart_formulator, fresh=True) for _ in range(args.repeat))
+        print(f"{size:5d} {t_rebuild * 1000:8.3f} {t_cold * 1000:8.3f} {t_warm * 1000:8.3f} {t_rebuild / t_warm:6.1f}x "
+              f"{old * 1000:11.2f} {new * 1000:11.2f} {old / new:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10,50,200")
+    parser.add_argument("--repeat", type=int, default=5)
+    run(parser.parse_args())
@@ -0,0 +1,133 @@
+# benchmarks/checkpoint_retention.py
+# One long conversation (default 120 turns, the benchmarks.message_growth
+# script) per checkpointer backend with checkpoint retention off and on.
+# With retention on, a CheckpointRetention task prunes in the background
+# like it does under app.py (every --interval seconds). Per block of turns:
+# checkpoints held by the thread, bytes held, turn time, and the time to
+# read the thread's state (aget_state) and its full history
+# (aget_state_history). The final state is checked against the run without
+# retention.
+#
+#   python -m benchmarks.checkpoint_retention --turns 120 --keep 10 --keep-interrupts 5
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import benchmarks.harness as harness
+import src.controller.chat as chat
+import src.scripts.workflow as workflow
+import src.services.logger as logger
+import src.services.mcp_client as mcp_module
+from benchmarks.fake_mcp_server import FakeMcpServer
+from benchmarks.message_growth import script
+from langgraph.checkpoint.memory import MemorySaver
+from src.services.checkpoint_retention import CheckpointRetention
+from src.services.checkpointer import SqliteCheckpointer, checkpoint_bytes
+from src.services.mcp_client import McpClient
+from src.services.serde import get_serde
+
+
+def saver_for(backend: str, tmp: str):
+    if backend == "sqlite":
+        return SqliteCheckpointer(path=os.path.join(tmp, f"{uuid.uuid4().hex}.sqlite"), serde=get_serde())
+    return MemorySaver(serde=get_serde())
+
+
+async def reads(config: dict, repeat: int) -> tuple[float, float, int]:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await chat.compiled_graph.aget_state(config)
+    state = (time.perf_counter() - started) / repeat
+    started = time.perf_counter()
+    history = [item async for item in chat.compiled_graph.aget_state_history(config)]
+    return state, time.perf_counter() - started, len(history)
+
+
+async def conversation(backend: str, retention: CheckpointRetention | None, args, tmp: str):
+    saver = saver_for(backend, tmp)
+    chat.compiled_graph = workflow.graph.compile(saver)
+    chat.checkpoint_retention = retention or CheckpointRetention(saver, keep=0)
+    if retention:
+        retention.checkpointer = saver
+        retention.start()
+    thread_id = f"retention-{uuid.uuid4()}"
+    config = {"configurable": {"thread_id": thread_id}}
+    rows = []
+    try:
+        for message in script(args.turns):
+            started = time.perf_counter()
+            await chat.Chat(message=message, checkpoint_id=thread_id).run()
+            turn = time.perf_counter() - started
+            # the background sweep gets its chance between turns
+            await asyncio.sleep(args.think)
+            state, history, checkpoints = await reads(config, args.reads)
+            rows.append({"turn": turn, "state": state, "history": history, "checkpoints": checkpoints,
+                         "bytes": await asyncio.to_thread(checkpoint_bytes, saver)})
+    finally:
+        if retention:
+            await retention.stop()
+    values = (await chat.compiled_graph.aget_state(config)).values
+    if hasattr(saver, "close"):
+        saver.close()
+    return rows, values
+
+
+def comparable(values: dict) -> dict:
+    # thread ids, message ids and cart item ids differ between runs
+    return {
+        "current_step": values.get("current_step"),
+        "messages": [(m.type, m.content) for m in values.get("messages") or []],
+        "cart": sorted(str(item.get("summary")) for item in harness.cart_items(values).values()),
+    }
+
+
+async def run(args):
+    logger.configure(level="CRITICAL")
+    logging.getLogger().setLevel(logging.CRITICAL)
+    workflow.llm = harness.ScriptedChatModel(callbacks=workflow.llm.callbacks)
+    tmp = tempfile.mkdtemp(prefix="obi-retention-")
+    print(f"{args.turns} turns, keep={args.keep} keep_interrupts={args.keep_interrupts}, background sweep every {args.interval}s")
+    print(f"{'backend':8s} {'retention':9s} {'turns':>7s} {'ckpts':>6s} {'kbytes':>8s} {'turn_ms':>8s} {'state_ms':>8s} {'history_ms':>10s}")
+
+    async with FakeMcpServer(args.port) as url:
+        client = McpClient(server_url=url)
+        await client.init()
+        mcp_module.mcp_client = client
+        for backend in args.backends.split(","):
+            baseline = None
+            for enabled in (False, True):
+                retention = CheckpointRetention(None, args.keep, args.keep_interrupts, args.interval) if enabled else None
+                rows, values = await conversation(backend, retention, args, tmp)
+                for start in range(0, len(rows), args.block):
+                    block = rows[start:start + args.block]
+                    avg = lambda key: sum(row[key] for row in block) / len(block)
+                    print(f"{backend:8s} {'on' if enabled else 'off':9s} {start + 1:3d}-{start + len(block):<3d} "
+                          f"{block[-1]['checkpoints']:6d} {block[-1]['bytes'] / 1024:8.1f} {avg('turn') * 1000:8.2f} "
+                          f"{avg('state') * 1000:8.3f} {avg('history') * 1000:10.2f}")
+                if baseline is None:
+                    baseline = comparable(values)
+                else:
+                    same = comparable(values) == baseline
+                    print(f"{backend:8s} final state {'matches' if same else 'DIFFERS from'} the run without retention, "
+                          f"pruned {retention.pruned}")
+        await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", default="memory,sqlite")
+    parser.add_argument("--turns", type=int, default=120)
+    parser.add_argument("--block", type=int, default=20)
+    parser.add_argument("--keep", type=int, default=10)
+    parser.add_argument("--keep-interrupts", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=0.05)
+    parser.add_argument("--think", type=float, default=0.06, help="pause after each turn, as a user would")
+    parser.add_argument("--reads", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8777)
+    asyncio.run(run(parser.parse_args()))
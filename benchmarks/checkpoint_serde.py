@@ -0,0 +1,149 @@
+# benchmarks/checkpoint_serde.py
+# Checkpoint size and encode / decode time per serializer. Booking
+# conversations from benchmarks.harness are recorded once on an in-memory
+# checkpointer, then every checkpoint and pending write is replayed into a
+# fresh checkpointer per configuration:
+#
+#   default         LangGraph's JsonPlusSerializer (msgpack)
+#   compact-zlib    CompactSerializer, zlib
+#   compact-zstd    CompactSerializer, zstd (needs zstandard)
+#   *+share         the same on SQLite with structural sharing
+#
+# Reported: stored bytes per checkpoint (blobs, writes and shared objects
+# included), put + put_writes time per checkpoint, and get_tuple time per
+# checkpoint with the shared-object cache cleared first.
+#
+#   python -m benchmarks.checkpoint_serde --conversations 40 --scenarios multi_cart,bundle,payment
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import benchmarks.harness as harness
+import src.controller.chat as chat
+import src.scripts.workflow as workflow
+import src.services.logger as logger
+import src.services.mcp_client as mcp_module
+from benchmarks.fake_mcp_server import FakeMcpServer
+from langgraph.checkpoint.memory import MemorySaver
+from src.services.checkpointer import SqliteCheckpointer, checkpoint_bytes
+from src.services.mcp_client import McpClient
+from src.services.serde import CompactSerializer, zstandard
+
+
+async def record(scenarios: list, conversations: int, port: int) -> MemorySaver:
+    logger.configure(level="CRITICAL")
+    logging.getLogger().setLevel(logging.CRITICAL)
+    workflow.llm = harness.ScriptedChatModel(callbacks=workflow.llm.callbacks)
+    recorder = MemorySaver()
+    workflow.compiled_graph = chat.compiled_graph = workflow.graph.compile(recorder)
+    async with FakeMcpServer(port) as url:
+        client = McpClient(server_url=url)
+        await client.init()
+        mcp_module.mcp_client = client
+        results = await harness.workload(harness.Driver("chat"), scenarios, conversations, conversations)
+        await client.close()
+    wrong = sum(results["wrong"].values()) + sum(results["errors"].values())
+    if wrong:
+        raise SystemExit(f"{wrong} recorded conversations did not finish as scripted")
+    return recorder
+
+
+def replay_plan(recorder: MemorySaver) -> list:
+    """(config, checkpoint, metadata, new_versions, writes by task) in write order, per thread."""
+    threads = defaultdict(list)
+    for item in recorder.list(None):
+        threads[item.config["configurable"]["thread_id"]].append(item)
+    plan = []
+    for items in threads.values():
+        previous: dict = {}
+        for item in reversed(items):
+            versions = item.checkpoint["channel_versions"]
+            new_versions = {channel: v for channel, v in versions.items() if previous.get(channel) != v}
+            previous = versions
+            parent = item.parent_config["configurable"]["checkpoint_id"] if item.parent_config else None
+            config = {"configurable": {**item.config["configurable"], "checkpoint_id": parent}}
+            writes = defaultdict(list)
+            for task_id, channel, value in item.pending_writes or []:
+                writes[task_id].append((channel, value))
+            plan.append((config, item.checkpoint, item.metadata, new_versions, writes))
+    return plan
+
+
+def measure(name: str, saver, plan: list) -> dict:
+    started = time.perf_counter()
+    for config, checkpoint, metadata, new_versions, writes in plan:
+        next_config = saver.put(config, checkpoint, metadata, new_versions)
+        for task_id, task_writes in writes.items():
+            saver.put_writes(next_config, task_writes, task_id)
+    if hasattr(saver, "flush"):
+        saver.flush()
+    encode = time.perf_counter() - started
+
+    if hasattr(saver, "shared_cache"):
+        saver.shared_cache.clear()
+    reads = [{"configurable": {**config["configurable"], "checkpoint_id": checkpoint["id"]}} for config, checkpoint, *_ in plan]
+    started = time.perf_counter()
+    for config in reads:
+        saver.get_tuple(config)
+    decode = time.perf_counter() - started
+    return {"name": name, "bytes": checkpoint_bytes(saver), "encode": encode, "decode": decode}
+
+
+def configurations(tmp: str) -> list:
+    codecs = ["zlib"] + (["zstd"] if zstandard else [])
+    sqlite = lambda name, **kwargs: SqliteCheckpointer(path=os.path.join(tmp, f"{name}.sqlite"), batch_size=512, **kwargs)
+    configs = [("memory default", lambda: MemorySaver())]
+    configs += [(f"memory compact-{codec}", lambda codec=codec: MemorySaver(serde=CompactSerializer(codec))) for codec in codecs]
+    configs += [("sqlite default", lambda: sqlite("default", share_min_bytes=0))]
+    for codec in codecs:
+        configs += [
+            (f"sqlite compact-{codec}", lambda codec=codec: sqlite(codec, serde=CompactSerializer(codec), share_min_bytes=0)),
+            (f"sqlite compact-{codec}+share", lambda codec=codec: sqlite(f"{codec}-share", serde=CompactSerializer(codec))),
+        ]
+    configs += [("sqlite default+share", lambda: sqlite("default-share"))]
+    return configs
+
+
+def run(args):
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    recorder = asyncio.run(record(scenarios, args.conversations, args.port))
+    plan = replay_plan(recorder)
+    checkpoints = len(plan)
+    writes = sum(len(w) for *_, task_writes in plan for w in task_writes.values())
+    print(f"{args.conversations} conversations ({','.join(scenarios)}): {checkpoints} checkpoints, {writes} pending writes, "
+          f"best of {args.repeat} replays")
+    print(f"{'serializer':28s} {'bytes/ckpt':>10s} {'vs default':>10s} {'encode_us':>10s} {'decode_us':>10s}")
+    tmp = tempfile.mkdtemp(prefix="obi-serde-")
+    baseline = {}
+    for name, factory in configurations(tmp):
+        runs = []
+        for _ in range(args.repeat):
+            saver = factory()
+            runs.append(measure(name, saver, plan))
+            if hasattr(saver, "close"):
+                saver.close()
+                for suffix in ("", "-wal", "-shm"):
+                    path = saver.path + suffix
+                    if os.path.exists(path):
+                        os.remove(path)
+        size = runs[0]["bytes"]
+        backend = name.split()[0]
+        baseline.setdefault(backend, size)
+        encode = min(r["encode"] for r in runs) / checkpoints * 1e6
+        decode = min(r["decode"] for r in runs) / checkpoints * 1e6
+        print(f"{name:28s} {size / checkpoints:10.0f} {size / baseline[backend]:9.0%} {encode:10.1f} {decode:10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", default="multi_cart,bundle,payment")
+    parser.add_argument("--conversations", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8776)
+    run(parser.parse_args())
@@ -0,0 +1,75 @@
+# benchmarks/checkpointer_latency.py
+# Checkpoint write/read latency per backend with 10k and 100k live threads.
+#
+#   python -m benchmarks.checkpointer_latency --threads 10000 100000 --backend memory sqlite
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.base.id import uuid6
+
+from src.services.checkpointer import SqliteCheckpointer, get_checkpointer
+from src.services.metrics import percentile
+
+
+def make_checkpoint(saver, turn: int):
+    checkpoint = empty_checkpoint()
+    checkpoint["id"] = str(uuid6(clock_seq=turn))
+    checkpoint["channel_values"] = {
+        "messages": [HumanMessage(content="I want an arrival lounge at SIA"), AIMessage(content="Perfect! Which flight?")] * turn,
+        "current_step": "schedule_info",
+        "data": {"sessionId": "bench", "product_type": "ARRIVALONLY", "schedule_info": {"airportid": "SIA", "direction": "A"}},
+    }
+    version = saver.get_next_version(None, None)
+    checkpoint["channel_versions"] = {channel: version for channel in checkpoint["channel_values"]}
+    return checkpoint, dict(checkpoint["channel_versions"])
+
+
+async def run(backend: str, threads: int, reads: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench.sqlite")
+    saver = SqliteCheckpointer(path=path) if backend == "sqlite" else get_checkpointer(backend)
+
+    writes = []
+    start = time.perf_counter()
+    for i in range(threads):
+        checkpoint, versions = make_checkpoint(saver, turn=1 + i % 4)
+        config = {"configurable": {"thread_id": f"thread-{i}", "checkpoint_ns": ""}}
+        t0 = time.perf_counter()
+        await saver.aput(config, checkpoint, {"source": "loop", "step": 1}, versions)
+        writes.append(time.perf_counter() - t0)
+    if hasattr(saver, "aflush"):
+        await saver.aflush()
+    write_total = time.perf_counter() - start
+
+    read_latency = []
+    for i in random.sample(range(threads), min(reads, threads)):
+        t0 = time.perf_counter()
+        assert await saver.aget_tuple({"configurable": {"thread_id": f"thread-{i}"}}) is not None
+        read_latency.append(time.perf_counter() - t0)
+
+    print(
+        f"{backend:7s} threads={threads:>7,d} "
+        f"write p50={percentile(writes, .5) * 1e6:7.1f}us p99={percentile(writes, .99) * 1e6:7.1f}us "
+        f"throughput={threads / write_total:9,.0f}/s | "
+        f"read p50={percentile(read_latency, .5) * 1e6:7.1f}us p99={percentile(read_latency, .99) * 1e6:7.1f}us "
+        f"mean={statistics.mean(read_latency) * 1e6:7.1f}us"
+    )
+    if hasattr(saver, "close"):
+        saver.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--backend", nargs="+", default=["memory", "sqlite"])
+    parser.add_argument("--reads", type=int, default=2_000)
+    args = parser.parse_args()
+    for threads in args.threads:
+        for backend in args.backend:
+            asyncio.run(run(backend, threads, args.reads))
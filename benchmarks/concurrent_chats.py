@@ -0,0 +1,36 @@
+# benchmarks/concurrent_chats.py
+# Runs N concurrent chats against a slow LLM stand-in. With non-blocking
+# nodes the wall time should stay close to a single LLM latency.
+#
+#   python -m benchmarks.concurrent_chats --chats 20 --latency 0.5
+import argparse
+import asyncio
+import os
+import time
+import uuid
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import src.scripts.workflow as workflow
+from src.controller.chat import Chat
+from benchmarks.fakes import FakeChatModel
+
+
+async def run(chats: int, latency: float):
+    workflow.llm = FakeChatModel(latency=latency)
+    controllers = [Chat(message="hi", checkpoint_id=str(uuid.uuid4())) for _ in range(chats)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(controller.run() for controller in controllers))
+    elapsed = time.perf_counter() - start
+
+    print(f"chats={chats} llm_latency={latency:.3f}s wall={elapsed:.3f}s "
+          f"ratio={elapsed / latency:.2f}x (serial would be {chats}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chats", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(run(args.chats, args.latency))
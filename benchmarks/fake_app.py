@@ -0,0 +1,13 @@
+# benchmarks/fake_app.py
+# app:app with the scripted LLM from benchmarks.harness, for benchmarks that
+# run the API in its own processes (`uvicorn benchmarks.fake_app:app`). Tool
+# calls go to whatever `mcp_server` points at, e.g. benchmarks.fake_mcp_server.
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import src.scripts.workflow as workflow
+from app import app
+from benchmarks.harness import ScriptedChatModel
+
+workflow.llm = ScriptedChatModel(latency=float(os.getenv("fake_llm_latency", "0")), callbacks=workflow.llm.callbacks)
@@ -0,0 +1,98 @@
+# benchmarks/fake_mcp_server.py
+# Local MCP server over SSE exposing the OBI tool names with fake data.
+# Latency and failures can be injected at runtime through `faults`, and a
+# tool's answer replaced through `tools`.
+#
+#   python -m benchmarks.fake_mcp_server --port 8765 --latency 0.2 --failure-rate 0.1
+import argparse
+import asyncio
+import json
+import random
+
+import uvicorn
+from mcp.server.fastmcp import FastMCP
+
+from benchmarks.fakes import default_tools
+
+faults = {
+    "latency": 0.0,       # seconds added to every call
+    "failure_rate": 0.0,  # fraction of calls that raise a tool error
+    "hang": 0.0,          # fraction of calls that never answer
+    "slow": {},           # tool -> extra seconds for that tool only
+}
+
+tools = dict(default_tools)
+
+server = FastMCP("obi_mcp_fake")
+
+
+async def answer(tool: str, payload: dict) -> str:
+    await asyncio.sleep(faults["latency"] + faults["slow"].get(tool, 0.0))
+    if random.random() < faults["hang"]:
+        await asyncio.Event().wait()
+    if random.random() < faults["failure_rate"]:
+        raise RuntimeError(f"injected {tool} failure")
+    return json.dumps(tools[tool](payload))
+
+
+@server.tool()
+async def schedule(airportid: str, direction: str, traveldate: str, flightId: str, sessionid: str) -> str:
+    return await answer("schedule", {"airportid": airportid, "direction": direction, "traveldate": traveldate, "flightId": flightId})
+
+
+@server.tool()
+async def reservation(adulttickets: int, childtickets: int, scheduleData: dict, productid: str, sessionid: str) -> str:
+    return await answer("reservation", {"adulttickets": adulttickets, "childtickets": childtickets, "scheduleData": scheduleData, "productid": productid, "sessionid": sessionid})
+
+
+@server.tool()
+async def contact(cartitemid: int, email: str, firstname: str, lastname: str, phone: str, title: str, sessionid: str) -> str:
+    return await answer("contact", {"cartitemid": cartitemid})
+
+
+@server.tool()
+async def payment2(state: dict) -> str:
+    return await answer("payment2", state)
+
+
+class FakeMcpServer:
+    """Runs the fake server on the current event loop: `async with FakeMcpServer(port) as url:`"""
+
+    def __init__(self, port: int = 8765):
+        self.port = port
+        self.server: uvicorn.Server | None = None
+        self.task: asyncio.Task | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/sse"
+
+    async def start(self):
+        config = uvicorn.Config(server.sse_app(), host="127.0.0.1", port=self.port, log_level="warning", lifespan="off")
+        self.server = uvicorn.Server(config)
+        self.task = asyncio.get_running_loop().create_task(self.server.serve())
+        while not self.server.started:
+            await asyncio.sleep(0.01)
+        return self.url
+
+    async def stop(self):
+        self.server.should_exit = True
+        self.server.force_exit = True
+        await self.task
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    faults.update(latency=args.latency, failure_rate=args.failure_rate)
+    server.settings.port = args.port
+    server.run(transport="sse")
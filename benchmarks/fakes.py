@@ -0,0 +1,148 @@
+# benchmarks/fakes.py
+# Offline stand-ins used by the benchmark scripts so the graph can run
+# without OpenAI.
+import asyncio
+import itertools
+import json
+import time
+from typing import Any, AsyncIterator, Iterator
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.services.mcp_results import parse_result
+
+# default structured responses keyed by the schema title
+default_responses = {
+    "Classify_Schema": {"direction": "end", "message": "Hello! How can I assist you today?"},
+    "product_type_schema": {"product_type": "ARRIVALONLY", "message": "Perfect!", "human_input": False},
+    "failure_schema": {"message": "Something went wrong.", "human_input": False, "end": True, "isStandby": False},
+    "cart_summary_schema": {"message": "Here is your cart.", "direction": "end", "human_input": False},
+    "without_human_input": {"message": "Customer is booking a lounge."},
+}
+
+
+class FakeChatModel(BaseChatModel):
+    """Drop-in for ChatOpenAI's with_structured_output().
+
+    Answers with the JSON response registered for the schema title, after
+    `latency` seconds, streamed in `chunk_size` character tokens. Token
+    usage is reported as characters / 4.
+    """
+
+    latency: float = 0.0
+    responses: dict = {}
+    chunk_size: int = 8
+    calls: int = 0
+
+    def __init__(self, latency: float = 0.0, responses: dict | None = None, **kwargs):
+        super().__init__(latency=latency, responses={**default_responses, **(responses or {})}, **kwargs)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-structured"
+
+    def with_structured_output(self, schema, *args, **kwargs):
+        title = schema.get("title", "") if isinstance(schema, dict) else ""
+        return self.bind(schema_title=title) | JsonOutputParser()
+
+    def _respond(self, messages, schema_title: str = "", run_manager=None, **kwargs) -> str:
+        self.calls += 1
+        response = self.responses.get(schema_title, {})
+        return json.dumps(response(messages) if callable(response) else response)
+
+    @staticmethod
+    def _usage(messages, text: str) -> dict:
+        prompt = sum(len(str(m.content)) for m in messages) // 4
+        return {"input_tokens": prompt, "output_tokens": len(text) // 4, "total_tokens": prompt + len(text) // 4}
+
+    def _message(self, messages, **kwargs) -> AIMessage:
+        text = self._respond(messages, **kwargs)
+        return AIMessage(content=text, usage_metadata=self._usage(messages, text))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, run_manager=run_manager, **kwargs))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, run_manager=run_manager, **kwargs))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency)
+        text = self._respond(messages, run_manager=run_manager, **kwargs)
+        for i in range(0, len(text), self.chunk_size):
+            last = i + self.chunk_size >= len(text)
+            usage = self._usage(messages, text) if last else None
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=text[i:i + self.chunk_size], usage_metadata=usage))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency)
+        text = self._respond(messages, run_manager=run_manager, **kwargs)
+        for i in range(0, len(text), self.chunk_size):
+            last = i + self.chunk_size >= len(text)
+            usage = self._usage(messages, text) if last else None
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=text[i:i + self.chunk_size], usage_metadata=usage))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+def fake_schedule(payload: dict) -> dict:
+    direction = payload.get("direction", "A")
+    return {
+        "scheduleId": 1000 + (1 if direction == "A" else 2),
+        "airportId": payload.get("airportid") or "SIA",
+        "direction": direction,
+        "flightId": payload.get("flightId") or "AF2859",
+        "airline": "Air France",
+        "flightNumber": "2859",
+        "targetDate": "2030-06-08T10:30:00 10:30 AM",
+    }
+
+
+cart_item_ids = itertools.count(5001)
+
+
+def fake_reservation(payload: dict) -> dict:
+    cartitemid = next(cart_item_ids)
+    return {
+        "isStandBy": False,
+        "cartitemid": cartitemid,
+        "ticketsrequested": payload.get("adulttickets", 1) + payload.get("childtickets", 0),
+        "retail": 60.0,
+        "productid": payload.get("productid"),
+        "arrivalscheduleid": payload.get("scheduleData", {}).get("A", {}).get("scheduleId", 0),
+        "departurescheduleid": payload.get("scheduleData", {}).get("D", {}).get("scheduleId", 0),
+        "data": {"cartitemid": cartitemid},
+    }
+
+
+default_tools = {
+    "schedule": fake_schedule,
+    "reservation": fake_reservation,
+    "contact": lambda payload: {"status": 0, "statusMessage": "Success"},
+    "payment2": lambda payload: {"status": 0, "statusMessage": "Success"},
+}
+
+
+class FakeMcpClient:
+    """Stands in for McpClient; tools answer JSON after `latency` seconds, parsed like McpClient does."""
+
+    def __init__(self, latency: float = 0.0, tools: dict | None = None):
+        self.latency = latency
+        self.tools = {**default_tools, **(tools or {})}
+        self.calls: list[tuple[str, dict]] = []
+
+    async def invoke_tool(self, name: str, input_data: dict):
+        self.calls.append((name, input_data))
+        await asyncio.sleep(self.latency)
+        return parse_result(name, json.dumps(self.tools[name](input_data)))
+
+    def invalidate_cache(self, name: str | None = None, input_data: dict | None = None):
+        pass
@@ -0,0 +1,60 @@
+# benchmarks/fast_path_accuracy.py
+# Scores the info_collector fast path against the labeled corpus in
+# fast_path_corpus.jsonl. A case labeled null must fall back to the LLM;
+# any other label must be matched exactly when the fast path fires.
+#
+#   python -m benchmarks.fast_path_accuracy --llm-latency 1.5
+import argparse
+import json
+import time
+from datetime import date
+from pathlib import Path
+
+from langchain_core.messages import HumanMessage
+
+from src.services.fast_path import FastPathExtractor
+
+corpus_path = Path(__file__).with_name("fast_path_corpus.jsonl")
+# fixed so the corpus dates stay in the future
+today = date(2030, 1, 1)
+
+
+def run(llm_latency: float, verbose: bool):
+    cases = [json.loads(line) for line in corpus_path.read_text().splitlines() if line.strip()]
+    extractor = FastPathExtractor(enabled=True)
+    results = {}
+    for case in cases:
+        state = {
+            "messages": [HumanMessage(content=text) for text in case["messages"]],
+            "data": {"product_type": case.get("product_type")},
+        }
+        started = time.perf_counter()
+        response = extractor.extract(case["step"], state, today=today)
+        elapsed = time.perf_counter() - started
+        got = response[case["step"]] if response else None
+
+        result = results.setdefault(case["step"], {"cases": 0, "labeled": 0, "hits": 0, "correct": 0, "wrong": 0, "seconds": 0.0})
+        result["cases"] += 1
+        result["labeled"] += case["expected"] is not None
+        result["seconds"] += elapsed
+        if got is not None:
+            result["hits"] += 1
+            result["correct" if got == case["expected"] else "wrong"] += 1
+        if verbose and got != case["expected"]:
+            print(f"  {case['step']}: {case['messages']} -> {got} (expected {case['expected']})")
+
+    for step, result in results.items():
+        hits = result["hits"]
+        print(f"{step:14s} cases={result['cases']:3d} hit_rate={hits / result['cases']:.0%} "
+              f"recall={result['correct'] / max(result['labeled'], 1):.0%} "
+              f"precision={result['correct'] / max(hits, 1):.0%} wrong={result['wrong']} "
+              f"extract={result['seconds'] / result['cases'] * 1e6:.0f}us "
+              f"saved~{hits * llm_latency:.1f}s at {llm_latency}s/LLM call")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm-latency", type=float, default=1.5)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    run(args.llm_latency, args.verbose)
@@ -0,0 +1,307 @@
+# benchmarks/harness.py
+# End-to-end booking conversations without OpenAI or the OBI backend: a
+# scripted stand-in for the structured LLM, and the fake MCP server over SSE
+# behind the real McpClient (pool, breaker, caches). Each conversation
+# replays its user turns through Chat.run or POST /api/chat, and its final
+# graph state is checked against what the scenario should have produced.
+#
+#   single      arrival lounge, contact details, done
+#   bundle      arrival + departure bundle
+#   standby     reservation comes back standby -> redirect_to_standby
+#   multi_cart  two cart items, the second added from the cart prompt
+#   payment     single item, checkout, payment2
+#
+#   python -m benchmarks.harness --conversations 200 --concurrency 20
+#   python -m benchmarks.harness --via api --scenarios bundle,payment --llm-latency 0.3 --mcp-latency 0.05 --mcp-failure-rate 0.02
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import time
+import tracemalloc
+import uuid
+from collections import defaultdict
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import src.scripts.workflow as workflow
+import src.services.logger as logger
+import src.services.mcp_client as mcp_module
+import src.utils.constants as constants
+from benchmarks import fake_mcp_server
+from benchmarks.fake_mcp_server import FakeMcpServer, faults
+from benchmarks.fakes import FakeChatModel, default_responses, fake_reservation
+from src.controller.chat import Chat
+from src.services.history import is_human
+from src.services.mcp_client import McpClient
+from src.services.metrics import percentile
+
+PASSENGERS = {"adult": 2, "children": 0}
+ARRIVAL_INFO = {"airportid": "SIA", "direction": "A", "traveldate": "20300608", "flightId": "AF2859"}
+DEPARTURE_INFO = {"airportid": "SIA", "direction": "D", "traveldate": "20300615", "flightId": "BA123"}
+CONTACT_INFO = {
+    "contact": {"title": "MR", "firstName": "Jane", "lastName": "Doe", "email": "jane@example.com", "phone": "8765550100"},
+    "passengerDetails": {"adults": [
+        {"title": "MR", "firstName": "Jane", "lastName": "Doe", "email": "jane@example.com", "dob": ""},
+        {"title": "MR", "firstName": "John", "lastName": "Doe", "email": "john@example.com", "dob": ""},
+    ], "children": []},
+}
+
+ARRIVAL = "Book the arrival lounge: AF2859 into SIA on 8 June 2030, 2 adults"
+BUNDLE = "Book arrival and departure lounges: AF2859 into SIA on 8 June 2030, leaving on BA123 from SIA on 15 June 2030, 2 adults"
+ADD_DEPARTURE = "Also add a departure lounge: BA123 from SIA on 15 June 2030, 2 adults"
+CONTACT = "Jane Doe jane@example.com 8765550100, and John Doe john@example.com"
+DONE = "That's all, thanks"
+CHECKOUT = "Proceed to checkout"
+PAY = "Pay now"
+
+
+# scripted responses: schema title -> fn(last human message) -> structured output
+def classify(text: str) -> dict:
+    if not text:
+        # back at the classifier after a failure: end the turn instead of rebooking
+        return {"direction": "end", "message": "Sorry, something went wrong. Please start again."}
+    return {"direction": constants.BOOKING, "message": ""}
+
+
+def product_type(text: str) -> dict:
+    lowered = text.lower()
+    if "arrival and departure" in lowered:
+        value = constants.BUNDLE
+    elif "departure" in lowered:
+        value = constants.DEPARTURE
+    else:
+        value = constants.ARRIVAL
+    return {"product_type": value, "message": "", "human_input": False}
+
+
+def schedule_info(text: str) -> dict:
+    lowered = text.lower()
+    if "arrival and departure" in lowered:
+        info = {"arrival": ARRIVAL_INFO, "departure": DEPARTURE_INFO, "pessanger_count": PASSENGERS}
+    elif "departure" in lowered:
+        info = {**DEPARTURE_INFO, "pessanger_count": PASSENGERS}
+    else:
+        info = {**ARRIVAL_INFO, "pessanger_count": PASSENGERS}
+    return {"schedule_info": info, "message": "", "human_input": False}
+
+
+def contact_info(text: str) -> dict:
+    if "@" in text:
+        return {"contact_info": CONTACT_INFO, "message": "Thanks!", "human_input": False}
+    return {"message": "Who is travelling? Please share names, email and phone.", "human_input": True}
+
+
+def cart(text: str) -> dict:
+    lowered = text.lower()
+    if "checkout" in lowered:
+        return {"direction": "payment", "message": "Taking you to checkout.", "human_input": False}
+    if "also add" in lowered:
+        return {"direction": "direction", "message": "Sure, let's add that.", "human_input": False}
+    if "that's all" in lowered:
+        return {"direction": "end", "message": "Your booking is in the cart.", "human_input": False}
+    return {"direction": "end", "message": "Anything else, or shall we check out?", "human_input": True}
+
+
+def failure(standby: bool):
+    return lambda text: {"message": "That flight is on standby only." if standby else "Something went wrong.",
+                         "human_input": False, "end": not standby, "isStandby": standby}
+
+
+common = {
+    "Classify_Schema": classify,
+    "product_type_schema": product_type,
+    "schedule_info_collector": schedule_info,
+    "contact_info_collector": contact_info,
+    "cart_summary_schema": cart,
+    "failure_schema": failure(False),
+}
+
+
+def cart_items(values: dict) -> dict:
+    return (values.get("data") or {}).get("cart") or {}
+
+
+def last_message(values: dict) -> str:
+    messages = values.get("messages") or []
+    return str(getattr(messages[-1], "content", "")) if messages else ""
+
+
+# name -> (user turns, script overrides, check on the final state values)
+SCENARIOS = {
+    "single": ([ARRIVAL, CONTACT, DONE], {}, lambda v: len(cart_items(v)) == 1),
+    "bundle": (
+        [BUNDLE, CONTACT, DONE], {},
+        lambda v: [item["summary"]["product"] for item in cart_items(v).values()] == [constants.BUNDLE],
+    ),
+    "standby": (
+        [ARRIVAL], {"failure_schema": failure(True)},
+        lambda v: any(event.get("event") == "redirect_to_standby" for event in v.get("client_events") or []),
+    ),
+    "multi_cart": ([ARRIVAL, CONTACT, ADD_DEPARTURE, CONTACT, DONE], {}, lambda v: len(cart_items(v)) == 2),
+    # the cart hands checkout to the client (navigate_to_summary) and has no
+    # chat edge into `payment`; `None` routes the thread there before PAY
+    "payment": ([ARRIVAL, CONTACT, CHECKOUT, None, PAY], {}, lambda v: "Payment processed successfully" in last_message(v)),
+}
+
+
+class ScriptedChatModel(FakeChatModel):
+    """Answers from the script of the scenario named in the thread id (`<scenario>-<uuid>`)."""
+
+    def _respond(self, messages, schema_title: str = "", run_manager=None, **kwargs) -> str:
+        self.calls += 1
+        thread_id = (run_manager.metadata if run_manager else {}).get("thread_id") or ""
+        script = {**common, **SCENARIOS.get(thread_id.split("-")[0], ([], {}, None))[1]}
+        response = script.get(schema_title) or default_responses.get(schema_title, {})
+        if callable(response):
+            texts = [str(m.content) for m in messages if is_human(m)]
+            response = response(texts[-1] if texts else "")
+        return json.dumps(response)
+
+
+def standby_reservation(payload: dict) -> dict:
+    return {**fake_reservation(payload), "isStandBy": str(payload.get("sessionid", "")).startswith("standby")}
+
+
+class TurnError(Exception):
+    """A failed /api/chat turn, named after the server-side exception type."""
+
+
+class Driver:
+    """Sends one user turn through Chat.run or the ASGI app."""
+
+    def __init__(self, via: str):
+        self.via = via
+        self.client = None
+        if via == "api":
+            import httpx
+            from app import app
+
+            self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://harness", timeout=120)
+
+    async def send(self, thread_id: str, message: str):
+        if self.client is None:
+            await Chat(message=message, checkpoint_id=thread_id).run()
+            return
+        response = await self.client.post("/api/chat", json={"message": message, "checkpoint_id": thread_id})
+        if response.status_code >= 400:
+            detail = response.json().get("detail")
+            raise TurnError(detail.get("type") if isinstance(detail, dict) else f"HTTP {response.status_code}")
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+
+
+async def conversation(driver: Driver, scenario: str, results: dict):
+    turns, _, check = SCENARIOS[scenario]
+    thread_id = f"{scenario}-{uuid.uuid4()}"
+    config = {"configurable": {"thread_id": thread_id}}
+    latencies = results["latencies"][scenario]
+    try:
+        for message in turns:
+            if message is None:
+                await workflow.compiled_graph.aupdate_state(config, {"current_step": constants.PAYMENT}, as_node=constants.CART)
+                continue
+            started = time.perf_counter()
+            await driver.send(thread_id, message)
+            latencies.append(time.perf_counter() - started)
+            results["turns"] += 1
+        values = (await workflow.compiled_graph.aget_state(config)).values
+        results["ok" if check(values) else "wrong"][scenario] += 1
+    except Exception as e:
+        results["errors"][scenario] += 1
+        results["error_types"][str(e) if isinstance(e, TurnError) else e.__class__.__name__] += 1
+
+
+async def workload(driver: Driver, scenarios: list, conversations: int, concurrency: int) -> dict:
+    results = {
+        "latencies": defaultdict(list), "ok": defaultdict(int), "wrong": defaultdict(int),
+        "errors": defaultdict(int), "error_types": defaultdict(int), "turns": 0, "started": defaultdict(int),
+    }
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        scenario = scenarios[i % len(scenarios)]
+        results["started"][scenario] += 1
+        async with gate:
+            await conversation(driver, scenario, results)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(conversations)))
+    results["wall"] = time.perf_counter() - started
+    return results
+
+
+async def memory_per_thread(driver: Driver, scenarios: list, conversations: int, concurrency: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    await workload(driver, scenarios, conversations, concurrency)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / conversations
+
+
+def report(results: dict, scenarios: list, via: str, concurrency: int):
+    print(f"{'scenario':11s} {'convs':>6s} {'ok':>5s} {'wrong':>6s} {'errors':>6s} {'turns':>6s} {'p50_ms':>8s} {'p95_ms':>8s} {'p99_ms':>8s}")
+    every = []
+    for scenario in scenarios:
+        samples = results["latencies"][scenario]
+        every += samples
+        print(f"{scenario:11s} {results['started'][scenario]:6d} {results['ok'][scenario]:5d} {results['wrong'][scenario]:6d} "
+              f"{results['errors'][scenario]:6d} {len(samples):6d} {percentile(samples, 0.5) * 1000:8.1f} "
+              f"{percentile(samples, 0.95) * 1000:8.1f} {percentile(samples, 0.99) * 1000:8.1f}")
+    conversations = sum(results["started"].values())
+    print(f"{'all':11s} {conversations:6d} {sum(results['ok'].values()):5d} {sum(results['wrong'].values()):6d} "
+          f"{sum(results['errors'].values()):6d} {len(every):6d} {percentile(every, 0.5) * 1000:8.1f} "
+          f"{percentile(every, 0.95) * 1000:8.1f} {percentile(every, 0.99) * 1000:8.1f}")
+    if results["error_types"]:
+        print("errors: " + ", ".join(f"{name}={count}" for name, count in results["error_types"].items()))
+    print(f"throughput: {conversations / results['wall']:.1f} conversations/s, {results['turns'] / results['wall']:.1f} turns/s "
+          f"(wall {results['wall']:.2f}s, via {via}, concurrency {concurrency})")
+
+
+async def run(args):
+    # failures are counted in the report; their tracebacks would bury it
+    logger.configure(level="CRITICAL")
+    logging.getLogger().setLevel(logging.CRITICAL)
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    workflow.llm = ScriptedChatModel(latency=args.llm_latency, callbacks=workflow.llm.callbacks)
+    fake_mcp_server.tools["reservation"] = standby_reservation
+
+    async with FakeMcpServer(args.port) as url:
+        client = McpClient(server_url=url)
+        await client.init()
+        mcp_module.mcp_client = client
+        driver = Driver(args.via)
+
+        await workload(driver, scenarios, len(scenarios), len(scenarios))  # warm up
+        faults.update(latency=args.mcp_latency, failure_rate=args.mcp_failure_rate)
+        results = await workload(driver, scenarios, args.conversations, args.concurrency)
+        report(results, scenarios, args.via, args.concurrency)
+
+        if args.memory_sample:
+            per_thread = await memory_per_thread(driver, scenarios, args.memory_sample, args.concurrency)
+            backend = os.getenv("checkpoint_backend", "memory")
+            print(f"memory: {per_thread / 1024:.1f} KB per thread ({args.memory_sample} threads, {backend} checkpointer, tracemalloc)")
+
+        await driver.close()
+        await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--conversations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--via", choices=("chat", "api"), default="chat")
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--mcp-latency", type=float, default=0.0)
+    parser.add_argument("--mcp-failure-rate", type=float, default=0.0)
+    parser.add_argument("--memory-sample", type=int, default=50, help="conversations measured with tracemalloc, 0 to skip")
+    parser.add_argument("--port", type=int, default=8772)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,57 @@
+# benchmarks/history_tokens.py
+# Prompt size per turn over a long conversation, with the full message list
+# vs the windowed history (recent turns + rolling summary).
+#
+#   python -m benchmarks.history_tokens --turns 40
+import argparse
+import asyncio
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+import src.scripts.workflow as workflow
+from benchmarks.fakes import FakeChatModel
+from src.services.history import HistoryManager, estimate_tokens
+
+
+def summary_response(messages) -> dict:
+    # the summary grows slowly with the folded turns, like a real one would
+    turns = sum(isinstance(m, HumanMessage) for m in messages)
+    return {"message": "Customer is booking an arrival lounge at SIA for 2 adults on flight AF2859. " * min(turns, 4)}
+
+
+async def run(turns: int):
+    workflow.llm = FakeChatModel(responses={"without_human_input": summary_response})
+    history = HistoryManager(summarize=workflow.summarize_history)
+    instruction = workflow.inst_map[workflow.constants.CART]
+    sm = SystemMessage(content=getattr(instruction, "template", instruction))
+
+    state = {"messages": [], "summary": "", "summarized_count": 0}
+    full_total = windowed_total = 0
+    for turn in range(1, turns + 1):
+        state["messages"] = state["messages"] + [
+            HumanMessage(content=f"turn {turn}: we land on AF2859 on June 8th, two adults and one child, please."),
+        ]
+        state.update(await history.fold(state, "benchmark"))
+        full = estimate_tokens([sm] + state["messages"])
+        windowed = estimate_tokens(history.prompt(sm, state))
+        full_total += full
+        windowed_total += windowed
+        if turn % 5 == 0 or turn == 1:
+            print(f"turn={turn:3d} full={full:6d} windowed={windowed:6d} tokens")
+        state["messages"] = state["messages"] + [
+            AIMessage(content="Thanks! I have noted your arrival flight details. Could you confirm the passenger names?"),
+        ]
+
+    print(f"total prompt tokens over {turns} turns: full={full_total} windowed={windowed_total} "
+          f"saved={1 - windowed_total / full_total:.0%}")
+    print(history.counters)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=40)
+    args = parser.parse_args()
+    asyncio.run(run(args.turns))
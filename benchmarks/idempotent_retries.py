@@ -0,0 +1,74 @@
+# benchmarks/idempotent_retries.py
+# Client retries against /api/chat with an Idempotency-Key, and duplicate
+# side-effecting MCP calls against the local fake MCP server. Reports how
+# many graph runs and backend tool calls the retries caused.
+#
+#   python -m benchmarks.idempotent_retries --retries 5
+import argparse
+import asyncio
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import httpx
+
+import src.scripts.workflow as workflow
+from benchmarks.fake_mcp_server import FakeMcpServer
+from benchmarks.fakes import FakeChatModel
+from src.services.mcp_client import McpClient
+
+
+async def chat_retries(retries: int):
+    import app
+
+    workflow.llm = FakeChatModel(latency=0.2, responses={"Classify_Schema": {"direction": "end", "message": "Hello!"}})
+    transport = httpx.ASGITransport(app=app.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        body = {"message": "hi", "checkpoint_id": "idem-1"}
+        headers = {"Idempotency-Key": "retry-1"}
+        # the first attempt and a retry fired while it is still running, then late retries
+        responses = await asyncio.gather(*(client.post("/api/chat", json=body, headers=headers) for _ in range(2)))
+        for _ in range(retries):
+            responses.append(await client.post("/api/chat", json=body, headers=headers))
+        conflict = await client.post("/api/chat", json={**body, "message": "something else"}, headers=headers)
+
+    replayed = sum(r.headers.get("Idempotent-Replayed") == "true" for r in responses)
+    same = len({r.text for r in responses}) == 1
+    print(f"/api/chat  requests={len(responses)} graph LLM calls={workflow.llm.calls} replayed={replayed} "
+          f"identical bodies={same} reused key with new message -> {conflict.status_code}")
+
+
+async def tool_retries(retries: int, port: int):
+    calls = []
+
+    async with FakeMcpServer(port) as url:
+        client = McpClient(server_url=url)
+        await client.init()
+        original = client._call
+
+        async def counted(name, input_data):
+            calls.append(name)
+            return await original(name, input_data)
+
+        client._call = counted
+        payload = {"adulttickets": 2, "childtickets": 0, "scheduleData": {"A": {"scheduleId": 1001}}, "productid": "ARRIVALONLY", "sessionid": "s1"}
+        await asyncio.gather(*(client.invoke_tool("reservation", payload) for _ in range(retries)))
+        await client.invoke_tool("reservation", {**payload, "sessionid": "s2"})
+        client.invalidate_cache("reservation", payload)
+        await client.invoke_tool("reservation", payload)
+        print(f"reservation  requests={retries + 2} backend calls={len(calls)} "
+              f"(1 for {retries} duplicates, 1 other session, 1 after invalidation) dedupe={client.stats()['dedupe']}")
+        await client.close()
+
+
+async def run(retries: int, port: int):
+    await chat_retries(retries)
+    await tool_retries(retries, port)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--retries", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(run(args.retries, args.port))
@@ -0,0 +1,70 @@
+# benchmarks/intent_tiers.py
+# Tiered intent classification: leave-one-out accuracy of the local scorer
+# on the corpus, then tier hit rates and p50/p99 latency for a replayed
+# message mix against a slow LLM stand-in.
+#
+#   python -m benchmarks.intent_tiers --messages 500 --latency 0.3
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from langchain_core.messages import HumanMessage
+
+import src.utils.constants as constants
+from src.services.intent import TfidfScorer, TieredClassifier, default_corpus
+
+
+def leave_one_out(examples: list, margin: float):
+    answered = correct = 0
+    for i, (text, label) in enumerate(examples):
+        scorer = TfidfScorer(examples[:i] + examples[i + 1:])
+        scores = scorer.scores(text)
+        if scores.get(constants.BOOKING, 0.0) - scores.get("end", 0.0) >= margin:
+            answered += 1
+            correct += label == constants.BOOKING
+    bookings = sum(label == constants.BOOKING for _, label in examples)
+    print(f"local tier leave-one-out: answers {answered}/{len(examples)} messages, "
+          f"{correct}/{bookings} bookings, precision={correct / max(answered, 1):.0%}")
+
+
+async def replay(examples: list, tiers: str, messages: int, latency: float):
+    classifier = TieredClassifier(tiers=tiers)
+
+    async def llm(text):
+        await asyncio.sleep(latency)
+        label = dict(examples).get(text, "end")
+        return {"direction": label, "message": "" if label == constants.BOOKING else "Hello!"}
+
+    # repeated openers are common: draw from the corpus with a skew towards a few
+    rng = random.Random(7)
+    ranked = rng.sample([text for text, _ in examples], len(examples))
+    texts = rng.choices(ranked, weights=[1 / (rank + 1) for rank in range(len(ranked))], k=messages)
+
+    started = time.perf_counter()
+    # waves of 20 concurrent new threads
+    for i in range(0, len(texts), 20):
+        await asyncio.gather(*(classifier.classify([HumanMessage(content=text)], lambda text=text: llm(text)) for text in texts[i:i + 20]))
+    elapsed = time.perf_counter() - started
+    stats = classifier.stats()
+    print(f"tiers={tiers:16s} wall={elapsed:.2f}s "
+          f"cache={stats['cache_hit_rate']:.0%} local={stats['local_hit_rate']:.0%} llm={stats['llm_hit_rate']:.0%} "
+          f"p50={stats['p50_ms']:.2f}ms p99={stats['p99_ms']:.1f}ms")
+
+
+async def run(messages: int, latency: float, margin: float):
+    lines = default_corpus.read_text(encoding="utf-8").splitlines()
+    examples = [(row["text"], row["label"]) for row in map(json.loads, filter(None, lines))]
+    leave_one_out(examples, margin)
+    for tiers in ("llm", "cache,llm", "local,llm", "cache,local,llm"):
+        await replay(examples, tiers, messages, latency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--margin", type=float, default=0.15)
+    args = parser.parse_args()
+    asyncio.run(run(args.messages, args.latency, args.margin))
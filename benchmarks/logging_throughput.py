@@ -0,0 +1,70 @@
+# benchmarks/logging_throughput.py
+# Full booking flows (classifier -> ... -> cart) through Chat.run with the
+# structured logger at DEBUG, at INFO, and effectively off, with log output
+# going to a real pipe.
+#
+#   python -m benchmarks.logging_throughput --chats 200
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import src.scripts.workflow as workflow
+import src.services.logger as logger
+import src.services.mcp_client as mcp_module
+from benchmarks.fakes import FakeChatModel, FakeMcpClient
+from src.controller.chat import Chat
+
+booking = "Book the arrival lounge: AF2859 into SIA on 8 June 2030, 2 adults"
+responses = {
+    "Classify_Schema": {"direction": "booking"},
+    "contact_info_collector": {
+        "message": "Thanks!",
+        "human_input": False,
+        "contact_info": {
+            "contact": {"title": "MR", "firstName": "Jane", "lastName": "Doe", "email": "jane@example.com", "phone": "8765550100"},
+            "passengerDetails": {"adults": [
+                {"title": "MR", "firstName": "Jane", "lastName": "Doe", "email": "jane@example.com", "dob": ""},
+                {"title": "MR", "firstName": "John", "lastName": "Doe", "email": "john@example.com", "dob": ""},
+            ], "children": []},
+        },
+    },
+    "cart_summary_schema": {"message": "Your cart is ready.", "direction": "end", "human_input": False},
+}
+
+
+async def flows(chats: int, concurrency: int) -> float:
+    started = time.perf_counter()
+    for i in range(0, chats, concurrency):
+        await asyncio.gather(*(Chat(message=booking, checkpoint_id=str(uuid.uuid4())).run() for _ in range(min(concurrency, chats - i))))
+    return chats / (time.perf_counter() - started)
+
+
+async def run(chats: int, concurrency: int):
+    workflow.llm = FakeChatModel(responses=responses)
+    mcp_module.mcp_client = FakeMcpClient()
+    # a consumer process on the other end of a pipe, like a log shipper
+    sink = subprocess.Popen([sys.executable, "-c", "import sys\nfor _ in sys.stdin: pass"], stdin=subprocess.PIPE, text=True)
+
+    logger.configure(level="CRITICAL", stream=sink.stdin)
+    await flows(10, concurrency)  # warm up
+    for label, level in (("off", "CRITICAL"), ("info", "INFO"), ("debug", "DEBUG")):
+        logger.configure(level=level, stream=sink.stdin)
+        rate = await flows(chats, concurrency)
+        logger.stop()
+        print(f"logging={label:5s} {rate:7.1f} flows/s  dropped={logger.stats()['dropped']}")
+    sink.stdin.close()
+    sink.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chats", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.chats, args.concurrency))
@@ -0,0 +1,83 @@
+# benchmarks/mcp_faults.py
+# Fault injection for McpClient against the local fake MCP server:
+# pooled vs per-call connections, hanging calls with retries, and a backend
+# outage tripping the circuit breaker.
+#
+#   python -m benchmarks.mcp_faults --calls 50
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.fake_mcp_server import FakeMcpServer, faults
+
+
+def schedule_payload(i: int) -> dict:
+    # distinct flights so the schedule cache doesn't absorb the calls
+    return {"airportid": "SIA", "direction": "A", "traveldate": "20300608", "flightId": f"AF{i:04d}", "sessionid": str(i)}
+
+
+async def make_client(url: str, pool_size: int):
+    os.environ["mcp_pool_size"] = str(pool_size)
+    from src.services.mcp_client import McpClient
+
+    client = McpClient(server_url=url)
+    await client.init()
+    return client
+
+
+async def burst(client, calls: int, offset: int = 0) -> tuple[float, int]:
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(client.invoke_tool("schedule", schedule_payload(offset + i)) for i in range(calls)),
+        return_exceptions=True,
+    )
+    return time.perf_counter() - start, sum(isinstance(r, Exception) for r in results)
+
+
+async def run(calls: int, port: int):
+    async with FakeMcpServer(port) as url:
+        for pool_size in (0, 4):
+            client = await make_client(url, pool_size)
+            elapsed, errors = await burst(client, calls)
+            label = "per-call connections" if pool_size == 0 else f"pool of {pool_size}"
+            print(f"healthy  {label:22s} {calls} calls in {elapsed:.3f}s errors={errors}")
+            await client.close()
+
+        # hanging calls: schedule is idempotent, so timed-out calls are retried
+        os.environ["mcp_timeout_schedule"] = "0.3"
+        os.environ["mcp_breaker_threshold"] = "1000"
+        client = await make_client(url, 4)
+        faults["hang"] = 0.2
+        elapsed, errors = await burst(client, calls, offset=1000)
+        faults["hang"] = 0.0
+        del os.environ["mcp_timeout_schedule"]
+        stats = client.stats()
+        print(f"hang=20% {calls} calls in {elapsed:.3f}s errors={errors} timeouts={stats['timeouts']} retries={stats['retries']}")
+        await client.close()
+
+    # outage: the server is gone, the breaker opens and later calls fail fast
+    os.environ["mcp_breaker_threshold"] = "3"
+    os.environ["mcp_breaker_reset"] = "0.5"
+    async with FakeMcpServer(port) as url:
+        client = await make_client(url, 4)
+    elapsed, errors = await burst(client, calls, offset=2000)
+    stats = client.stats()
+    print(f"outage   {calls} calls in {elapsed:.3f}s errors={errors} circuit={stats['circuit']} rejected={stats['rejected']}")
+
+    # recovery: after reset_timeout a single trial call closes the breaker again
+    async with FakeMcpServer(port):
+        await asyncio.sleep(0.5)
+        await client.invoke_tool("schedule", schedule_payload(2999))
+        elapsed, errors = await burst(client, calls, offset=3000)
+        print(f"recovery {calls} calls in {elapsed:.3f}s errors={errors} circuit={client.stats()['circuit']}")
+        print(client.stats())
+        await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls, args.port))
@@ -0,0 +1,152 @@
+# benchmarks/mcp_results.py
+# Parse-once tool results (src/services/mcp_results.py). First checks the
+# records against the answers the nodes have to handle (bundle legs, standby
+# and failed reservations, non-JSON and error payments, legacy JSON-string
+# legs in old checkpoints) and exits non-zero on a mismatch. Then times the
+# result handling of one booking as the nodes used to do it (json.loads per
+# check and per read) against parsing once into records, and compares the
+# stored size of a bundle schedule (raw JSON legs vs parsed dicts) under the
+# checkpoint serializer.
+#
+#   python -m benchmarks.mcp_results --rounds 20000
+import argparse
+import json
+import sys
+import time
+
+from benchmarks.fakes import fake_reservation, fake_schedule
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from src.services.mcp_results import ReservationResult, ScheduleResult, parse_result
+from src.services.serde import get_serde
+
+ARRIVAL = json.dumps(fake_schedule({"direction": "A", "airportid": "SIA", "flightId": "AF2859"}))
+DEPARTURE = json.dumps(fake_schedule({"direction": "D", "airportid": "SIA", "flightId": "BA123"}))
+RESERVATION = json.dumps(fake_reservation({"adulttickets": 2, "productid": "BUNDLE", "scheduleData": {"A": {"scheduleId": 1001}, "D": {"scheduleId": 1002}}}))
+PAYMENT = json.dumps({"status": 0, "statusMessage": "Success"})
+
+# (tool, answer, ok, attributes)
+CASES = [
+    ("schedule", ARRIVAL, True, {"schedule_id": 1001}),
+    ("schedule", json.loads(DEPARTURE), True, {"schedule_id": 1002}),
+    ("schedule", json.dumps({"scheduleId": 0}), False, {"schedule_id": 0}),
+    ("schedule", "<html>bad gateway</html>", False, {"error": "Invalid response format"}),
+    ("schedule", ["not", "an", "object"], False, {"data": {}}),
+    ("reservation", RESERVATION, True, {"cartitemid": json.loads(RESERVATION)["cartitemid"], "is_standby": False}),
+    ("reservation", json.dumps({"isStandBy": True, "data": {"cartitemid": 7}}), False, {"is_standby": True}),
+    ("reservation", json.dumps({"isStandBy": False, "data": {}}), False, {"cartitemid": None}),
+    ("reservation", json.dumps({"isStandBy": False, "statusMessage": "sold out"}), False, {"data": {"isStandBy": False, "statusMessage": "sold out"}}),
+    ("contact", json.dumps({"status": 0, "statusMessage": "Success"}), True, {}),
+    ("payment2", PAYMENT, True, {}),
+    ("payment2", json.dumps({"error": "card declined"}), False, {"error_message": "card declined"}),
+    ("payment2", json.dumps({}), False, {"error_message": "Unknown payment error"}),
+    ("payment2", "timeout", False, {"error_message": "Invalid response format"}),
+    ("unknown_tool", json.dumps({"a": 1}), True, {"data": {"a": 1}}),
+]
+
+
+def verify() -> int:
+    failures = 0
+    for tool, answer, ok, attributes in CASES:
+        record = parse_result(tool, answer)
+        got = {name: getattr(record, name) for name in attributes}
+        if record.ok != ok or got != attributes:
+            failures += 1
+            print(f"FAIL {tool} {str(answer)[:40]!r}: ok={record.ok} {got}, expected ok={ok} {attributes}")
+    record = parse_result("schedule", ARRIVAL)
+    checks = {
+        "records have no __dict__": not hasattr(record, "__dict__"),
+        "parse of a record is the record": ScheduleResult.parse(record) is record,
+        "legacy JSON-string leg": ScheduleResult.parse(DEPARTURE).schedule_id == 1002,
+        "as_dict is a copy": record.as_dict() == record.data and record.as_dict() is not record.data,
+        "generic record retyped": type(ReservationResult.parse(parse_result("other", RESERVATION))) is ReservationResult,
+    }
+    for name, passed in checks.items():
+        if not passed:
+            failures += 1
+            print(f"FAIL {name}")
+    print(f"verified {len(CASES) + len(checks)} cases, {failures} failed")
+    return failures
+
+
+def before():
+    """Result handling of one bundle booking as the nodes did it: text parsed per use."""
+    legs = {}
+    for leg, answer in (("arrival", ARRIVAL), ("departure", DEPARTURE)):
+        parsed = json.loads(answer)  # has_schedule_id, all legs ok
+        if isinstance(parsed, dict) and parsed.get("scheduleId"):
+            legs[leg] = answer  # bundle legs were stored as text
+    for answer in (ARRIVAL, DEPARTURE):
+        json.loads(answer)  # has_schedule_id again when storing
+    single = json.loads(ARRIVAL)  # single path: has_schedule_id, then json.loads to store
+    single = json.loads(ARRIVAL)
+    schedule = {leg: json.loads(answer) if isinstance(answer, str) else answer for leg, answer in legs.items()}  # reservation
+    ids = (schedule["arrival"].get("scheduleId", 0), schedule["departure"].get("scheduleId", 0), single.get("scheduleId"))
+    reservation = json.loads(RESERVATION)
+    created = not reservation["isStandBy"] and reservation["data"].get("cartitemid")
+    payment = json.loads(PAYMENT)
+    return legs, ids, created, payment and not payment.get("error")
+
+
+def after():
+    """The same with records parsed once by McpClient (the parse is part of the call)."""
+    arrival, departure = parse_result("schedule", ARRIVAL), parse_result("schedule", DEPARTURE)
+    legs = {}
+    if arrival.ok and departure.ok:
+        legs = {"arrival": arrival.as_dict(), "departure": departure.as_dict()}
+    single = parse_result("schedule", ARRIVAL)
+    stored = single.as_dict()
+    ids = (ScheduleResult.parse(legs["arrival"]).schedule_id, ScheduleResult.parse(legs["departure"]).schedule_id, single.schedule_id)
+    reservation = parse_result("reservation", RESERVATION)
+    data = reservation.as_dict()
+    payment = parse_result("payment2", PAYMENT)
+    return legs, ids, reservation.ok, payment.ok, stored, data
+
+
+def after_cached():
+    """Cache hits (schedule cache, dedupe window) hand out the record, nothing is parsed."""
+    arrival, departure = CACHED["arrival"], CACHED["departure"]
+    legs = {"arrival": arrival.as_dict(), "departure": departure.as_dict()} if arrival.ok and departure.ok else {}
+    ids = (ScheduleResult.parse(legs["arrival"]).schedule_id, ScheduleResult.parse(legs["departure"]).schedule_id, arrival.schedule_id)
+    return legs, ids, CACHED["reservation"].ok, CACHED["payment"].ok
+
+
+CACHED = {
+    "arrival": parse_result("schedule", ARRIVAL),
+    "departure": parse_result("schedule", DEPARTURE),
+    "reservation": parse_result("reservation", RESERVATION),
+    "payment": parse_result("payment2", PAYMENT),
+}
+
+
+def timed(fn, rounds: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            fn()
+        best = min(best, time.perf_counter() - started)
+    return best / rounds * 1e6
+
+
+def run(args):
+    if verify():
+        sys.exit(1)
+    print(f"result handling per bundle booking, best of {args.repeat} x {args.rounds}")
+    print(f"{'variant':28s} {'us':>7s}")
+    base = None
+    for name, fn in (("json.loads per use", before), ("parsed once", after), ("parsed once, cache hits", after_cached)):
+        us = timed(fn, args.rounds, args.repeat)
+        base = base or us
+        print(f"{name:28s} {us:7.2f} {us / base:6.0%}")
+
+    serde = get_serde() or JsonPlusSerializer()
+    raw = {"arrival": ARRIVAL, "departure": DEPARTURE}
+    parsed = {"arrival": json.loads(ARRIVAL), "departure": json.loads(DEPARTURE)}
+    print(f"stored bundle schedule: text legs {len(serde.dumps_typed(raw)[1])} B, parsed legs {len(serde.dumps_typed(parsed)[1])} B")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    run(parser.parse_args())
@@ -0,0 +1,115 @@
+# benchmarks/message_growth.py
+# One long conversation (default 40 turns) through Chat.run on a fresh
+# SQLite checkpointer: the booking request, small talk at the contact
+# details prompt, the details, small talk at the cart prompt, done. After
+# every turn the bytes the checkpointer wrote are split into checkpoint
+# rows, channel blobs (the `messages` blob on its own), pending writes and
+# shared objects (checkpoint_serde / checkpoint_share_* apply),
+# next to the process CPU time of the turn and the time spent inside graph
+# nodes (obi_node_duration_seconds). Printed per block of turns.
+#
+#   python -m benchmarks.message_growth --turns 40 --block 10 --repeat 5
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import benchmarks.harness as harness
+import src.controller.chat as chat
+import src.scripts.workflow as workflow
+import src.services.logger as logger
+import src.services.metrics as metrics
+import src.services.mcp_client as mcp_module
+from benchmarks.fake_mcp_server import FakeMcpServer
+from src.services.checkpointer import SqliteCheckpointer
+from src.services.mcp_client import McpClient
+from src.services.serde import get_serde
+
+
+def script(turns: int) -> list:
+    chatter = turns - 3
+    at_contact = chatter // 2
+    return ([harness.ARRIVAL]
+            + [f"Hmm, let me check who is coming ({i})" for i in range(at_contact)]
+            + [harness.CONTACT]
+            + [f"What else do you offer? ({i})" for i in range(chatter - at_contact)]
+            + [harness.DONE])
+
+
+def table_bytes(saver: SqliteCheckpointer) -> dict:
+    saver.flush()
+    query = lambda sql: saver.conn.execute(sql).fetchone()[0] or 0
+    return {
+        "checkpoints": query("SELECT sum(length(checkpoint) + length(metadata)) FROM checkpoints"),
+        "blobs": query("SELECT sum(length(blob)) FROM blobs"),
+        "messages": query("SELECT sum(length(blob)) FROM blobs WHERE channel = 'messages'"),
+        "writes": query("SELECT sum(length(value)) FROM writes"),
+        "shared": query("SELECT sum(length(blob)) FROM shared"),
+    }
+
+
+def node_seconds() -> float:
+    return sum(total for (_, total, _) in metrics.node_seconds.series.values())
+
+
+async def conversation(saver: SqliteCheckpointer, turns: int):
+    thread_id = f"single-{uuid.uuid4()}"
+    rows, before = [], table_bytes(saver)
+    for message in script(turns):
+        cpu, nodes = time.process_time(), node_seconds()
+        await chat.Chat(message=message, checkpoint_id=thread_id).run()
+        cpu, nodes = time.process_time() - cpu, node_seconds() - nodes
+        after = table_bytes(saver)
+        rows.append({**{k: after[k] - before[k] for k in after}, "cpu": cpu, "nodes": nodes})
+        before = after
+    return rows, (await chat.compiled_graph.aget_state({"configurable": {"thread_id": thread_id}})).values
+
+
+async def run(args):
+    logger.configure(level="CRITICAL")
+    logging.getLogger().setLevel(logging.CRITICAL)
+    workflow.llm = harness.ScriptedChatModel(callbacks=workflow.llm.callbacks)
+    saver = SqliteCheckpointer(path=os.path.join(tempfile.mkdtemp(prefix="obi-growth-"), "growth.sqlite"), serde=get_serde())
+    chat.compiled_graph = workflow.graph.compile(saver)
+
+    async with FakeMcpServer(args.port) as url:
+        client = McpClient(server_url=url)
+        await client.init()
+        mcp_module.mcp_client = client
+
+        runs = [await conversation(saver, args.turns) for _ in range(args.repeat)]
+        await client.close()
+
+    # bytes are the same every run; times are the per-turn median
+    values = runs[0][1]
+    rows = [{**turns[0], "cpu": statistics.median(t["cpu"] for t in turns), "nodes": statistics.median(t["nodes"] for t in turns)}
+            for turns in zip(*(rows for rows, _ in runs))]
+
+    print(f"{args.turns} turns, {len(values.get('messages') or [])} messages in state at the end, "
+          f"cart items {len(harness.cart_items(values))}, times are the median of {args.repeat} runs")
+    print(f"{'turns':>7s} {'bytes/turn':>10s} {'ckpt':>7s} {'blobs':>8s} {'messages':>8s} {'writes':>8s} {'shared':>8s} {'cpu_ms':>7s} {'node_ms':>7s}")
+    for start in range(0, len(rows), args.block):
+        block = rows[start:start + args.block]
+        avg = lambda key: sum(row[key] for row in block) / len(block)
+        total = avg("checkpoints") + avg("blobs") + avg("writes") + avg("shared")
+        print(f"{start + 1:3d}-{start + len(block):<3d} {total:10.0f} {avg('checkpoints'):7.0f} {avg('blobs'):8.0f} "
+              f"{avg('messages'):8.0f} {avg('writes'):8.0f} {avg('shared'):8.0f} {avg('cpu') * 1000:7.2f} {avg('nodes') * 1000:7.2f}")
+    totals = {key: sum(row[key] for row in rows) for key in rows[0]}
+    print(f"{'total':7s} {totals['checkpoints'] + totals['blobs'] + totals['writes'] + totals['shared']:10d} {totals['checkpoints']:7d} "
+          f"{totals['blobs']:8d} {totals['messages']:8d} {totals['writes']:8d} {totals['shared']:8d} "
+          f"{totals['cpu'] * 1000:7.0f} {totals['nodes'] * 1000:7.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--block", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8775)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,89 @@
+# benchmarks/metrics_overhead.py
+# Full booking flows through Chat.run, with McpClient talking to the local
+# fake MCP server, with metrics_enabled off and on (alternating rounds), plus
+# the per-call cost of the node wrapper. Ends with a sample of /metrics.
+#
+#   python -m benchmarks.metrics_overhead --chats 200
+import argparse
+import asyncio
+import logging
+import os
+import time
+import uuid
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import src.scripts.workflow as workflow
+import src.services.logger as logger
+import src.services.mcp_client as mcp_module
+import src.services.metrics as metrics
+from benchmarks.fake_mcp_server import FakeMcpServer
+from benchmarks.fakes import FakeChatModel
+from benchmarks.logging_throughput import booking, responses
+from src.controller.chat import Chat
+from src.services.mcp_client import McpClient
+
+
+async def flows(chats: int, concurrency: int) -> float:
+    started = time.perf_counter()
+    for i in range(0, chats, concurrency):
+        await asyncio.gather(*(Chat(message=booking, checkpoint_id=str(uuid.uuid4())).run() for _ in range(min(concurrency, chats - i))))
+    return time.perf_counter() - started
+
+
+async def wrapper_cost(calls: int = 200_000) -> dict:
+    async def node(state):
+        return state
+
+    timed = metrics.timed_node("bench", node)
+    costs = {}
+    for label, fn, flag in (("bare", node, False), ("off", timed, False), ("on", timed, True)):
+        metrics.enabled = flag
+        started = time.perf_counter()
+        for _ in range(calls):
+            if fn is node:
+                await fn({})
+            else:
+                await fn({}, {})
+        costs[label] = (time.perf_counter() - started) / calls * 1e9
+    return costs
+
+
+async def run(chats: int, concurrency: int, rounds: int, port: int):
+    logger.configure(level="WARNING")
+    logging.basicConfig(level=logging.WARNING)
+    workflow.llm = FakeChatModel(responses=responses, callbacks=[metrics.llm_usage])
+    async with FakeMcpServer(port) as url:
+        client = McpClient(server_url=url)
+        await client.init()
+        mcp_module.mcp_client = client
+        await flows(20, concurrency)  # warm up
+
+        elapsed = {False: 0.0, True: 0.0}
+        for _ in range(rounds):
+            for flag in (False, True):
+                metrics.enabled = flag
+                elapsed[flag] += await flows(chats, concurrency)
+        for flag, seconds in elapsed.items():
+            print(f"metrics={'on' if flag else 'off':3s} {chats * rounds / seconds:7.1f} flows/s  {seconds / (chats * rounds) * 1000:6.2f} ms/flow")
+        print(f"overhead {(elapsed[True] - elapsed[False]) / elapsed[False] * 100:+.1f}%")
+        await client.close()
+
+    text = metrics.render()
+    print(f"\n/metrics: {len(text.encode())} bytes, {text.count(chr(10))} lines; sample:")
+    for line in text.splitlines():
+        if line.startswith(("obi_llm_tokens_total", "obi_node_duration_seconds_count", "obi_tool_duration_seconds_count", "obi_checkpoint_duration_seconds_count")):
+            print("  " + line)
+
+    costs = await wrapper_cost()
+    print("\nnode wrapper ns/call: " + "  ".join(f"{label}={ns:.0f}" for label, ns in costs.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8771)
+    args = parser.parse_args()
+    asyncio.run(run(args.chats, args.concurrency, args.rounds, args.port))
@@ -0,0 +1,70 @@
+# benchmarks/response_payload.py
+# Payload bytes and /api/chat response time for the slim response vs the
+# debug response (full state) as a conversation grows. The graph is replaced
+# by a canned state so only response shaping and serialization are timed.
+#
+#   python -m benchmarks.response_payload --requests 50
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import httpx
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.controller.chat import Chat
+
+
+def conversation_state(turns: int) -> dict:
+    messages = []
+    for turn in range(turns):
+        messages.append(HumanMessage(content=f"turn {turn}: arriving SIA on AF2859, 8 June 2030, 2 adults and 1 child"))
+        messages.append(AIMessage(
+            content="## Perfect! Let me confirm your flight details:\n\n**Arrival Flight:** AF2859 on June 8, 2030\n" * 3,
+            client_events=[{"type": "client_event", "event": "add_to_cart", "payload": {"cart": {"cartData": [{"key": turn}]}}}],
+        ))
+    intermediate = {"schedule": {"scheduleId": 1001, "flightId": "AF2859", "targetDate": "2030-06-08T10:30:00"},
+                    "reservation": {"cartitemid": 5001, "retail": 60.0, "ticketsrequested": 3}}
+    cart = {5000 + i: {"summary": {"product": "ARRIVALONLY", "Passengers": 3, "amount": 60.0}, "intermidiate": intermediate}
+            for i in range(max(1, turns // 10))}
+    return {
+        "messages": messages,
+        "current_step": "cart",
+        "data": {"sessionId": "bench", "product_type": "ARRIVALONLY", "cart": cart, **intermediate},
+        "client_events": [],
+    }
+
+
+async def measure(client, turns: int, debug: bool, requests: int) -> tuple[int, float]:
+    state = conversation_state(turns)
+
+    async def canned_run(self):
+        return state
+
+    Chat.run = canned_run
+    size, started = 0, time.perf_counter()
+    for i in range(requests):
+        response = await client.post("/api/chat", json={"message": "hi", "checkpoint_id": f"bench-{i}", "debug": debug})
+        size = len(response.content)
+    return size, (time.perf_counter() - started) / requests
+
+
+async def run(requests: int):
+    import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app.app), base_url="http://bench") as client:
+        for turns in (5, 20, 50):
+            slim_size, slim_time = await measure(client, turns, False, requests)
+            debug_size, debug_time = await measure(client, turns, True, requests)
+            print(f"turns={turns:3d} slim={slim_size:7d}B {slim_time * 1000:6.2f}ms   "
+                  f"debug={debug_size:7d}B {debug_time * 1000:6.2f}ms   "
+                  f"({debug_size / slim_size:.0f}x bytes, {debug_time / slim_time:.1f}x time)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
@@ -0,0 +1,51 @@
+# benchmarks/structured_llm_overhead.py
+# Per-turn cost of getting a structured-output runnable for each LLM step:
+# rebuilding llm.with_structured_output(schema) every call (before) vs the
+# memoized structured_llm_for() registry (after). No requests are sent.
+#
+#   python -m benchmarks.structured_llm_overhead --turns 2000
+import argparse
+import contextlib
+import io
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import src.utils.constants as constants
+from src.scripts.workflow import llm, structured_llm_for
+from src.utils.schema import schema_map
+
+steps = [
+    (constants.DIRECTION, ()),
+    (constants.PRODUCT_TYPE, ()),
+    (constants.SCHEDULE_INFO, (constants.BUNDLE,)),
+    (constants.SCHEDULE_INFO, (constants.ARRIVAL,)),
+    (constants.CONTACT_INFO, (2, 1)),
+    (constants.FAILURE_HANDLER, ()),
+    (constants.CART, ()),
+]
+
+
+def rebuild(step, schema_args):
+    schema = schema_map[step](*schema_args) if schema_args else schema_map[step]
+    return llm.with_structured_output(schema)
+
+
+def measure(label: str, fn, turns: int):
+    # schedule_schema prints on every call; keep that out of the timing output
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for i in range(turns):
+            step, schema_args = steps[i % len(steps)]
+            fn(step, *schema_args) if fn is structured_llm_for else fn(step, schema_args)
+        elapsed = time.perf_counter() - start
+    print(f"{label:8s} {elapsed / turns * 1e6:9.1f}us per turn")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=2000)
+    args = parser.parse_args()
+    measure("before", rebuild, args.turns)
+    measure("after", structured_llm_for, args.turns)
@@ -0,0 +1,63 @@
+# benchmarks/thread_hammer.py
+# Hammers one thread id with concurrent Chat.run calls: a mix of distinct
+# answers and duplicates of each (double clicks). Every distinct answer
+# resumes the product_type interrupt once, so the thread should end up with
+# exactly one [human, ai] pair per distinct answer.
+#
+#   python -m benchmarks.thread_hammer --answers 10 --duplicates 3
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from langchain_core.messages import HumanMessage
+
+import src.scripts.workflow as workflow
+from benchmarks.fakes import FakeChatModel
+from src.controller.chat import Chat
+from src.services.thread_locks import thread_locks
+
+# answers that never settle the product type keep the thread at the interrupt
+responses = {
+    "Classify_Schema": {"direction": "booking"},
+    "product_type_schema": {"product_type": "ARRIVALONLY", "message": "Which lounge would you like?", "human_input": True},
+}
+
+
+async def hammer(thread_id: str, answers: int, duplicates: int, enabled: bool):
+    thread_locks.enabled = enabled
+    await Chat(message="hello, lounge please", checkpoint_id=thread_id).run()
+
+    requests = [f"answer {i}" for i in range(answers) for _ in range(duplicates)]
+    random.Random(3).shuffle(requests)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(Chat(message=m, checkpoint_id=thread_id).run() for m in requests), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+
+    snapshot = await workflow.compiled_graph.aget_state({"configurable": {"thread_id": thread_id}})
+    humans = [m.content for m in snapshot.values["messages"] if isinstance(m, HumanMessage)]
+    errors = [result for result in results if isinstance(result, Exception)]
+    for error in errors[:3]:
+        print(f"  {error.__class__.__name__}: {error}")
+    recorded = len(set(humans) - {"hello, lounge please"})
+    print(f"locks={'on ' if enabled else 'off'} requests={len(requests)} wall={elapsed:.2f}s errors={len(errors)} "
+          f"answers recorded={recorded}/{answers} duplicates recorded={len(humans) - 1 - recorded}")
+
+
+async def run(answers: int, duplicates: int, latency: float):
+    workflow.llm = FakeChatModel(latency=latency, responses=responses)
+    await hammer("hammer-off", answers, duplicates, enabled=False)
+    await hammer("hammer-on", answers, duplicates, enabled=True)
+    print(thread_locks.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--answers", type=int, default=10)
+    parser.add_argument("--duplicates", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(run(args.answers, args.duplicates, args.latency))
@@ -0,0 +1,151 @@
+# benchmarks/worker_scaling.py
+# Booking conversations over real HTTP against the multi-worker prod mode
+# (src.services.workers) with 1..N workers. Each configuration gets a fresh
+# sqlite checkpointer, the fake MCP server runs in its own process and the
+# workers serve benchmarks.fake_app (scripted LLM). A plain single uvicorn
+# process is the baseline. Final replies are checked against the scenario's
+# expected cart size.
+#
+#   python -m benchmarks.worker_scaling --workers 1,2,4 --conversations 200 --llm-latency 0.2
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+
+from benchmarks.harness import SCENARIOS
+from src.services.metrics import percentile
+from src.services.workers import uvicorn_command
+
+CART_SIZES = {"single": 1, "bundle": 1, "multi_cart": 2}
+
+
+def wait_for_port(port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.1)
+    raise TimeoutError(f"nothing listening on {port}")
+
+
+async def wait_ready(client: httpx.AsyncClient, workers: int, timeout: float = 60):
+    # round-robin through the router until every worker reports ready
+    deadline, ready = time.monotonic() + timeout, 0
+    while ready < 3 * workers:
+        if time.monotonic() > deadline:
+            raise TimeoutError("workers not ready")
+        try:
+            ready = ready + 1 if (await client.get("/readyz")).status_code == 200 else 0
+        except httpx.TransportError:
+            ready = 0
+        if not ready:
+            await asyncio.sleep(0.2)
+
+
+async def conversation(client: httpx.AsyncClient, scenario: str, results: dict):
+    thread_id = f"{scenario}-{uuid.uuid4()}"
+    try:
+        for message in SCENARIOS[scenario][0]:
+            started = time.perf_counter()
+            response = await client.post("/api/chat", json={"message": message, "checkpoint_id": thread_id})
+            results["latencies"].append(time.perf_counter() - started)
+            response.raise_for_status()
+        ok = response.json().get("cart", {}).get("count") == CART_SIZES[scenario]
+        results["ok" if ok else "wrong"] += 1
+    except Exception:
+        results["errors"] += 1
+
+
+async def load(port: int, workers: int, conversations: int, concurrency: int) -> dict:
+    scenarios = list(CART_SIZES)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120, limits=limits) as client:
+        await wait_ready(client, workers)
+        warmup = {"latencies": [], "ok": 0, "wrong": 0, "errors": 0}
+        await asyncio.gather(*(conversation(client, scenario, warmup) for scenario in scenarios * workers))
+
+        results = {"latencies": [], "ok": 0, "wrong": 0, "errors": 0}
+        gate = asyncio.Semaphore(concurrency)
+
+        async def one(i: int):
+            async with gate:
+                await conversation(client, scenarios[i % len(scenarios)], results)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(conversations)))
+        results["wall"] = time.perf_counter() - started
+    return results
+
+
+def start(workers: int, routing: str, port: int, env: dict) -> subprocess.Popen:
+    if routing == "single":
+        command = uvicorn_command("benchmarks.fake_app:app", "127.0.0.1", port, 5)
+    else:
+        command = [sys.executable, "-m", "src.services.workers", "--app", "benchmarks.fake_app:app", "--workers", str(workers),
+                   "--host", "127.0.0.1", "--port", str(port), "--routing", routing, "--drain", "5"]
+    return subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def stop(proc: subprocess.Popen):
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def run(args):
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    counts = [int(n) for n in args.workers.split(",")]
+    configs = [("single", 1)] + [(routing, n) for routing in args.routing.split(",") for n in counts]
+    tmp = tempfile.mkdtemp(prefix="obi-workers-")
+    mcp = subprocess.Popen([sys.executable, "-m", "benchmarks.fake_mcp_server", "--port", str(args.mcp_port), "--latency", str(args.mcp_latency)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for_port(args.mcp_port)
+    print(f"cpus={os.cpu_count()} conversations={args.conversations} concurrency={args.concurrency} "
+          f"llm_latency={args.llm_latency}s mcp_latency={args.mcp_latency}s")
+    print(f"{'mode':10s} {'workers':>7s} {'conv/s':>8s} {'turns/s':>8s} {'p50_ms':>8s} {'p95_ms':>8s} {'p99_ms':>8s} {'ok':>5s} {'errors':>6s}")
+    try:
+        for index, (routing, workers) in enumerate(configs):
+            port = args.port + 20 * index
+            env = {
+                **os.environ, "OPENAI_API_KEY": "benchmark", "log_level": "WARNING",
+                "checkpoint_backend": "sqlite", "checkpoint_path": os.path.join(tmp, f"{routing}-{workers}.sqlite"),
+                "mcp_server": f"http://127.0.0.1:{args.mcp_port}/sse", "fake_llm_latency": str(args.llm_latency),
+            }
+            proc = start(workers, routing, port, env)
+            try:
+                wait_for_port(port)
+                results = asyncio.run(load(port, workers, args.conversations, args.concurrency))
+            finally:
+                stop(proc)
+            samples = results["latencies"]
+            print(f"{routing:10s} {workers:7d} {args.conversations / results['wall']:8.1f} {len(samples) / results['wall']:8.1f} "
+                  f"{percentile(samples, 0.5) * 1000:8.1f} {percentile(samples, 0.95) * 1000:8.1f} {percentile(samples, 0.99) * 1000:8.1f} "
+                  f"{results['ok']:5d} {results['errors']:6d}")
+    finally:
+        stop(mcp)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--routing", default="sticky,stateless")
+    parser.add_argument("--conversations", type=int, default=150)
+    parser.add_argument("--concurrency", type=int, default=30)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--mcp-latency", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8300)
+    parser.add_argument("--mcp-port", type=int, default=8299)
+    run(parser.parse_args())
@@ -1,22 +1,155 @@
 # src/controllers/workflow_controller.py
 from langchain_core.messages import HumanMessage
+from langchain_core.utils.json import parse_partial_json
 from langgraph.types import Command
 from src.scripts.workflow import compiled_graph
+from src.controller.response import shape_response
+from src.services.jobs import jobs, Job
+from src.utils.states import reset_messages
+from src.services.thread_reaper import ThreadReaper
+from src.services.checkpoint_retention import CheckpointRetention
+from src.services.thread_locks import thread_locks
+from src.services.logger import get_logger
+
+log = get_logger("chat")
+
+thread_reaper = ThreadReaper(compiled_graph.checkpointer)
+checkpoint_retention = CheckpointRetention(compiled_graph.checkpointer)
 
 class Chat:
     def __init__(self, message: str, checkpoint_id: str | int | None = None):
         self.message = message
         self.checkpoint_id = checkpoint_id
-        self.config = {"configurable": {"thread_id": checkpoint_id}}
+        # checkpointers key threads by string id
+        self.config = {"configurable": {"thread_id": str(checkpoint_id) if checkpoint_id is not None else None}}
 
-    async def run(self) -> str:
-        snapshot = compiled_graph.get_state(self.config)
+    async def graph_input(self):
+        snapshot = await compiled_graph.aget_state(self.config)
 
         if snapshot.next:
-            print("[Workflow] Resuming graph with message:", self.message)
-            result = await compiled_graph.ainvoke(Command(resume=self.message), config=self.config)
-        else:
-            print("[Workflow] Starting new graph with message:", self.message)
-            result = await compiled_graph.ainvoke({"messages": [HumanMessage(content=self.message)]}, config=self.config)
+            log.debug("resuming graph", thread_id=self.config["configurable"]["thread_id"], message=self.message)
+            return Command(resume=self.message)
+        log.debug("starting graph", thread_id=self.config["configurable"]["thread_id"], message=self.message)
+        # a new run starts a fresh history, as it always has
+        return reset_messages(HumanMessage(content=self.message))
+
+    async def run(self) -> str:
+        # one run per thread at a time; a duplicate of an in-flight message
+        # (double click, client retry) gets the same result
+        return await thread_locks.run(self.config["configurable"]["thread_id"], self.message, self._run)
+
+    async def _run(self):
+        await thread_reaper.touch(self.config["configurable"]["thread_id"])
+        result = await compiled_graph.ainvoke(await self.graph_input(), config=self.config)
+
+        # commit any batched checkpoint writes before the turn is answered
+        if hasattr(compiled_graph.checkpointer, "aflush"):
+            await compiled_graph.checkpointer.aflush()
+        checkpoint_retention.mark(self.config["configurable"]["thread_id"])
+        thread_reaper.finish(self.config["configurable"]["thread_id"])
 
         return result
+
+    async def stream(self):
+        """Yield {"event", "data"} dicts while the graph runs.
+
+        Events: node_start / node_end, token (the `message` field of a
+        structured LLM response as it is generated), client_event, interrupt
+        and finally result with the same content `run()` returns.
+        """
+        async with thread_locks.hold(self.config["configurable"]["thread_id"]):
+            async for event in self._stream():
+                yield event
+
+    async def _stream(self):
+        await thread_reaper.touch(self.config["configurable"]["thread_id"])
+        graph_input = await self.graph_input()
+
+        values, interrupt = {}, None
+        # raw structured output per LLM message id -> (json so far, message chars sent)
+        buffers: dict[str, tuple[str, int]] = {}
+        async for mode, chunk in compiled_graph.astream(
+            graph_input, config=self.config, stream_mode=["tasks", "messages", "updates", "values"]
+        ):
+            if mode == "tasks":
+                if "result" in chunk or "error" in chunk:
+                    yield {"event": "node_end", "data": {"node": chunk["name"], "error": str(chunk["error"]) if chunk.get("error") else None}}
+                else:
+                    yield {"event": "node_start", "data": {"node": chunk["name"]}}
+
+            elif mode == "messages":
+                message, metadata = chunk
+                if token := message_token(buffers, message):
+                    yield {"event": "token", "data": {"node": metadata.get("langgraph_node"), "text": token}}
+
+            elif mode == "updates":
+                for node, update in chunk.items():
+                    if node == "__interrupt__":
+                        interrupt = update
+                        yield {"event": "interrupt", "data": {"message": update[0].value}}
+                    elif isinstance(update, dict):
+                        for client_event in update.get("client_events") or []:
+                            yield {"event": "client_event", "data": client_event}
+
+            elif mode == "values":
+                values = chunk
+
+        if hasattr(compiled_graph.checkpointer, "aflush"):
+            await compiled_graph.checkpointer.aflush()
+        checkpoint_retention.mark(self.config["configurable"]["thread_id"])
+        thread_reaper.finish(self.config["configurable"]["thread_id"])
+
+        yield {"event": "result", "data": {**values, "__interrupt__": interrupt} if interrupt else values}
+
+
+async def resume_job(job: Job) -> dict | None:
+    """Continue the thread parked on `job` now that its call has settled.
+
+    The node re-runs, takes the job's result and the graph carries on, so the
+    result lands in the checkpoint. Returns the /api/chat fields of that
+    continuation, or None when a user turn already moved the thread past it.
+    """
+    config = {"configurable": {"thread_id": job.thread_id}}
+
+    async def run():
+        snapshot = await compiled_graph.aget_state(config)
+        parked = any(
+            isinstance(item.value, dict) and item.value.get("job_id") == job.id
+            for task in snapshot.tasks for item in task.interrupts
+        )
+        if not parked:
+            return None
+        await thread_reaper.touch(job.thread_id)
+        result = await compiled_graph.ainvoke(Command(resume={"job_id": job.id}), config=config)
+        if hasattr(compiled_graph.checkpointer, "aflush"):
+            await compiled_graph.checkpointer.aflush()
+        checkpoint_retention.mark(job.thread_id)
+        thread_reaper.finish(job.thread_id)
+        return shape_response(result, job.thread_id, debug=False)
+
+    return await thread_locks.run(job.thread_id, ("job", job.id), run)
+
+
+jobs.resume = resume_job
+
+
+def message_token(buffers: dict, message) -> str:
+    """New characters of the `message` field in a streamed structured response."""
+    text = message.content if isinstance(message.content, str) else ""
+    for tool_chunk in getattr(message, "tool_call_chunks", None) or []:
+        text += tool_chunk.get("args") or ""
+    if not text or not message.id:
+        return ""
+
+    raw, sent = buffers.get(message.id, ("", 0))
+    raw += text
+    try:
+        parsed = parse_partial_json(raw)
+    except Exception:
+        parsed = None
+    current = parsed.get("message") if isinstance(parsed, dict) else None
+    if not isinstance(current, str) or len(current) <= sent:
+        buffers[message.id] = (raw, sent)
+        return ""
+    buffers[message.id] = (raw, len(current))
+    return current[sent:]
@@ -0,0 +1,93 @@
+# src/controller/response.py
+# Shapes graph results into /api/chat responses. The default slim response
+# carries what the UI renders; the full state (every message object) is
+# only serialized when debug fields are asked for.
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+debug_by_default = os.getenv("chat_response_debug", "false").lower() == "true"
+
+
+def build_reply(content: dict, checkpoint_id=None) -> dict:
+    # Get messages list safely
+    messages = content.get("messages", [])
+    last_msg = messages[-1] if messages else None
+    
+    # Step 1: Check for interrupt
+    interrupt = content.get("__interrupt__", [])
+    job = pending_job(content)
+    if job:
+        reply = job["message"]
+    elif interrupt:
+        reply = interrupt[0].value
+
+    # Step 2: Fallback to last message content
+    else:
+        if messages and last_msg:
+            if hasattr(last_msg, "content"):
+                reply = last_msg.content
+            elif isinstance(last_msg, dict):
+                reply = last_msg.get("content", "No content found.")
+            else:
+                reply = str(last_msg)
+        else:
+            reply = "No messages found."
+            
+    data = {"message": reply, "data": {}}
+    # Check if last_msg has 'client_events' attribute
+    if "client_events" in content:
+        data["data"] = {**data["data"], "client_events": content["client_events"]}
+    if job:
+        data["data"]["job"] = job_summary(job, checkpoint_id)
+    return data
+
+
+def pending_job(content: dict) -> dict | None:
+    """The background job (src.services.jobs) this turn is parked on, if any."""
+    for item in content.get("__interrupt__") or []:
+        if isinstance(item.value, dict) and item.value.get("type") == "job":
+            return item.value
+    return None
+
+
+def job_summary(job: dict, checkpoint_id=None) -> dict:
+    # checkpoint_id in the query keeps polls on the worker running the job
+    query = f"?checkpoint_id={checkpoint_id}" if checkpoint_id is not None else ""
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "step": job["step"],
+        "poll": f"/api/jobs/{job['job_id']}{query}",
+        "events": f"/api/jobs/{job['job_id']}/events{query}",
+    }
+
+
+def cart_summary(content: dict) -> dict:
+    cart = (content.get("data") or {}).get("cart") or {}
+    items = [{"cartitemid": cartitemid, **(item.get("summary") or {})} for cartitemid, item in cart.items()]
+    return {
+        "items": items,
+        "count": len(items),
+        "total": sum(item.get("amount") or 0 for item in items),
+    }
+
+
+def shape_response(content: dict, checkpoint_id=None, debug: bool | None = None) -> dict:
+    """Fields for ChatResponse; `state` and `full_data` only when debugging."""
+    job = pending_job(content)
+    response = {
+        "content": build_reply(content, checkpoint_id),
+        "checkpoint_id": checkpoint_id,
+        "status": "pending" if job else "complete",
+        "current_step": content.get("current_step"),
+        "cart": cart_summary(content),
+    }
+    if job:
+        response["job"] = job_summary(job, checkpoint_id)
+    if debug_by_default if debug is None else debug:
+        response["state"] = content.get("data", {})
+        response["full_data"] = content
+    return response
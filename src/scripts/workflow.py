@@ -1,40 +1,77 @@
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import add_messages, StateGraph, END
 from langgraph.types import Command, interrupt
+from langgraph.constants import TAG_NOSTREAM
+from langgraph.errors import GraphInterrupt
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langgraph.graph import add_messages 
-from src.utils.states import State
+from src.utils.states import State , reset_messages
 from langchain_core.messages import HumanMessage , AIMessage , SystemMessage
 from src.utils.instructions import inst_map , failure_instruction_prompt , cart_summary_instruction_prompt 
 import src.utils.constants as constants
 from src.utils.schema import schema_map , common_schema_without_human_input
 from src.services.mcp_client import get_mcpInstance , McpClient
+from src.services.mcp_results import ScheduleResult
+from src.services.checkpointer import get_checkpointer
+from src.services.history import HistoryManager
+from src.services.fast_path import fast_path
+from src.services.intent import intent_classifier
+from src.services.logger import get_logger
+from src.services.jobs import jobs
+import src.services.metrics as metrics
 load_dotenv()
-import json
-import traceback
-import sys
+import asyncio
+import os
+import inspect
+import time
+from functools import lru_cache
 from src.utils.helpers import cart_formulator
 
-def print_exception_group(exc: BaseException, indent: int = 0):
-    prefix = " " * indent
-    if hasattr(exc, "exceptions"):  # It's an ExceptionGroup
-        print(f"{prefix}ExceptionGroup ({exc.__class__.__name__}): {exc}")
-        for i, sub_e in enumerate(exc.exceptions):
-            print(f"{prefix}--- Sub-exception {i+1} ---")
-            print_exception_group(sub_e, indent + 4)
-    else:
-        print(f"{prefix}{exc.__class__.__name__}: {exc}")
-        traceback.print_exception(type(exc), exc, exc.__traceback__, file=sys.stdout)
+log = get_logger("workflow")
 
-        
-memory = MemorySaver()
 
-llm = ChatOpenAI(model="gpt-4o")
+# model-local callback: only model runs pay for it, and it runs next to the
+# graph's own streaming handlers instead of replacing them
+llm = ChatOpenAI(model="gpt-4o", callbacks=[metrics.llm_usage])
 
 graph = StateGraph(State)
 
-memory = MemorySaver()
+memory = metrics.instrument_checkpointer(get_checkpointer())
+
+# structured-output runnables are built once per (step, schema args); the
+# model id is part of the key so swapping `llm` never serves stale runnables
+@lru_cache(maxsize=int(os.getenv("structured_llm_cache_size", "64")))
+def _build_structured_llm(model_id: int, step: str, schema_args: tuple):
+    schema = schema_map[step](*schema_args) if schema_args else schema_map[step]
+    return llm.with_structured_output(schema)
+
+def structured_llm_for(step: str, *schema_args):
+    return _build_structured_llm(id(llm), step, schema_args)
+
+async def summarize_history(summary: str, messages: list) -> str:
+    sm = SystemMessage(content=inst_map["history_summary"].format(summary=summary or "(empty)"))
+    # keep summary tokens out of the streamed chat reply
+    summarizer = structured_llm_for("history_summary").with_config(tags=[TAG_NOSTREAM])
+    response = await summarizer.ainvoke([sm] + messages)
+    return response["message"]
+
+history = HistoryManager(summarize=summarize_history)
+
+def with_history(node):
+    """Fold old turns into the rolling summary before an LLM node runs."""
+    takes_config = "config" in inspect.signature(node).parameters
+
+    async def run(state: State, config):
+        updates = await history.fold(state, state.get("current_step") or constants.DIRECTION)
+        state = {**state, **updates}
+        result = await (node(state, config) if takes_config else node(state))
+        return {**updates, **result} if isinstance(result, dict) else result
+
+    run.__name__ = node.__name__
+    return run
+
+# seconds to wait for each leg of a bundle schedule lookup
+schedule_leg_timeout = float(os.getenv("schedule_leg_timeout", "30"))
 
 
 
@@ -59,9 +96,11 @@ async def classifier(state:State , config):
     sessionId = config["metadata"]["thread_id"]
     try: 
         sm = SystemMessage(content = inst_map[constants.DIRECTION])
-        structured_llm = llm.with_structured_output(schema_map[constants.DIRECTION])
-        result =  structured_llm.invoke([sm] + state["messages"])
-        print(f"Classifier direction: {result}")
+        structured_llm = structured_llm_for(constants.DIRECTION)
+        result = await intent_classifier.classify(
+            state["messages"], lambda: structured_llm.ainvoke(history.prompt(sm, state)), state.get("summary") or ""
+        )
+        log.info("classifier direction", node=constants.DIRECTION, thread_id=sessionId, direction=result.get("direction"))
         if result["direction"] == constants.BOOKING:
             # Store extracted data from user's initial message
             extracted_data = result.get("extracted_data", {})
@@ -73,47 +112,51 @@ async def classifier(state:State , config):
         else:            
             return {
                 "current_step": END ,
-                "messages": state["messages"]  + [AIMessage(content= result.get("message" , "") )] , 
+                "messages": [AIMessage(content= result.get("message" , "") )] , 
                 "data":{**state.get("data", {}) ,  "sessionId": sessionId} , 
                 "client_events": []
             }
             
     except Exception as e:
-        print(f"Error in classifier: {e}")
+        log.exception("classifier failed", node=constants.DIRECTION, thread_id=sessionId)
         return {
             "current_step": END,
-            "messages": state["messages"]  + [AIMessage(content="There was some error while processing your request , please retry." )],
+            "messages": [AIMessage(content="There was some error while processing your request , please retry." )],
             "data":{ **state.get("data", {}) ,  "sessionId": sessionId} ,
             "client_events": []
         }
 
-def info_collector(state:State):
+async def info_collector(state:State):
     current_step = state.get("current_step" , "")
-    print(f"Info collector - step: {current_step}")
+    log.debug("info collector", node=current_step)
     
     sm = ""
     if current_step in {constants.PRODUCT_TYPE, constants.SCHEDULE_INFO , constants.CONTACT_INFO}:
         sm = SystemMessage(content=f"{inst_map[current_step]}")
-        schema = schema_map[current_step]
         if(current_step == constants.SCHEDULE_INFO):
-            schema = schema_map[current_step](state["data"]["product_type"])
-            structured_llm = llm.with_structured_output(schema)
+            structured_llm = structured_llm_for(current_step, state["data"]["product_type"])
             sm = SystemMessage(content=inst_map[current_step](state["data"]["product_type"]))
             
         elif current_step == constants.CONTACT_INFO:
-            schema = schema_map[current_step](adult_count=state["data"]["schedule_info"]["pessanger_count"]["adult"] , child_count=state["data"]["schedule_info"]["pessanger_count"]["children"])
-            structured_llm = llm.with_structured_output(schema)
+            pessanger_count = state["data"]["schedule_info"]["pessanger_count"]
+            structured_llm = structured_llm_for(current_step, pessanger_count["adult"], pessanger_count["children"])
         else:
-            structured_llm = llm.with_structured_output(schema)
+            structured_llm = structured_llm_for(current_step)
         
-        response = structured_llm.invoke([sm] + state["messages"])
-        print(f"Info collector response: {response}")
+        response = fast_path.extract(current_step, state)
+        if response is None:
+            started = time.perf_counter()
+            response = await structured_llm.ainvoke(history.prompt(sm, state))
+            fast_path.record_llm(current_step, time.perf_counter() - started)
+        else:
+            log.debug("info collector fast path hit", node=current_step)
+        log.debug("info collector response", node=current_step, response=response)
         
         if response.get("human_input"):
-            print(f"Triggering interrupt: {response['message']}")
+            log.debug("interrupt", node=current_step)
             user_input = interrupt(value=response["message"])
             return {
-                "messages": state["messages"]  + [HumanMessage(content=user_input) , AIMessage(content=response["message"])] ,
+                "messages": [HumanMessage(content=user_input) , AIMessage(content=response["message"])] ,
                 "executionFlow": state.get("executionFlow", []) + [f"{current_step} retry"],
                 "data": state.get("data") or {}
             }
@@ -132,25 +175,25 @@ def info_collector(state:State):
 
 def router_next(state:State):
     current_step = state.get("current_step", "direction")
-    print(f"Router - current step: {current_step}")
+    log.debug("router", current_step=current_step)
     
     if(state.get("failure_step" , False)):
         return constants.FAILURE_HANDLER
     
     return current_step
 
-def failure_handler(state:State):
-    print("Failure handler triggered")
+async def failure_handler(state:State):
+    log.info("failure handler triggered", node=constants.FAILURE_HANDLER, failed_step=state["current_step"])
     current_step = state["current_step"]
     error = state["data"].get(current_step , "Unknown error occurred").get("statusMessage" , "Unknown error occurred")
     prompt = failure_instruction_prompt.format(step=state["current_step"] , error=error)
     sm = SystemMessage(content=prompt)
-    structuredllm = llm.with_structured_output(schema_map[constants.FAILURE_HANDLER])
-    response = structuredllm.invoke([sm] + state["messages"])
-    print(f"Failure handler response: {response}")    
+    structuredllm = structured_llm_for(constants.FAILURE_HANDLER)
+    response = await structuredllm.ainvoke(history.prompt(sm, state))
+    log.debug("failure handler response", node=constants.FAILURE_HANDLER, response=response)
     if response["end"]:
         return {
-            "messages": [AIMessage(content=response["message"])] , 
+            **reset_messages(AIMessage(content=response["message"])) , 
             "current_step":constants.DIRECTION,
             "failure_step": False ,
             "data": {**(state["data"].get("cart" , {})) , "sessionId": state["data"].get("sessionId" , "")} ,
@@ -158,11 +201,11 @@ def failure_handler(state:State):
     if response["isStandby"]:
         return {
             "current_step": END,
-            "messages": [AIMessage(content=response["message"] , client_events=[{
+            **reset_messages(AIMessage(content=response["message"] , client_events=[{
                     "type": "client_event",
                     "event": "redirect_to_standby",
                     "payload": {"product_type": state["data"].get("product_type" , "")}
-                }])], 
+                }])), 
             "failure_step": False,
             "client_events":[{
                     "type": "client_event",
@@ -171,10 +214,10 @@ def failure_handler(state:State):
                 }]
         }
     if response["human_input"]:
-        print(f"Triggering interrupt: {response['message']}")
+        log.debug("interrupt", node=constants.FAILURE_HANDLER)
         user_input = interrupt(value=response["message"])
         return {
-            "messages":state["messages"]  + [HumanMessage(content=user_input)],
+            "messages":[HumanMessage(content=user_input)],
             "executionFlow": state.get("executionFlow", []) + [f"{current_step} {constants.FAILURE_HANDLER} retry"],
         }
     else:
@@ -187,7 +230,7 @@ def failure_handler(state:State):
             
         return {
             "current_step": failuer_serializer[current_step],
-            "messages": [AIMessage(content=response["message"])] ,
+            **reset_messages(AIMessage(content=response["message"])) ,
             "data": data, 
             "failure_step": False,
         }
@@ -196,41 +239,20 @@ def failure_handler(state:State):
 # Application nodes
 async def schedule(state: State , config):
     sessionId = config["metadata"]["thread_id"]
-    print("Starting schedule step")
-    currentState = state
+    log.debug("schedule step", node=constants.SCHEDULE, thread_id=sessionId)
     mcp_client: McpClient = await get_mcpInstance()
     current_step = state.get("current_step")
-    print(f"Current step: {current_step}")
 
-    # Ensure 'schedule' dict exists
-    if "schedule" not in currentState["data"]:
-        currentState["data"]["schedule"] = {}
-
-    
-    data = state.get("data", {})
+    # a copy, the node returns only what it changes
+    data = {**state.get("data", {})}
+    data["schedule"] = {**(data.get("schedule") or {})}
     isBundle = data.get("product_type") == constants.BUNDLE
     scheduleData = data.get("schedule_info", {})
-    print(f"Is Bundle: {isBundle}")
 
     isSchedule = False
     session_id = sessionId
 
-    def parse_if_str(result):
-        if isinstance(result, str):
-            try:
-                import json
-                return json.loads(result)
-            except Exception as e:
-                print(f"JSON parse error: {e}")
-                return {}
-        return result
-
-    def has_schedule_id(result):
-        result = parse_if_str(result)
-        return isinstance(result, dict) and result.get("scheduleId")
-
     if not isBundle:
-        print("Processing non-bundle schedule")
         scheduleObj = {
             "airportid": scheduleData.get("airportid"),
             "direction": scheduleData.get("direction"),
@@ -238,23 +260,20 @@ async def schedule(state: State , config):
             "flightId": scheduleData.get("flightId"),
             "sessionid": session_id
         }
-        print(f"Schedule request payload: {scheduleObj}")
+        log.debug("schedule request", node=constants.SCHEDULE, payload=scheduleObj)
 
         try:
             schedule_result = await mcp_client.invoke_tool("schedule", scheduleObj)
-            print(f"Schedule result: {schedule_result}")
-            isSchedule = has_schedule_id(schedule_result)
-            currentState["data"]["schedule"] = json.loads(schedule_result)            
+            log.debug("schedule result", node=constants.SCHEDULE, result=schedule_result.data)
+            isSchedule = schedule_result.ok
+            if not isSchedule:
+                # don't serve a failed lookup from cache when the user retries
+                mcp_client.invalidate_cache("schedule", scheduleObj)
+            data["schedule"] = schedule_result.as_dict()
         except Exception as e:
-             print(f"Error invoking schedule tool: {e}")
-             traceback.print_exc()  # Logs full traceback to console
-             if hasattr(e, 'exceptions'):
-                for i, sub in enumerate(e.exceptions, start=1):
-                    print(f"Sub-exception {i}: {type(sub).__name__} - {sub}")
-                    if hasattr(sub, '__traceback__'):
-                        traceback.print_tb(sub.__traceback__)
+             # the traceback includes every sub-exception of an ExceptionGroup
+             log.exception("schedule tool failed", node=constants.SCHEDULE, thread_id=sessionId)
     else:
-        print("Processing bundle schedule (arrival + departure)")
 
         arrivalObj = {
             "airportid": scheduleData.get("arrival", {}).get("airportid"),
@@ -272,64 +291,65 @@ async def schedule(state: State , config):
             "sessionid": sessionId  
         }
 
-        print(f"Arrival payload: {arrivalObj}")
-        print(f"Departure payload: {departureObj}")
+        log.debug("bundle schedule request", node=constants.SCHEDULE, arrival=arrivalObj, departure=departureObj)
 
-        arrival_result, departure_result = None, None
+        async def fetch_leg(leg, payload):
+            # each leg gets its own timeout and error capture so one failing
+            # leg still leaves the other result for the partial-failure path
+            try:
+                result = await asyncio.wait_for(mcp_client.invoke_tool("schedule", payload), timeout=schedule_leg_timeout)
+                log.debug("schedule leg result", node=constants.SCHEDULE, leg=leg, result=result.data)
+                return result
+            except asyncio.TimeoutError:
+                log.warning("schedule leg timed out", node=constants.SCHEDULE, leg=leg, timeout=schedule_leg_timeout)
+                return ScheduleResult({}, "timeout")
+            except Exception as e:
+                log.warning("schedule leg failed", node=constants.SCHEDULE, leg=leg, error=f"{e.__class__.__name__}: {e}")
+                return ScheduleResult({}, f"{e.__class__.__name__}: {e}")
 
-        try:
-            arrival_result = await mcp_client.invoke_tool("schedule", arrivalObj)
-            print(f"Arrival result: {arrival_result}")
-        except Exception as e:
-            print(f"Error in arrival schedule: {e}")
+        arrival_result, departure_result = await asyncio.gather(
+            fetch_leg("Arrival", arrivalObj),
+            fetch_leg("Departure", departureObj),
+        )
 
-        try:
-            departure_result = await mcp_client.invoke_tool("schedule", departureObj)
-            print(f"Departure result: {departure_result}")
-        except Exception as e:
-            print(f"Error in departure schedule: {e}")
-
-        if has_schedule_id(arrival_result) and has_schedule_id(departure_result):
+        if arrival_result.ok and departure_result.ok:
             isSchedule = True
         else:
-            print("Either arrival or departure schedule is missing scheduleId")
+            log.warning("bundle schedule missing scheduleId", node=constants.SCHEDULE, thread_id=sessionId)
+            for leg_result, leg_payload in ((arrival_result, arrivalObj), (departure_result, departureObj)):
+                if not leg_result.ok:
+                    mcp_client.invalidate_cache("schedule", leg_payload)
 
-            currentState["data"]["schedule"] = {"arrival":{} , "departure":{}}
-        if has_schedule_id(arrival_result):
-            currentState["data"]["schedule"]["arrival"] = arrival_result            
-        if has_schedule_id(departure_result):
-            currentState["data"]["schedule"]["departure"] = departure_result            
+            data["schedule"] = {"arrival":{} , "departure":{}}
+        if arrival_result.ok:
+            data["schedule"]["arrival"] = arrival_result.as_dict()
+        if departure_result.ok:
+            data["schedule"]["departure"] = departure_result.as_dict()
 
     if isSchedule:
-        print("Schedule step successful - proceeding to next step")
-        return {**currentState , "current_step": flow_serializer[current_step]}
+        log.info("schedule found", node=constants.SCHEDULE, thread_id=sessionId, bundle=isBundle)
+        return {"data": data , "current_step": flow_serializer[current_step]}
     
-    print("Schedule step failed")
-    return { **currentState , "failure_step": True , }
+    log.info("schedule not found", node=constants.SCHEDULE, thread_id=sessionId, bundle=isBundle)
+    return {"data": data , "failure_step": True}
 
 async def reservation(state: State , config):
     sessionId = config["metadata"]["thread_id"]
-    print("Executing reservation step")
+    log.debug("reservation step", node=constants.RESERVATION)
 
     mcp_client = await get_mcpInstance()
     current_step = state.get("current_step", "")
-    data = state.get("data", {})
+    data = {**state.get("data", {})}
 
     product_type = data.get("product_type")
     schedule_info = data.get("schedule_info", {})
     schedule_data = data.get("schedule", {})
 
-    try:
-        # Parse schedule_data if it's a JSON string
-        if isinstance(schedule_data, str):
-            schedule_data = json.loads(schedule_data)
-
-        # Parse nested arrival/departure if they're strings
-        if isinstance(schedule_data.get("arrival"), str):
-            schedule_data["arrival"] = json.loads(schedule_data["arrival"])
-        if isinstance(schedule_data.get("departure"), str):
-            schedule_data["departure"] = json.loads(schedule_data["departure"])
+    def schedule_id(schedule) -> int:
+        # bundle legs in checkpoints written before results were parsed once are JSON strings
+        return ScheduleResult.parse(schedule or {}).schedule_id or 0
 
+    try:
         # Get passenger counts
         passengers = schedule_info.get("pessanger_count", {})
         adult_tickets = passengers.get("adult", 0)
@@ -341,54 +361,54 @@ async def reservation(state: State , config):
                 "adulttickets": adult_tickets,
                 "childtickets": child_tickets,
                 "scheduleData": {
-                    "A": {"scheduleId": schedule_data.get("arrival", {}).get("scheduleId", 0)},
-                    "D": {"scheduleId": schedule_data.get("departure", {}).get("scheduleId", 0)}
+                    "A": {"scheduleId": schedule_id(schedule_data.get("arrival"))},
+                    "D": {"scheduleId": schedule_id(schedule_data.get("departure"))}
                 },
                 "productid": product_type,
                 "sessionid": sessionId
             }
         else:
-            schedule_id = schedule_data.get("scheduleId", 0)
+            single_id = schedule_id(schedule_data)
             reservation_data = {
                 "adulttickets": adult_tickets,
                 "childtickets": child_tickets,
                 "scheduleData": {
-                    "A": {"scheduleId": schedule_id if product_type == constants.ARRIVAL else 0},
-                    "D": {"scheduleId": schedule_id if product_type == constants.DEPARTURE else 0}
+                    "A": {"scheduleId": single_id if product_type == constants.ARRIVAL else 0},
+                    "D": {"scheduleId": single_id if product_type == constants.DEPARTURE else 0}
                 },
                 "productid": product_type,
                 "sessionid": sessionId
             }
 
-        print(f"Reservation payload: {reservation_data}")
+        log.debug("reservation request", node=constants.RESERVATION, payload=reservation_data)
 
-        # Call MCP tool
-        reservation_result = await mcp_client.invoke_tool("reservation", reservation_data)
-        print(f"Reservation result: {reservation_result}")
+        # Call MCP tool; a slow backend parks the turn on a background job
+        reservation_result = await jobs.run(
+            sessionId, constants.RESERVATION, reservation_data,
+            lambda: mcp_client.invoke_tool("reservation", reservation_data),
+            "Your reservation is being processed, this can take a moment.",
+        )
+        log.info("reservation result", node=constants.RESERVATION, result=reservation_result.data)
 
-        data["reservation"] = json.loads(reservation_result)
-        if data["reservation"]["isStandBy"]:
-            return {
-            "data":data,
-            "failure_step": True
-            }
-        elif data["reservation"]["data"].get("cartitemid"):
-            # Proceed to next step
-            return {
-                "data": data,
-                "current_step": flow_serializer[current_step],
-            }
-        else:
+        data["reservation"] = reservation_result.as_dict()
+        if not reservation_result.ok:
+            # standby or no cart item created, a retry has to reach the backend
+            mcp_client.invalidate_cache("reservation", reservation_data)
             return {
             "data":data,
             "failure_step": True
             }
+        # Proceed to next step
+        return {
+            "data": data,
+            "current_step": flow_serializer[current_step],
+        }
+    except GraphInterrupt:
+        raise
     except Exception as e:
-        print(f"Error during reservation: {e.__class__.__name__}: {e}")
-        print_exception_group(e)
+        log.exception("reservation failed", node=constants.RESERVATION)
 
         return {
-            **state,
             "failure_step": True
         }
         
@@ -398,7 +418,7 @@ async def contact(state: State , config):
         sessionId = config["metadata"]["thread_id"]
         mcp_client = await get_mcpInstance()
         current_step = state["current_step"]
-        print("Executing contact step")
+        log.debug("contact step", node=constants.CONTACT, thread_id=sessionId)
 
         # Parse reservation JSON string to dict
         reservation = state["data"]["reservation"]
@@ -416,10 +436,19 @@ async def contact(state: State , config):
             "sessionid":sessionId
         }
 
-        print(f"Contact payload: {contact_payload}")
+        log.debug("contact request", node=constants.CONTACT, payload=contact_payload)
 
         contact_response = await mcp_client.invoke_tool("contact", contact_payload)
-        print(f"Contact response: {contact_response}")
+        log.info("contact result", node=constants.CONTACT, result=contact_response.data)
+        if not contact_response.ok:
+            log.warning("contact not saved", node=constants.CONTACT, error=contact_response.error_message)
+            # a retry has to reach the backend, not the dedupe window
+            mcp_client.invalidate_cache("contact", contact_payload)
+            return {
+                # failure_handler reads the statusMessage from here
+                "data": {**state["data"], "contact": contact_response.as_dict()},
+                "failure_step": True
+            }
         cart = state["data"].get("cart", {})
         # structured_llm = llm.with_structured_output(common_schema_without_human_input)
         # response = structured_llm.invoke([SystemMessage(content=inst_map["summarize"])] + state["messages"])
@@ -445,10 +474,10 @@ async def contact(state: State , config):
         data = {"cart": {**state["data"].get("cart", {}) , **cartItems}}
         obi_cart = cart_formulator(cartItems)
         return {
-            **state,
             "current_step": flow_serializer[current_step],
             "data": data,
-            "messages":[],
+            # the item is in the cart, its conversation starts over
+            **reset_messages(),
             "client_events":[{
                     "type": "client_event",
                     "event": "add_to_cart",
@@ -457,33 +486,25 @@ async def contact(state: State , config):
         }
 
     except Exception as e:
-        print(f"Error in contact: {e.__class__.__name__}: {e}")
-        traceback.print_exc()  # Logs full traceback to console
-
-        # For TaskGroup or ExceptionGroup (Python 3.11+), drill into nested errors
-        if hasattr(e, 'exceptions'):
-            for i, sub in enumerate(e.exceptions, start=1):
-                print(f"Sub-exception {i}: {type(sub).__name__} - {sub}")
-                if hasattr(sub, '__traceback__'):
-                    traceback.print_tb(sub.__traceback__)
+        # the traceback includes every sub-exception of an ExceptionGroup
+        log.exception("contact failed", node=constants.CONTACT)
 
         return {
-            **state,
             "failure_step": True
         }
         
-def show_cart(state: State):
+async def show_cart(state: State):
     current_step = state.get("current_step", "")
-    print("Running cart summary")
+    log.debug("cart summary", node=constants.CART)
 
     # Extract cart safely
     cart = state.get("data", {}).get("cart", {})
 
     # Check if cart is present
     if not cart:
-        print("Cart is missing or empty")
+        log.info("cart is empty", node=constants.CART)
         return {
-            "messages": state["messages"] + [AIMessage(content="Your cart is currently empty. Please add items before proceeding.")],
+            "messages": [AIMessage(content="Your cart is currently empty. Please add items before proceeding.")],
             "current_step": current_step,
         }
 
@@ -491,27 +512,27 @@ def show_cart(state: State):
     try:
         prompt = cart_summary_instruction_prompt.format(cart = list(cart_item["summary"] for cart_item in cart.values()))
     except Exception as e:
-        print(f"Failed to format cart summary prompt: {e}")
+        log.exception("cart summary prompt formatting failed", node=constants.CART)
         raise ValueError("Prompt formatting failed due to cart content issue.")
 
     sm = SystemMessage(content=prompt)
 
     # Call structured LLM
-    structuredllm = llm.with_structured_output(schema_map.get(current_step))
+    structuredllm = structured_llm_for(current_step)
     try:
-        response = structuredllm.invoke([sm] + state.get("messages", []))
+        response = await structuredllm.ainvoke(history.prompt(sm, state))
     except Exception as e:
-        print(f"Error invoking structured LLM: {e}")
+        log.exception("cart summary LLM call failed", node=constants.CART)
         raise
 
-    print(f"Cart summary response: {response}")
+    log.debug("cart summary response", node=constants.CART, response=response)
 
     # Handle human input interrupt
     if response.get("human_input"):
-        print(f"Triggering interrupt: {response['message']}")
+        log.debug("interrupt", node=constants.CART)
         user_input = interrupt(value=response["message"])
         return {
-            "messages": state["messages"]  + [ AIMessage(content=response["message"] , client_events=[{
+            "messages": [AIMessage(content=response["message"] , client_events=[{
                     "type": "client_event",
                     "event": "add_to_cart",
                     "payload": {"cart": cart_formulator(state["data"]["cart"])}
@@ -523,21 +544,21 @@ def show_cart(state: State):
     direction = response.get("direction")
     if direction == "end":
         return {
-            "messages": state["messages"]  + [AIMessage(content=response["message"] )],
+            "messages": [AIMessage(content=response["message"] )],
             "current_step": END,
             "client_events": []
             
         }
     elif direction == "direction":
         return {
-            "messages": state["messages"]  + [AIMessage(content=response["message"] )],
+            "messages": [AIMessage(content=response["message"] )],
             "current_step": constants.PRODUCT_TYPE,
             "client_events": []
             
         }
     elif direction == "payment":
         return {
-            "messages": state["messages"]  + [AIMessage(content=response["message"] )],
+            "messages": [AIMessage(content=response["message"] )],
             "current_step": END , 
             "client_events": [{
                     "type": "client_event",
@@ -548,7 +569,7 @@ def show_cart(state: State):
 
     # Default fallback
     return {
-        "messages": state["messages"]  + [AIMessage(content="Cart processed, but no clear next step. Please continue.")],
+        "messages": [AIMessage(content="Cart processed, but no clear next step. Please continue.")],
         "current_step": current_step,
         "client_events": []
         
@@ -563,7 +584,7 @@ async def payment(state: State , config):
     
     if not cart:
         return {
-            "messages": state["messages"] + [AIMessage(content="No items in cart to process payment.")],
+            "messages": [AIMessage(content="No items in cart to process payment.")],
             "current_step": END,
         }
     
@@ -677,50 +698,54 @@ async def payment(state: State , config):
         }
     }
     
-    print(f"Payment state: {paymentState}")
+    log.debug("payment request", node=constants.PAYMENT, payload=paymentState)
     
     try:
         # Call the payment tool
-        payment_result = await mcp_client.invoke_tool("payment2", {"state":paymentState})
-        print(f"Payment result: {payment_result}")
-        
-        # Parse the result if it's a JSON string
-        if isinstance(payment_result, str):
-            try:
-                payment_result = json.loads(payment_result)
-            except json.JSONDecodeError:
-                print(f"Failed to parse payment result as JSON: {payment_result}")
-                payment_result = {"error": "Invalid response format"}
+        payment_result = await jobs.run(
+            sessionId, constants.PAYMENT, {"state": paymentState},
+            lambda: mcp_client.invoke_tool("payment2", {"state": paymentState}),
+            "Your payment is being processed, this can take a moment.",
+        )
+        log.info("payment result", node=constants.PAYMENT, result=payment_result.data)
+        if payment_result.error:
+            log.warning("payment result is not JSON", node=constants.PAYMENT)
         
         # Check if payment was successful
-        if payment_result and not payment_result.get("error"):
+        if payment_result.ok:
             return {
-                "messages": state["messages"] + [AIMessage(content=f"🎉 Payment processed successfully! Total amount: ${total_amount}. Your booking confirmation will be sent to {primary_contact_email}.")],
+                "messages": [AIMessage(content=f"🎉 Payment processed successfully! Total amount: ${total_amount}. Your booking confirmation will be sent to {primary_contact_email}.")],
                 "current_step": END,
             }
         else:
-            error_msg = payment_result.get("error", "Unknown payment error")
+            mcp_client.invalidate_cache("payment2", {"state": paymentState})
+            error_msg = payment_result.error_message
             return {
-                "messages": state["messages"] + [AIMessage(content=f"❌ Payment failed: {error_msg}. Please try again.")],
+                "messages": [AIMessage(content=f"❌ Payment failed: {error_msg}. Please try again.")],
                 "current_step": END,
             }
+    except GraphInterrupt:
+        raise
     except Exception as e:
-        print(f"Error in payment processing: {e}")
+        log.exception("payment failed", node=constants.PAYMENT)
         return {
-            "messages": state["messages"] + [AIMessage(content="❌ Payment processing failed due to a technical error. Please try again later.")],
+            "messages": [AIMessage(content="❌ Payment processing failed due to a technical error. Please try again later.")],
             "current_step": END,
         }
 
-graph.add_node(constants.DIRECTION , classifier)
-graph.add_node(constants.PRODUCT_TYPE , info_collector)
-graph.add_node(constants.SCHEDULE , schedule)
-graph.add_node(constants.SCHEDULE_INFO , info_collector)
-graph.add_node(constants.RESERVATION , reservation)
-graph.add_node(constants.CONTACT , contact)
-graph.add_node(constants.CONTACT_INFO , info_collector)
-graph.add_node(constants.FAILURE_HANDLER , failure_handler)
-graph.add_node(constants.CART , show_cart)
-graph.add_node(constants.PAYMENT , payment)
+def add_node(name: str, node):
+    graph.add_node(name, metrics.timed_node(name, node))
+
+add_node(constants.DIRECTION , with_history(classifier))
+add_node(constants.PRODUCT_TYPE , with_history(info_collector))
+add_node(constants.SCHEDULE , schedule)
+add_node(constants.SCHEDULE_INFO , with_history(info_collector))
+add_node(constants.RESERVATION , reservation)
+add_node(constants.CONTACT , contact)
+add_node(constants.CONTACT_INFO , with_history(info_collector))
+add_node(constants.FAILURE_HANDLER , with_history(failure_handler))
+add_node(constants.CART , with_history(show_cart))
+add_node(constants.PAYMENT , payment)
 
 graph.set_entry_point(constants.DIRECTION)
 
@@ -0,0 +1,93 @@
+# checkpoint_retention.py
+# Bounds each thread's checkpoint history. Every node transition writes a
+# checkpoint (failure_handler retries and info_collector re-prompts add
+# several per turn) and none were ever removed, so long sessions grew
+# without limit. Threads are marked after each turn and pruned in the
+# background every `checkpoint_prune_interval` seconds down to the latest
+# `checkpoint_keep` checkpoints plus the latest `checkpoint_keep_interrupts`
+# that hold an interrupt (one per point the graph paused for the user).
+# checkpoint_keep=0 turns retention off.
+import asyncio
+import os
+
+from dotenv import load_dotenv
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+from src.services.checkpointer import checkpoint_thread_ids, prune_checkpoints
+from src.services.logger import get_logger
+
+load_dotenv()
+
+log = get_logger("checkpoint_retention")
+
+
+class CheckpointRetention:
+    def __init__(
+        self,
+        checkpointer: BaseCheckpointSaver,
+        keep: int = int(os.getenv("checkpoint_keep", "10")),
+        keep_interrupts: int = int(os.getenv("checkpoint_keep_interrupts", "5")),
+        interval: float = float(os.getenv("checkpoint_prune_interval", "5")),
+    ):
+        self.checkpointer = checkpointer
+        self.keep = keep
+        self.keep_interrupts = keep_interrupts
+        self.interval = interval
+        # threads written to since the last sweep
+        self.dirty: set[str] = set()
+        # passes that deleted something; one thread is pruned on many passes
+        self.pruned = {"passes": 0, "checkpoints": 0}
+        self.task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.keep > 0
+
+    def mark(self, thread_id):
+        if self.enabled:
+            self.dirty.add(str(thread_id))
+
+    async def prune(self, thread_id: str) -> int:
+        deleted = await prune_checkpoints(self.checkpointer, thread_id, self.keep, self.keep_interrupts)
+        if deleted:
+            self.pruned["passes"] += 1
+            self.pruned["checkpoints"] += deleted
+            log.debug("checkpoints pruned", thread_id=thread_id, deleted=deleted)
+        return deleted
+
+    async def sweep(self):
+        threads, self.dirty = self.dirty, set()
+        for thread_id in threads:
+            try:
+                await self.prune(thread_id)
+            except Exception:
+                log.exception("checkpoint prune failed", thread_id=thread_id)
+
+    async def run(self):
+        # history persisted by a previous process is trimmed once at startup
+        for thread_id in await asyncio.to_thread(checkpoint_thread_ids, self.checkpointer):
+            self.mark(thread_id)
+        while True:
+            await self.sweep()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.enabled and (self.task is None or self.task.done()):
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def stats(self) -> dict:
+        return {
+            "keep": self.keep,
+            "keep_interrupts": self.keep_interrupts,
+            "pending_threads": len(self.dirty),
+            "pruned": dict(self.pruned),
+        }
@@ -0,0 +1,609 @@
+# checkpointer.py
+# Checkpointer backends for the compiled graph, selected with the
+# `checkpoint_backend` env variable:
+#   memory - in-process MemorySaver (default, single worker only)
+#   sqlite - SQLite file in WAL mode; every worker on the box pointing at the
+#            same `checkpoint_path` shares conversation state
+# Values are encoded by the serializer from `checkpoint_serde` (see
+# src/services/serde.py); the SQLite backend also shares repeated
+# sub-objects between a thread's checkpoints through the `shared` table.
+# prune_checkpoints() trims a thread's history for the retention service
+# (src/services/checkpoint_retention.py).
+import asyncio
+import atexit
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Sequence
+
+from dotenv import load_dotenv
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.serde.types import INTERRUPT
+
+from src.services.serde import SHARED_PREFIX, Sharing, get_serde
+
+load_dotenv()
+
+# metadata is filtered on and always read back as plain msgpack
+metadata_serde = JsonPlusSerializer()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS shared (
+    thread_id TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    refs TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, hash)
+);
+"""
+
+INSERT_CHECKPOINT = "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?)"
+INSERT_BLOB = "INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?, ?, ?)"
+INSERT_WRITE = "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+INSERT_WRITE_IGNORE = "INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+INSERT_SHARED = "INSERT OR IGNORE INTO shared VALUES (?, ?, ?, ?, ?)"
+
+
+class SqliteCheckpointer(BaseCheckpointSaver[str]):
+    """Write-behind SQLite checkpointer.
+
+    Only channels that changed in a step are written (one blob row per channel
+    version), and rows are buffered and committed in a single transaction once
+    `batch_size` rows are pending, `flush_interval` seconds have passed, or a
+    read needs them. Blobs and writes keep sub-objects of at least
+    `share_min_bytes` in the per-thread `shared` table, stored once by
+    content hash (0 turns sharing off).
+    """
+
+    def __init__(
+        self,
+        path: str = "checkpoints.sqlite",
+        batch_size: int = 64,
+        flush_interval: float = 0.05,
+        serde=None,
+        share_min_bytes: int = int(os.getenv("checkpoint_share_min_bytes", "128")),
+        shared_cache_size: int = int(os.getenv("checkpoint_shared_cache_size", "4096")),
+    ):
+        super().__init__(serde=serde)
+        self.sharing = Sharing(self.serde, share_min_bytes)
+        # hash -> packed (type, blob, child hashes); content-addressed, so
+        # valid for every thread and process
+        self.shared_cache: OrderedDict[str, tuple] = OrderedDict()
+        self.shared_cache_size = shared_cache_size
+        self.cache_lock = threading.Lock()
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.pending: list[tuple[str, tuple]] = []
+        self.last_flush = time.monotonic()
+        self._flush_task: asyncio.Task | None = None
+        # pruning gets its own connection so the event loop can keep
+        # buffering writes (self.lock) while a prune transaction runs
+        self.prune_conn: sqlite3.Connection | None = None
+        self.prune_lock = threading.Lock()
+        atexit.register(self.flush)
+
+    # write buffer - Chat.run calls aflush() at the end of every turn, so
+    # batching only spans the checkpoints written within one graph pass
+    def _buffer(self, rows: list[tuple[str, tuple]]) -> bool:
+        # returns True once the batch is due for a commit
+        with self.lock:
+            self.pending.extend(rows)
+            return len(self.pending) >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval
+
+    async def _abuffer(self, rows: list[tuple[str, tuple]]):
+        if self._buffer(rows) and len(self.pending) >= self.batch_size:
+            await asyncio.to_thread(self.flush)
+        else:
+            self._schedule_flush()
+
+    def flush(self):
+        with self.lock:
+            if not self.pending:
+                return
+            rows, self.pending = self.pending, []
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, params in rows:
+                    self.conn.execute(sql, params)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                self.pending = rows + self.pending
+                raise
+            self.last_flush = time.monotonic()
+
+    def _schedule_flush(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await asyncio.to_thread(self.flush)
+
+    def _query(self, sql: str, params: tuple) -> list[tuple]:
+        self.flush()
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # shared objects
+    def _cached(self, digest: str) -> tuple | None:
+        with self.cache_lock:
+            return self.shared_cache.get(digest)
+
+    def _remember(self, digest: str, row: tuple):
+        with self.cache_lock:
+            self.shared_cache[digest] = row
+            self.shared_cache.move_to_end(digest)
+            if len(self.shared_cache) > self.shared_cache_size:
+                self.shared_cache.popitem(last=False)
+
+    def _dump(self, thread_id: str, value: Any, rows: list) -> tuple[str, bytes]:
+        objects: dict = {}
+        type_, data = self.sharing.dump(value, objects)
+        for digest, (raw_type, raw, children) in objects.items():
+            row = self._cached(digest)
+            if row is None:
+                row = (*self.sharing.pack(raw_type, raw), children)
+                self._remember(digest, row)
+            # always written: another worker may have deleted the thread's copy
+            rows.append((INSERT_SHARED, (thread_id, digest, row[0], row[1], ",".join(row[2]))))
+        return type_, data
+
+    def _fetch_shared(self, thread_id: str, hashes: Iterable[str]) -> dict:
+        found, missing = {}, []
+        for digest in hashes:
+            row = self._cached(digest)
+            if row is None:
+                missing.append(digest)
+            else:
+                found[digest] = row
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            rows = self._query(
+                f"SELECT hash, type, blob, refs FROM shared WHERE thread_id = ? AND hash IN ({','.join('?' * len(chunk))})",
+                (thread_id, *chunk),
+            )
+            for digest, type_, blob, refs in rows:
+                found[digest] = (type_, blob, tuple(refs.split(",")) if refs else ())
+                self._remember(digest, found[digest])
+        return found
+
+    def _load(self, thread_id: str, type_: str, blob: bytes) -> Any:
+        return self.sharing.load(type_, blob, lambda hashes: self._fetch_shared(thread_id, hashes))
+
+    # reads
+    def _load_blobs(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> dict[str, Any]:
+        if not versions:
+            return {}
+        keys = list(versions.items())
+        where = " OR ".join("(channel = ? AND version = ?)" for _ in keys)
+        params = (thread_id, checkpoint_ns, *[str(p) for kv in keys for p in kv])
+        rows = self._query(
+            f"SELECT channel, type, blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND ({where})",
+            params,
+        )
+        return {channel: self._load(thread_id, type_, blob) for channel, type_, blob in rows if type_ != "empty"}
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, type_, checkpoint_b, metadata_b = row
+        checkpoint = self.serde.loads_typed((type_, checkpoint_b))
+        writes = self._query(
+            "SELECT task_id, channel, type, value FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        )
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_blobs(thread_id, checkpoint_ns, checkpoint["channel_versions"]),
+            },
+            metadata=metadata_serde.loads_typed(("msgpack", metadata_b)),
+            pending_writes=[(task_id, channel, self._load(thread_id, t, v)) for task_id, channel, t, v in writes],
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_checkpoint_id}}
+                if parent_checkpoint_id
+                else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        select = "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+        if checkpoint_id := get_checkpoint_id(config):
+            rows = self._query(select + " AND checkpoint_id = ?", (thread_id, checkpoint_ns, checkpoint_id))
+        else:
+            rows = self._query(select + " ORDER BY checkpoint_id DESC LIMIT 1", (thread_id, checkpoint_ns))
+        if not rows:
+            return None
+        return self._to_tuple(thread_id, checkpoint_ns, rows[0])
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        sql = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata FROM checkpoints"
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(str(config["configurable"]["thread_id"]))
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY checkpoint_id DESC"
+
+        for thread_id, checkpoint_ns, *row in self._query(sql, tuple(params)):
+            if filter:
+                metadata = metadata_serde.loads_typed(("msgpack", row[-1]))
+                if not all(metadata.get(k) == v for k, v in filter.items()):
+                    continue
+            if limit is not None:
+                if limit <= 0:
+                    break
+                limit -= 1
+            yield self._to_tuple(thread_id, checkpoint_ns, tuple(row))
+
+    # writes
+    def _checkpoint_rows(self, config, checkpoint, metadata, new_versions) -> tuple[list, RunnableConfig]:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        c = checkpoint.copy()
+        values: dict[str, Any] = c.pop("channel_values")
+        rows = []
+        for channel, version in new_versions.items():
+            type_, blob = self._dump(thread_id, values[channel], rows) if channel in values else ("empty", b"")
+            rows.append((INSERT_BLOB, (thread_id, checkpoint_ns, channel, str(version), type_, blob)))
+        type_, checkpoint_b = self.serde.dumps_typed(c)
+        _, metadata_b = metadata_serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        rows.append((
+            INSERT_CHECKPOINT,
+            (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"), type_, checkpoint_b, metadata_b),
+        ))
+        return rows, {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def _write_rows(self, config, writes, task_id, task_path) -> list:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # special writes (errors, interrupts) replace, regular writes keep the first value
+        sql = INSERT_WRITE if all(channel in WRITES_IDX_MAP for channel, _ in writes) else INSERT_WRITE_IGNORE
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, value_b = self._dump(thread_id, value, rows)
+            rows.append((sql, (thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx), channel, type_, value_b, task_path)))
+        return rows
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        rows, next_config = self._checkpoint_rows(config, checkpoint, metadata, new_versions)
+        if self._buffer(rows):
+            self.flush()
+        return next_config
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        if self._buffer(self._write_rows(config, writes, task_id, task_path)):
+            self.flush()
+
+    def thread_ids(self) -> List[str]:
+        return [row[0] for row in self._query("SELECT DISTINCT thread_id FROM checkpoints", ())]
+
+    def size_bytes(self) -> int:
+        return sum(
+            self._query(query, ())[0][0] or 0
+            for query in (
+                "SELECT SUM(LENGTH(checkpoint) + LENGTH(metadata)) FROM checkpoints",
+                "SELECT SUM(LENGTH(blob)) FROM blobs",
+                "SELECT SUM(LENGTH(value)) FROM writes",
+                "SELECT SUM(LENGTH(blob)) FROM shared",
+            )
+        )
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.flush()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for table in ("checkpoints", "blobs", "writes", "shared"):
+                    self.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (str(thread_id),))
+                self.conn.execute("COMMIT")
+            except Exception:
+                # the connection is shared with the flusher, never leave it mid-transaction
+                self.conn.execute("ROLLBACK")
+                raise
+
+    # retention
+    def prune(self, thread_id: str, keep: int, keep_interrupts: int = 0) -> int:
+        """Delete all but the thread's latest `keep` checkpoints and latest
+        `keep_interrupts` interrupted ones, with the writes, blobs and shared
+        objects nothing retained uses any more. Returns checkpoints deleted."""
+        thread_id = str(thread_id)
+        # rows this process buffered are part of what is being pruned
+        self.flush()
+        with self.prune_lock:
+            if self.prune_conn is None:
+                self.prune_conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            conn = self.prune_conn
+            # one write transaction, so no other worker commits a checkpoint
+            # between deciding what is live and deleting the rest
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                deleted = sum(
+                    self._prune_ns(conn, thread_id, checkpoint_ns, keep, keep_interrupts)
+                    for (checkpoint_ns,) in conn.execute("SELECT DISTINCT checkpoint_ns FROM checkpoints WHERE thread_id = ?", (thread_id,)).fetchall()
+                )
+                if deleted:
+                    self._collect_shared(conn, thread_id)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return deleted
+
+    def _prune_ns(self, conn: sqlite3.Connection, thread_id: str, checkpoint_ns: str, keep: int, keep_interrupts: int) -> int:
+        key = (thread_id, checkpoint_ns)
+        ids = [row[0] for row in conn.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC", key
+        )]
+        if len(ids) <= keep:
+            return 0
+        interrupted = [row[0] for row in conn.execute(
+            "SELECT DISTINCT checkpoint_id FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? ORDER BY checkpoint_id DESC",
+            (*key, INTERRUPT),
+        )]
+        kept = retained(ids, interrupted, keep, keep_interrupts)
+        drop = [checkpoint_id for checkpoint_id in ids if checkpoint_id not in kept]
+        for start in range(0, len(drop), 500):
+            chunk = drop[start:start + 500]
+            for table in ("checkpoints", "writes"):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id IN ({','.join('?' * len(chunk))})",
+                    (*key, *chunk),
+                )
+        # unchanged channels point at blobs written by older checkpoints
+        live = set()
+        for type_, checkpoint_b in conn.execute("SELECT type, checkpoint FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?", key):
+            live.update((channel, str(version)) for channel, version in self.serde.loads_typed((type_, checkpoint_b))["channel_versions"].items())
+        stale = [row for row in conn.execute("SELECT channel, version FROM blobs WHERE thread_id = ? AND checkpoint_ns = ?", key).fetchall() if row not in live]
+        conn.executemany(
+            "DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+            [(*key, channel, version) for channel, version in stale],
+        )
+        return len(drop)
+
+    def _collect_shared(self, conn: sqlite3.Connection, thread_id: str):
+        children = {
+            digest: refs.split(",") if refs else []
+            for digest, refs in conn.execute("SELECT hash, refs FROM shared WHERE thread_id = ?", (thread_id,))
+        }
+        if not children:
+            return
+        todo: set = set()
+        roots = conn.execute("SELECT type, blob FROM blobs WHERE thread_id = ?", (thread_id,)).fetchall()
+        roots += conn.execute("SELECT type, value FROM writes WHERE thread_id = ?", (thread_id,)).fetchall()
+        for type_, data in roots:
+            if type_ and type_.startswith(SHARED_PREFIX):
+                Sharing.refs(self.serde.loads_typed((type_[len(SHARED_PREFIX):], data)), todo)
+        reachable: set = set()
+        while todo:
+            digest = todo.pop()
+            if digest not in reachable:
+                reachable.add(digest)
+                todo.update(children.get(digest, ()))
+        # a worker writing one of these later re-inserts it, see _dump()
+        conn.executemany(
+            "DELETE FROM shared WHERE thread_id = ? AND hash = ?",
+            [(thread_id, digest) for digest in children if digest not in reachable],
+        )
+
+    # async - sqlite calls run off the event loop
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        rows, next_config = self._checkpoint_rows(config, checkpoint, metadata, new_versions)
+        await self._abuffer(rows)
+        return next_config
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await self._abuffer(self._write_rows(config, writes, task_id, task_path))
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: str | None, channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    async def aflush(self):
+        await asyncio.to_thread(self.flush)
+
+    def close(self):
+        atexit.unregister(self.flush)
+        self.flush()
+        self.conn.close()
+        if self.prune_conn is not None:
+            self.prune_conn.close()
+
+
+def retained(ids: list[str], interrupted: list[str], keep: int, keep_interrupts: int) -> set[str]:
+    """Checkpoint ids to keep, given all ids and the interrupted ones, newest first."""
+    # the latest checkpoint is where the next turn starts, so it always stays
+    return set(ids[:max(keep, 1)]) | set(interrupted[:keep_interrupts])
+
+
+def prune_memory(saver: MemorySaver, thread_id: str, keep: int, keep_interrupts: int = 0) -> int:
+    deleted = 0
+    for checkpoint_ns, checkpoints in list(saver.storage.get(thread_id, {}).items()):
+        ids = sorted(checkpoints, reverse=True)
+        if len(ids) <= keep:
+            continue
+        interrupted = [
+            checkpoint_id for checkpoint_id in ids
+            if any(write[1] == INTERRUPT for write in saver.writes.get((thread_id, checkpoint_ns, checkpoint_id), {}).values())
+        ]
+        kept = retained(ids, interrupted, keep, keep_interrupts)
+        versions = lambda checkpoint_id: saver.serde.loads_typed(checkpoints[checkpoint_id][0])["channel_versions"].items()
+        live = {version for checkpoint_id in kept for version in versions(checkpoint_id)}
+        for checkpoint_id in ids:
+            if checkpoint_id in kept:
+                continue
+            # every blob is referenced by the checkpoint that wrote it
+            for channel, version in versions(checkpoint_id):
+                if (channel, version) not in live:
+                    saver.blobs.pop((thread_id, checkpoint_ns, channel, version), None)
+            del checkpoints[checkpoint_id]
+            saver.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            deleted += 1
+    return deleted
+
+
+async def prune_checkpoints(saver: BaseCheckpointSaver, thread_id, keep: int, keep_interrupts: int = 0) -> int:
+    """Trim a thread to its latest `keep` checkpoints plus the latest `keep_interrupts` interrupted ones."""
+    if isinstance(saver, SqliteCheckpointer):
+        return await asyncio.to_thread(saver.prune, str(thread_id), keep, keep_interrupts)
+    if isinstance(saver, MemorySaver):
+        # plain dicts, changed on the event loop like every other access
+        return prune_memory(saver, str(thread_id), keep, keep_interrupts)
+    return 0
+
+
+def checkpoint_thread_ids(saver: BaseCheckpointSaver) -> list[str]:
+    if isinstance(saver, SqliteCheckpointer):
+        return saver.thread_ids()
+    if isinstance(saver, MemorySaver):
+        return [str(thread_id) for thread_id in list(saver.storage)]
+    return []
+
+
+def checkpoint_bytes(saver: BaseCheckpointSaver) -> int:
+    """Serialized bytes currently held by the checkpointer."""
+    if isinstance(saver, SqliteCheckpointer):
+        return saver.size_bytes()
+    if isinstance(saver, MemorySaver):
+        size = sum(len(blob) for _, blob in list(saver.blobs.values()))
+        for namespaces in list(saver.storage.values()):
+            for checkpoints in list(namespaces.values()):
+                size += sum(len(c[1]) + len(m[1]) for c, m, _ in list(checkpoints.values()))
+        for writes in list(saver.writes.values()):
+            size += sum(len(value[1]) for _, _, value, _ in list(writes.values()))
+        return size
+    return 0
+
+
+def get_checkpointer(backend: str | None = None) -> BaseCheckpointSaver:
+    backend = (backend or os.getenv("checkpoint_backend", "memory")).lower()
+    if backend == "memory":
+        return MemorySaver(serde=get_serde())
+    if backend == "sqlite":
+        return SqliteCheckpointer(
+            path=os.getenv("checkpoint_path", "checkpoints.sqlite"),
+            batch_size=int(os.getenv("checkpoint_batch_size", "64")),
+            flush_interval=float(os.getenv("checkpoint_flush_interval", "0.05")),
+            serde=get_serde(),
+        )
+    raise ValueError(f"Unknown checkpoint backend '{backend}'. Use 'memory' or 'sqlite'.")
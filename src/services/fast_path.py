@@ -0,0 +1,219 @@
+# fast_path.py
+# Rule-based extraction for info_collector. Plainly worded answers ("arrival",
+# "AF2859 into SIA on 8 June 2030, 2 adults") fill the same fields the
+# structured LLM call would; anything ambiguous, relative or incomplete is
+# left to the LLM.
+import os
+import re
+from datetime import date, datetime
+from typing import Optional
+
+from dotenv import load_dotenv
+
+import src.utils.constants as constants
+from src.services.history import is_human
+
+load_dotenv()
+
+AIRPORTS = [
+    (re.compile(r"\b(sia|sangster\w*|club mobay|montego bay|mobay|mbj)\b", re.I), "SIA"),
+    (re.compile(r"\b(nmia|norman manley|club kingston|kingston|kin)\b", re.I), "NMIA"),
+]
+
+BUNDLE = re.compile(r"\b(arrival|arriving)\s*(and|&|\+|/)\s*(departure|departing)\b|\b(departure|departing)\s*(and|&|\+|/)\s*(arrival|arriving)\b|\bboth( lounges?| of them| please)?\b|\bbundle\b|\bpackage\b", re.I)
+ARRIVAL = re.compile(r"\b(arrival|arriving|arrive|landing)\b", re.I)
+DEPARTURE = re.compile(r"\b(departure|departing|depart|leaving)\b", re.I)
+OPTION = re.compile(r"^\W*(?:option\s*)?([123])\W*$", re.I)
+OPTIONS = {"1": constants.ARRIVAL, "2": constants.DEPARTURE, "3": constants.BUNDLE}
+
+# airline designator (2 chars, at least one letter) + 1-4 digit flight number
+FLIGHT = re.compile(r"\b((?:[A-Z]{2}|[A-Z]\d|\d[A-Z]) ?\d{1,4}|[a-z]{2}\d{2,4})\b")
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+MONTH = r"(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?"
+DAY = r"(\d{1,2})(?:st|nd|rd|th)?(?!\d)"
+DAY_MONTH = re.compile(rf"\b{DAY}\s+(?:of\s+)?{MONTH}\b,?(?:\s+(\d{{4}}))?", re.I)
+MONTH_DAY = re.compile(rf"\b{MONTH}\s+{DAY},?(?:\s+(\d{{4}}))?", re.I)
+ISO_DATE = re.compile(r"\b(20\d{2})[-/.]?(\d{2})[-/.]?(\d{2})\b")
+NUMERIC_DATE = re.compile(r"\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{2}|\d{4})\b")
+RELATIVE_DATE = re.compile(r"\b(today|tonight|tomorrow|yesterday|next (week|month|\w+day)|this (week|\w+day)|in \w+ (days?|weeks?))\b", re.I)
+
+NUMBERS = {"no": 0, "zero": 0, "one": 1, "a": 1, "an": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+           "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10}
+COUNT = r"(\d{1,2}|no|zero|one|a|an|two|three|four|five|six|seven|eight|nine|ten)"
+ADULTS = re.compile(rf"\b{COUNT}\s+(adults?|grown[- ]?ups?)\b", re.I)
+CHILDREN = re.compile(rf"\b{COUNT}\s+(child|children|kids?|minors?)\b", re.I)
+SOLO = re.compile(r"\b(just me|only me|myself only|just myself|travell?ing alone)\b", re.I)
+
+
+def human_texts(state: dict) -> list:
+    return [str(message.content if hasattr(message, "content") else message.get("content", ""))
+            for message in state.get("messages") or [] if is_human(message)]
+
+
+def parse_count(word: str) -> int:
+    return int(word) if word.isdigit() else NUMBERS[word.lower()]
+
+
+def make_date(year, month: int, day: int, today: date) -> Optional[date]:
+    try:
+        if year is None:
+            # no year given: the next occurrence, as a person would read it
+            found = date(today.year, month, day)
+            return found if found >= today else date(today.year + 1, month, day)
+        year = int(year)
+        return date(year + 2000 if year < 100 else year, month, day)
+    except ValueError:
+        return None
+
+
+def find_dates(text: str, today: date) -> Optional[list]:
+    """Travel dates in the order they are mentioned, or None when a date can't be read safely."""
+    if RELATIVE_DATE.search(text):
+        return None
+    found = []
+    for pattern, order in ((DAY_MONTH, "dmy"), (MONTH_DAY, "mdy")):
+        for match in pattern.finditer(text):
+            day, month, year = (match[1], match[2], match[3]) if order == "dmy" else (match[2], match[1], match[3])
+            found.append((match.start(), make_date(year, MONTHS[month[:3].lower()], int(day), today)))
+    for match in ISO_DATE.finditer(text):
+        found.append((match.start(), make_date(match[1], int(match[2]), int(match[3]), today)))
+    for match in NUMERIC_DATE.finditer(text):
+        first, second = int(match[1]), int(match[2])
+        if first <= 12 and second <= 12 and first != second:
+            return None  # 03/04 could be either way round
+        day, month = (first, second) if first > 12 else (second, first)
+        found.append((match.start(), make_date(match[3], month, day, today)))
+    if any(found_date is None or found_date < today for _, found_date in found):
+        return None
+    found.sort(key=lambda item: item[0])
+    return list(dict.fromkeys(found_date for _, found_date in found))
+
+
+class FastPathExtractor:
+    steps = (constants.PRODUCT_TYPE, constants.SCHEDULE_INFO)
+
+    def __init__(
+        self,
+        enabled: bool = os.getenv("fast_path_enabled", "true").lower() == "true",
+        min_confidence: float = float(os.getenv("fast_path_min_confidence", "1.0")),
+    ):
+        self.enabled = enabled
+        self.min_confidence = min_confidence
+        self.counters = {step: {"attempts": 0, "hits": 0, "llm_calls": 0, "llm_seconds": 0.0} for step in self.steps}
+
+    def extract(self, step: str, state: dict, today: Optional[date] = None) -> Optional[dict]:
+        """A response shaped like the structured LLM output, or None to fall back to the LLM."""
+        if not self.enabled or step not in self.steps:
+            return None
+        self.counters[step]["attempts"] += 1
+        texts = human_texts(state)
+        if step == constants.PRODUCT_TYPE:
+            value, confidence = self.product_type(texts[-1:])
+        else:
+            # only this item's answers are here: contact() resets the
+            # messages once an item is in the cart (reset_messages())
+            value, confidence = self.schedule_info(texts, state["data"]["product_type"], today or datetime.now().date())
+        if value is None or confidence < self.min_confidence:
+            return None
+        self.counters[step]["hits"] += 1
+        return {"message": "", "human_input": False, step: value}
+
+    def record_llm(self, step: str, seconds: float):
+        if step in self.counters:
+            self.counters[step]["llm_calls"] += 1
+            self.counters[step]["llm_seconds"] += seconds
+
+    def product_type(self, texts: list) -> tuple:
+        for text in texts:
+            option = OPTION.match(text)
+            if option:
+                return OPTIONS[option[1]], 1.0
+            if BUNDLE.search(text):
+                return constants.BUNDLE, 1.0
+            arrival, departure = bool(ARRIVAL.search(text)), bool(DEPARTURE.search(text))
+            if arrival and departure:
+                return None, 0.0
+            if arrival or departure:
+                return (constants.ARRIVAL if arrival else constants.DEPARTURE), 1.0
+        return None, 0.0
+
+    def schedule_info(self, texts: list, product_type: str, today: date) -> tuple:
+        legs = 2 if product_type == constants.BUNDLE else 1
+        airports, flights, dates = [], [], []
+        adults, children, solo = set(), set(), False
+        for text in texts:
+            for pattern, code in AIRPORTS:
+                if pattern.search(text) and code not in airports:
+                    airports.append(code)
+            for match in FLIGHT.finditer(text):
+                flight = match[1].replace(" ", "").upper()
+                if flight not in flights:
+                    flights.append(flight)
+            text_dates = find_dates(text, today)
+            if text_dates is None:
+                return None, 0.0
+            dates += [found for found in text_dates if found not in dates]
+            adults |= {parse_count(match[1]) for match in ADULTS.finditer(text)}
+            children |= {parse_count(match[1]) for match in CHILDREN.finditer(text)}
+            solo = solo or bool(SOLO.search(text))
+
+        if solo and not adults:
+            adults = {1}
+        if adults and not children:
+            children = {0}
+        # one slot per field; more than one distinct value means the user
+        # corrected themselves or gave something we can't place
+        checks = [
+            len(airports) == 1 or (legs == 2 and len(airports) == 2),
+            len(flights) == legs,
+            len(dates) == legs,
+            len(adults) == 1 and next(iter(adults)) > 0,
+            len(children) == 1,
+        ]
+        confidence = sum(checks) / len(checks)
+        if confidence < 1.0:
+            return None, confidence
+
+        pessanger_count = {"adult": next(iter(adults)), "children": next(iter(children))}
+        if legs == 1:
+            direction = "A" if product_type == constants.ARRIVAL else "D"
+            return {
+                "airportid": airports[0],
+                "direction": direction,
+                "traveldate": dates[0].strftime("%Y%m%d"),
+                "flightId": flights[0],
+                "pessanger_count": pessanger_count,
+            }, confidence
+        if len(airports) == 2:
+            return None, 0.5  # which airport goes with which leg needs the LLM
+        if dates != sorted(dates):
+            return None, 0.5  # dates given out of order, pairing flights to legs needs the LLM
+        # earlier date is the arrival, as in the bundle instructions
+        arrival, departure = [
+            {"airportid": airports[0], "direction": direction, "traveldate": travel.strftime("%Y%m%d"), "flightId": flight}
+            for direction, travel, flight in zip("AD", dates, flights)
+        ]
+        return {"arrival": arrival, "departure": departure, "pessanger_count": pessanger_count}, confidence
+
+    def stats(self) -> dict:
+        stats = {}
+        calls = sum(counter["llm_calls"] for counter in self.counters.values())
+        # steps the fast path always answers borrow the overall LLM latency
+        overall = sum(counter["llm_seconds"] for counter in self.counters.values()) / calls if calls else 0.0
+        for step, counter in self.counters.items():
+            average = counter["llm_seconds"] / counter["llm_calls"] if counter["llm_calls"] else overall
+            stats[step] = {
+                **counter,
+                "hit_rate": counter["hits"] / counter["attempts"] if counter["attempts"] else 0.0,
+                "avg_llm_seconds": average,
+                # every hit is one structured call that didn't happen
+                "latency_saved_seconds": counter["hits"] * average,
+            }
+        return stats
+
+
+fast_path = FastPathExtractor()
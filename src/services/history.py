@@ -0,0 +1,94 @@
+# history.py
+# Keeps LLM prompts bounded: the latest `history_keep_turns` turns are sent
+# verbatim and older turns are folded into a rolling summary stored in state
+# (`summary` covers messages[:summarized_count]). Nodes that replace the
+# message list clear both with it (reset_messages() in src/utils/states.py).
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from dotenv import load_dotenv
+from langchain_core.messages import BaseMessage, SystemMessage
+
+load_dotenv()
+
+
+def estimate_tokens(messages: list) -> int:
+    # ~4 characters per token plus per-message overhead; close enough for
+    # budgeting without loading a tokenizer
+    return sum(len(str(getattr(message, "content", message))) // 4 + 4 for message in messages)
+
+
+def is_human(message) -> bool:
+    return getattr(message, "type", None) == "human" or (isinstance(message, dict) and message.get("role") in ("user", "human"))
+
+
+class HistoryManager:
+    def __init__(
+        self,
+        summarize: Callable[[str, list], Awaitable[str]],
+        keep_turns: int = int(os.getenv("history_keep_turns", "6")),
+        fold_turns: int = int(os.getenv("history_fold_turns", "4")),
+        token_budget: int = int(os.getenv("history_token_budget", "3000")),
+    ):
+        self.summarize = summarize
+        self.keep_turns = keep_turns
+        # turns allowed to pile up past keep_turns before folding, so the
+        # summary LLM call happens every few turns rather than every turn
+        self.fold_turns = fold_turns
+        self.token_budget = token_budget
+        self.summaries: OrderedDict[str, str] = OrderedDict()
+        self.counters = {"folds": 0, "folded_messages": 0, "summary_cache_hits": 0}
+
+    def budget_for(self, step: str) -> int:
+        return int(os.getenv(f"history_token_budget_{step}", self.token_budget))
+
+    async def fold(self, state: dict, step: str) -> dict:
+        """State updates (`summary`, `summarized_count`) needed before `step` builds its prompt."""
+        messages = state.get("messages") or []
+        summary = state.get("summary") or ""
+        count = state.get("summarized_count") or 0
+        reset = count > len(messages)
+        if reset:
+            # a node replaced the message list, the old summary no longer applies
+            summary, count = "", 0
+
+        starts = [i for i in range(count, len(messages)) if is_human(messages[i])]
+        cut = count
+        if len(starts) > self.keep_turns + self.fold_turns:
+            cut = starts[-self.keep_turns]
+        # over budget: fold whole turns until it fits, always keeping the last one
+        budget = self.budget_for(step)
+        later = [i for i in starts if i > cut]
+        while later and estimate_tokens(messages[cut:]) > budget:
+            cut = later.pop(0)
+
+        if cut <= count:
+            return {"summary": "", "summarized_count": 0} if reset else {}
+        summary = await self._summarize(summary, messages[count:cut])
+        self.counters["folds"] += 1
+        self.counters["folded_messages"] += cut - count
+        return {"summary": summary, "summarized_count": cut}
+
+    async def _summarize(self, summary: str, messages: list) -> str:
+        # nodes re-run from the top when resumed after an interrupt, so the
+        # same fold is often requested twice
+        key = hashlib.sha1(repr((summary, [(getattr(m, "type", ""), str(getattr(m, "content", m))) for m in messages])).encode()).hexdigest()
+        if key in self.summaries:
+            self.counters["summary_cache_hits"] += 1
+            self.summaries.move_to_end(key)
+            return self.summaries[key]
+        result = await self.summarize(summary, messages)
+        self.summaries[key] = result
+        while len(self.summaries) > 256:
+            self.summaries.popitem(last=False)
+        return result
+
+    def prompt(self, sm: BaseMessage, state: dict) -> list:
+        messages = state.get("messages") or []
+        summary = state.get("summary") or ""
+        count = state.get("summarized_count") or 0
+        if not summary or count > len(messages):
+            return [sm] + messages[count if count <= len(messages) else 0:]
+        return [sm, SystemMessage(content=f"Summary of the earlier conversation:\n{summary}")] + messages[count:]
@@ -0,0 +1,80 @@
+# idempotency.py
+# Stored /api/chat results by idempotency key. The run behind a key is its
+# own task, so a client that times out and retries with the same key picks
+# up the original run (or its stored result) instead of starting another.
+# Callers store the shaped reply, not the graph state, and results are kept
+# for `idempotency_ttl` seconds (10 minutes, a client's retry window).
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class IdempotencyConflict(Exception):
+    pass
+
+
+class IdempotencyStore:
+    def __init__(
+        self,
+        ttl: float = float(os.getenv("idempotency_ttl", "600")),
+        max_entries: int = int(os.getenv("idempotency_max_entries", "10000")),
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # key -> (expires, fingerprint, result)
+        self.entries: OrderedDict[str, tuple[float, str, object]] = OrderedDict()
+        # key -> (fingerprint, task)
+        self.inflight: dict[str, tuple[str, asyncio.Task]] = {}
+        self.counters = {"stored": 0, "replayed": 0, "joined": 0, "conflicts": 0}
+
+    @staticmethod
+    def fingerprint(*parts) -> str:
+        return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+    async def run(self, key: str, fingerprint: str, fn) -> tuple[object, bool]:
+        """(result, replayed) for `key`, running `fn()` only for the first request."""
+        entry = self.entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.check(key, entry[1], fingerprint)
+            self.entries.move_to_end(key)
+            self.counters["replayed"] += 1
+            return entry[2], True
+
+        if key in self.inflight:
+            stored_fingerprint, task = self.inflight[key]
+            self.check(key, stored_fingerprint, fingerprint)
+            self.counters["joined"] += 1
+            return await asyncio.shield(task), True
+
+        task = asyncio.get_running_loop().create_task(fn())
+        self.inflight[key] = (fingerprint, task)
+        task.add_done_callback(lambda done: self._finish(key, fingerprint, done))
+        return await asyncio.shield(task), False
+
+    def check(self, key: str, stored: str, fingerprint: str):
+        if stored != fingerprint:
+            self.counters["conflicts"] += 1
+            raise IdempotencyConflict(f"idempotency key {key!r} was already used for a different request")
+
+    def _finish(self, key: str, fingerprint: str, task: asyncio.Task):
+        self.inflight.pop(key, None)
+        # failed runs are not stored, the client may retry them
+        if task.cancelled() or task.exception() is not None:
+            return
+        self.entries[key] = (time.monotonic() + self.ttl, fingerprint, task.result())
+        self.entries.move_to_end(key)
+        self.counters["stored"] += 1
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"entries": len(self.entries), "inflight": len(self.inflight), **self.counters}
+
+
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,146 @@
+# intent.py
+# Tiered intent classification for the `classifier` node:
+#   cache - normalized conversation text -> earlier result
+#   local - TF-IDF centroid scorer trained from intent_corpus.jsonl, trusted
+#           only for clear booking requests (`end` needs an LLM-written reply)
+#   llm   - everything else
+# The enabled tiers come from `classifier_tiers` (e.g. "cache,llm" or "llm").
+import json
+import math
+import os
+import re
+import time
+from collections import Counter, OrderedDict, deque
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from dotenv import load_dotenv
+
+import src.utils.constants as constants
+from src.services.history import is_human
+from src.services.metrics import percentile
+
+load_dotenv()
+
+default_corpus = Path(__file__).resolve().parent.parent / "utils" / "intent_corpus.jsonl"
+
+
+def normalize(text: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def features(text: str) -> list:
+    words = normalize(text).split()
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class TfidfScorer:
+    """Cosine similarity of a message to each label's mean TF-IDF vector."""
+
+    def __init__(self, examples: list):
+        documents = [(features(text), label) for text, label in examples]
+        frequency = Counter(term for terms, _ in documents for term in set(terms))
+        self.idf = {term: math.log((1 + len(documents)) / (1 + count)) + 1 for term, count in frequency.items()}
+        sums: dict[str, Counter] = {}
+        for terms, label in documents:
+            sums.setdefault(label, Counter()).update(self.vector(terms))
+        self.centroids = {label: self.unit(vector) for label, vector in sums.items()}
+
+    def vector(self, terms: list) -> dict:
+        # unseen terms carry no weight
+        counts = Counter(term for term in terms if term in self.idf)
+        return self.unit({term: count * self.idf[term] for term, count in counts.items()})
+
+    @staticmethod
+    def unit(vector: dict) -> dict:
+        norm = math.sqrt(sum(value * value for value in vector.values())) or 1.0
+        return {term: value / norm for term, value in vector.items()}
+
+    def scores(self, text: str) -> dict:
+        vector = self.vector(features(text))
+        return {label: sum(value * centroid.get(term, 0.0) for term, value in vector.items())
+                for label, centroid in self.centroids.items()}
+
+    @classmethod
+    def from_file(cls, path) -> "TfidfScorer":
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+        rows = [json.loads(line) for line in lines if line.strip()]
+        return cls([(row["text"], row["label"]) for row in rows])
+
+
+class TieredClassifier:
+    def __init__(
+        self,
+        tiers: str = os.getenv("classifier_tiers", "cache,local,llm"),
+        cache_size: int = int(os.getenv("classifier_cache_size", "1024")),
+        margin: float = float(os.getenv("classifier_local_margin", "0.15")),
+        corpus_path: str = os.getenv("classifier_corpus_path", str(default_corpus)),
+    ):
+        self.tiers = [tier.strip() for tier in tiers.split(",") if tier.strip()]
+        self.cache_size = cache_size
+        self.margin = margin
+        self.corpus_path = corpus_path
+        self.cache: OrderedDict[str, dict] = OrderedDict()
+        self._scorer: Optional[TfidfScorer] = None
+        self.counters = {tier: 0 for tier in ("cache", "local", "llm")}
+        self.latencies = {tier: deque(maxlen=2000) for tier in ("cache", "local", "llm")}
+
+    @property
+    def scorer(self) -> TfidfScorer:
+        # trained on first use so importing the workflow stays cheap
+        if self._scorer is None:
+            self._scorer = TfidfScorer.from_file(self.corpus_path)
+        return self._scorer
+
+    def cache_key(self, messages: list, summary: str = "") -> str:
+        # the whole prompt conversation, not just the last message: an `end`
+        # reply to "yes" depends on what came before it
+        parts = [summary] + [f"{getattr(m, 'type', '')}:{normalize(str(getattr(m, 'content', m)))}" for m in messages]
+        return "|".join(parts)
+
+    def local(self, messages: list) -> Optional[dict]:
+        texts = [str(getattr(m, "content", m)) for m in messages if is_human(m)]
+        if not texts:
+            return None
+        scores = self.scorer.scores(texts[-1])
+        booking, general = scores.get(constants.BOOKING, 0.0), scores.get("end", 0.0)
+        if booking - general >= self.margin:
+            return {"direction": constants.BOOKING}
+        return None
+
+    async def classify(self, messages: list, llm: Callable[[], Awaitable[dict]], summary: str = "") -> dict:
+        started = time.perf_counter()
+        key = self.cache_key(messages, summary)
+        result, tier = None, "llm"
+        if "cache" in self.tiers and key in self.cache:
+            self.cache.move_to_end(key)
+            result, tier = dict(self.cache[key]), "cache"
+        if result is None and "local" in self.tiers:
+            result = self.local(messages)
+            tier = "local" if result else "llm"
+        if result is None:
+            result = await llm()
+            if "cache" in self.tiers:
+                self.cache[key] = dict(result)
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        self.counters[tier] += 1
+        self.latencies[tier].append(time.perf_counter() - started)
+        return result
+
+    def stats(self) -> dict:
+        total = sum(self.counters.values())
+        overall = [sample for samples in self.latencies.values() for sample in samples]
+        return {
+            "tiers": self.tiers,
+            "cache_entries": len(self.cache),
+            "classified": total,
+            **{f"{tier}_hit_rate": count / total if total else 0.0 for tier, count in self.counters.items()},
+            **{f"{tier}_p50_ms": percentile(samples, 0.5) * 1000 for tier, samples in self.latencies.items()},
+            **{f"{tier}_p99_ms": percentile(samples, 0.99) * 1000 for tier, samples in self.latencies.items()},
+            "p50_ms": percentile(overall, 0.5) * 1000,
+            "p99_ms": percentile(overall, 0.99) * 1000,
+        }
+
+
+intent_classifier = TieredClassifier()
@@ -0,0 +1,164 @@
+# jobs.py
+# Background execution for slow MCP steps (reservation, payment). A node
+# hands its tool call to `jobs.run(...)`. Calls that finish within
+# `job_inline_wait` seconds return as before; slower ones park the turn on
+# an interrupt carrying the job id, so /api/chat answers right away with
+# status "pending". Once the call settles the thread is resumed in the
+# background: the node re-runs, picks up the finished result and the graph
+# continues, so the result ends up in the thread's checkpoint. Clients poll
+# /api/jobs/{id} (or follow /api/jobs/{id}/events) for the continuation's
+# reply; a message sent while the job is pending just gets "pending" again.
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from dotenv import load_dotenv
+from langgraph.types import interrupt
+
+from src.services.logger import get_logger
+
+load_dotenv()
+
+log = get_logger("jobs")
+
+
+class Job:
+    def __init__(self, key: tuple, thread_id: str, step: str, task: asyncio.Task):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.thread_id = thread_id
+        self.step = step
+        self.task = task
+        # pending -> done | failed, set once the thread has been resumed
+        self.status = "pending"
+        self.parked = False
+        self.consumed = False
+        self.reply: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.settled = asyncio.Event()
+
+    def interrupt_value(self, message: str) -> dict:
+        return {"type": "job", "job_id": self.id, "status": "pending", "step": self.step, "message": message}
+
+    def public(self) -> dict:
+        return {
+            "job_id": self.id,
+            "checkpoint_id": self.thread_id,
+            "step": self.step,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "reply": self.reply,
+            "error": self.error,
+        }
+
+
+class JobStore:
+    def __init__(
+        self,
+        enabled: bool = os.getenv("background_jobs", "true").lower() == "true",
+        inline_wait: float = float(os.getenv("job_inline_wait", "2")),
+        ttl: float = float(os.getenv("job_ttl", "3600")),
+    ):
+        self.enabled = enabled
+        self.inline_wait = inline_wait
+        self.ttl = ttl
+        self.jobs: dict[str, Job] = {}
+        # (thread, step, payload hash) -> job, until a node has used its result
+        self.by_key: dict[tuple, Job] = {}
+        # async fn(job) -> reply, continues the parked thread; set by the chat controller
+        self.resume: Optional[Callable[[Job], Awaitable[Optional[dict]]]] = None
+        self.counters = {"inline": 0, "background": 0, "resumed": 0, "failed": 0}
+
+    @staticmethod
+    def key(thread_id: str, step: str, payload: dict) -> tuple:
+        digest = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+        return (thread_id, step, digest)
+
+    def submit(self, thread_id: str, step: str, payload: dict, call: Callable[[], Awaitable]) -> Job:
+        """The job for this call, started now unless an earlier run of the node already started it."""
+        key = self.key(thread_id, step, payload)
+        job = self.by_key.get(key)
+        if job is None:
+            self.prune()
+            job = Job(key, thread_id, step, asyncio.get_running_loop().create_task(call()))
+            job.task.add_done_callback(lambda _: self._on_done(job))
+            self.by_key[key] = job
+            self.jobs[job.id] = job
+        return job
+
+    async def run(self, thread_id: str, step: str, payload: dict, call: Callable[[], Awaitable], message: str):
+        """Result of `call()`; interrupts the node with a pending job if it takes longer than `inline_wait`."""
+        if not self.enabled:
+            return await call()
+        job = self.submit(thread_id, step, payload, call)
+        if not job.parked:
+            try:
+                await asyncio.wait_for(asyncio.shield(job.task), self.inline_wait)
+            except asyncio.TimeoutError:
+                job.parked = True
+                self.counters["background"] += 1
+                log.info("job running in background", job_id=job.id, step=step, thread_id=thread_id)
+            except Exception:
+                pass  # raised again below from job.task.result()
+        # on every resume before the job is done the turn is parked again
+        while not job.task.done():
+            interrupt(job.interrupt_value(message))
+        if not job.parked:
+            self.counters["inline"] += 1
+            self.jobs.pop(job.id, None)
+        job.consumed = True
+        self.by_key.pop(job.key, None)
+        return job.task.result()
+
+    def _on_done(self, job: Job):
+        if job.parked and not job.consumed:
+            asyncio.get_running_loop().create_task(self._resume(job))
+        elif job.parked:
+            # a turn the user sent meanwhile already continued the thread
+            self._finish(job, None)
+
+    async def _resume(self, job: Job):
+        reply = None
+        try:
+            if self.resume is not None:
+                reply = await self.resume(job)
+                self.counters["resumed"] += 1
+        except Exception as e:
+            log.exception("job resume failed", job_id=job.id, thread_id=job.thread_id)
+            job.error = f"{e.__class__.__name__}: {e}"
+        self._finish(job, reply)
+
+    def _finish(self, job: Job, reply: Optional[dict]):
+        failed = job.error is not None or job.task.cancelled() or job.task.exception() is not None
+        if failed and job.error is None:
+            job.error = "cancelled" if job.task.cancelled() else str(job.task.exception())
+        job.status = "failed" if failed else "done"
+        self.counters["failed"] += failed
+        job.reply = reply
+        job.finished_at = time.time()
+        job.settled.set()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def prune(self):
+        cutoff = time.time() - self.ttl
+        for job_id, job in list(self.jobs.items()):
+            if job.finished_at is not None and job.finished_at < cutoff:
+                del self.jobs[job_id]
+                if self.by_key.get(job.key) is job:
+                    del self.by_key[job.key]
+
+    def stats(self) -> dict:
+        running = sum(1 for job in self.jobs.values() if job.status == "pending")
+        return {"enabled": self.enabled, "inline_wait": self.inline_wait, "jobs": len(self.jobs), "running": running, **self.counters}
+
+
+jobs = JobStore()
@@ -0,0 +1,215 @@
+# logger.py
+# Structured logging for the request path. Callers only build a LogRecord
+# and append it to a bounded queue; a background thread redacts, formats
+# (JSON by default) and writes it in batches. When the queue is full records
+# are dropped rather than blocking the event loop.
+#
+#   log = get_logger("workflow")
+#   log.info("schedule result", node="schedule", result=result)
+#
+# Environment: log_level (INFO), log_format (json|text), log_sample_rate
+# (fraction of DEBUG/INFO records kept, 1.0), log_queue_size (10000),
+# log_flush_interval (0.05s).
+import atexit
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+REDACTED = "[REDACTED]"
+# set by src/services/workers.py in multi-worker mode
+WORKER_ID = os.getenv("worker_id")
+# contact and payment fields, compared lowercased with _ and - removed
+SENSITIVE_KEYS = {
+    "email", "phone", "firstname", "lastname", "dob", "title", "address",
+    "cardnumber", "card", "cardholder", "cardholdername", "cvv", "cvc", "cvv2", "securitycode",
+    "expiry", "expirydate", "expirymonth", "expiryyear", "expdate", "pan", "iban", "billing",
+    "authorization", "apikey", "token", "password",
+}
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+CARD_NUMBER = re.compile(r"\b(?:\d[ -]?){12,18}\d\b")
+
+
+def redact(value, depth: int = 0):
+    if depth > 8:
+        return "..."
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if str(key).lower().replace("_", "").replace("-", "") in SENSITIVE_KEYS else redact(item, depth + 1)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple, set)):
+        return [redact(item, depth + 1) for item in value]
+    if isinstance(value, str):
+        return CARD_NUMBER.sub(REDACTED, EMAIL.sub(REDACTED, value))
+    if hasattr(value, "content") and hasattr(value, "type"):
+        # LangChain messages: the text is what's worth logging
+        return {"type": value.type, "content": redact(value.content, depth + 1)}
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    return redact(str(value), depth + 1)
+
+
+def snapshot(value, depth: int = 0):
+    """Copies the containers in `value`. The writer thread formats a record
+    later, by when the caller may have changed (or be changing) them."""
+    if depth > 8:
+        return "..."
+    if isinstance(value, dict):
+        return {key: snapshot(item, depth + 1) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [snapshot(item, depth + 1) for item in value]
+    return value
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": redact(record.getMessage()),
+            **redact(getattr(record, "fields", {})),
+        }
+        if WORKER_ID is not None:
+            entry["worker"] = WORKER_ID
+        if record.exc_info:
+            entry["exc"] = redact(self.formatException(record.exc_info))
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        fields = redact(getattr(record, "fields", {}))
+        text = f"{time.strftime('%H:%M:%S', time.localtime(record.created))} {record.levelname:7s} [{record.name}] {redact(record.getMessage())}"
+        if fields:
+            text += " " + json.dumps(fields, default=str, ensure_ascii=False)
+        if record.exc_info:
+            text += "\n" + redact(self.formatException(record.exc_info))
+        return text
+
+
+class BatchingListener(threading.Thread):
+    """Drains the queue every `interval` seconds and writes the batch with one flush.
+
+    Batching keeps the request path from waking this thread (and handing
+    over the GIL) on every record.
+    """
+
+    def __init__(self, records: deque, output: logging.Handler, interval: float):
+        super().__init__(name="log-writer", daemon=True)
+        self.records = records
+        self.output = output
+        self.interval = interval
+        self.stopping = threading.Event()
+
+    def run(self):
+        while not self.stopping.wait(self.interval):
+            self.drain()
+        self.drain()
+
+    def drain(self):
+        lines = []
+        while self.records:
+            record = self.records.popleft()
+            try:
+                lines.append(self.output.format(record))
+            except Exception:
+                self.output.handleError(record)
+        if lines:
+            stream = self.output.stream
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+
+    def stop(self):
+        self.stopping.set()
+        self.join()
+
+
+class StructuredLogger:
+    """`log.info("message", key=value, ...)`; the keyword fields become JSON keys."""
+
+    def __init__(self, logger: logging.Logger, sample_rate: float):
+        self.logger = logger
+        self.sample_rate = sample_rate
+
+    def _log(self, level: int, msg: str, fields: dict, exc_info=None):
+        if not self.logger.isEnabledFor(level):
+            return
+        # DEBUG/INFO can be sampled down under load, warnings and errors never are
+        if level < logging.WARNING and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        if len(records) >= queue_size:
+            counters["dropped"] += 1
+            return
+        # built directly: Logger.log() would walk the stack for the caller
+        record = logging.LogRecord(self.logger.name, level, "", 0, msg, None, exc_info)
+        record.fields = snapshot(fields)
+        records.append(record)
+
+    def debug(self, msg: str, **fields):
+        self._log(logging.DEBUG, msg, fields)
+
+    def info(self, msg: str, **fields):
+        self._log(logging.INFO, msg, fields)
+
+    def warning(self, msg: str, **fields):
+        self._log(logging.WARNING, msg, fields)
+
+    def error(self, msg: str, **fields):
+        self._log(logging.ERROR, msg, fields)
+
+    def exception(self, msg: str, **fields):
+        self._log(logging.ERROR, msg, fields, exc_info=sys.exc_info())
+
+    def isEnabledFor(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
+
+
+root = logging.getLogger("obi")
+root.propagate = False
+queue_size = int(os.getenv("log_queue_size", "10000"))
+# deque appends and pops are atomic, no lock on the request path
+records: deque = deque()
+counters = {"dropped": 0}
+listener: BatchingListener | None = None
+
+
+def configure(level: str | None = None, fmt: str | None = None, stream=None):
+    """(Re)start the listener thread with the given level, format and output stream."""
+    global listener
+    stop()
+    root.setLevel((level or os.getenv("log_level", "INFO")).upper())
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(TextFormatter() if (fmt or os.getenv("log_format", "json")) == "text" else JsonFormatter())
+    listener = BatchingListener(records, output, float(os.getenv("log_flush_interval", "0.05")))
+    listener.start()
+
+
+def stop():
+    """Flush queued records and stop the listener thread."""
+    global listener
+    if listener is not None:
+        listener.stop()
+        listener = None
+
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(root.getChild(name), float(os.getenv("log_sample_rate", "1.0")))
+
+
+def stats() -> dict:
+    return {"level": logging.getLevelName(root.level), "queued": len(records), **counters}
+
+
+configure()
+atexit.register(stop)
@@ -1,32 +1,326 @@
 # tools_client.py
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from langchain_core.tools import ToolException
+from mcp.types import Tool as MCPTool
+from collections import OrderedDict
 from dotenv import load_dotenv
+from src.services.mcp_transport import SessionPool, CircuitBreaker
+from src.services.mcp_results import ToolResult, parse_result
+from src.services.logger import get_logger
+import src.services.metrics as metrics
+import asyncio
+import hashlib
+import json
 import os
+import random
+import time
 
 load_dotenv()
+
+log = get_logger("mcp")
+
+# only read-only lookups may be served from cache - reservation, contact and
+# payment calls always go to the backend
+CACHEABLE_TOOLS = {"schedule"}
+# payload fields that identify a cached result (the session id is left out)
+CACHE_KEY_FIELDS = {"schedule": ("airportid", "direction", "traveldate", "flightId")}
+# tools that are safe to call again after a timeout or dropped connection
+IDEMPOTENT_TOOLS = {"schedule"}
+# tools that create something on the backend; a repeat of the same call in
+# the same session within mcp_dedupe_window gets the first call's result
+SIDE_EFFECT_TOOLS = {"reservation", "contact", "payment2"}
+# seconds per tool call, override with mcp_timeout_<tool> env variables
+TOOL_TIMEOUTS = {"schedule": 15, "reservation": 30, "contact": 20, "payment2": 60}
+
+
+class ToolResultCache:
+    """TTL + LRU bounded cache of tool results that also shares in-flight calls."""
+
+    def __init__(self, ttl: float = 300, max_entries: int = 1024, key=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        if key:
+            self.key = key
+        self.entries: OrderedDict[tuple, tuple[float, object]] = OrderedDict()
+        self.inflight: dict[tuple, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(name: str, input_data: dict) -> tuple:
+        fields = CACHE_KEY_FIELDS.get(name, sorted(k for k in input_data if k != "sessionid"))
+        return (name, *(str(input_data.get(field)).strip().upper() for field in fields))
+
+    @staticmethod
+    def payload_key(name: str, input_data: dict) -> tuple:
+        session = input_data.get("sessionid") or (input_data.get("state") or {}).get("sessionid")
+        digest = hashlib.sha256(json.dumps(input_data, sort_keys=True, default=str).encode()).hexdigest()
+        return (name, str(session), digest)
+
+    async def get_or_call(self, name: str, input_data: dict, call):
+        key = self.key(name, input_data)
+        entry = self.entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if key in self.inflight:
+            self.hits += 1
+            return await asyncio.shield(self.inflight[key])
+
+        self.misses += 1
+        # the call runs as its own task, so a caller giving up (timeout,
+        # disconnect) doesn't fail the callers that joined it
+        task = asyncio.get_running_loop().create_task(call())
+        self.inflight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: tuple, task: asyncio.Task):
+        self.inflight.pop(key, None)
+        # failed calls are not stored, they can be retried at once
+        if task.cancelled() or task.exception() is not None:
+            return
+        self.entries[key] = (time.monotonic() + self.ttl, task.result())
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, name: str | None = None, input_data: dict | None = None):
+        if name and input_data is not None:
+            self.entries.pop(self.key(name, input_data), None)
+        elif name:
+            for key in [key for key in self.entries if key[0] == name]:
+                del self.entries[key]
+        else:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self.entries), "inflight": len(self.inflight), "hits": self.hits, "misses": self.misses}
+
+
 class McpClient:
     def __init__(self, server_url: str = os.getenv("mcp_server"), server_key: str = "obi_mcp"):
-        self.client = MultiServerMCPClient({
-            server_key: {
-                "url": server_url,
-                "transport": "sse"
-            }
-        })
+        connection = {
+            "url": server_url,
+            "transport": "sse"
+        }
+        self.connection = connection
+        self.server_key = server_key
+        self.client = MultiServerMCPClient({server_key: connection})
         self.tools_map = {}
+        # tool discovery - see start_discovery()
+        self.ready = asyncio.Event()
+        self.manifest_path = os.getenv("mcp_manifest_path", ".mcp_tools.json")
+        self.refresh_interval = float(os.getenv("mcp_tools_refresh", "300"))
+        self.ready_timeout = float(os.getenv("mcp_ready_timeout", "10"))
+        self.tools_source = None
+        self.tools_refreshed_at = None
+        self.discovery_error = None
+        self.discovery_task: asyncio.Task | None = None
+        # mcp_pool_size=0 falls back to one connection per tool call
+        pool_size = int(os.getenv("mcp_pool_size", "4"))
+        self.pool = SessionPool(
+            connection,
+            size=pool_size,
+            max_concurrency=int(os.getenv("mcp_max_concurrency", "32")),
+        ) if pool_size > 0 else None
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("mcp_breaker_threshold", "5")),
+            reset_timeout=float(os.getenv("mcp_breaker_reset", "30")),
+        )
+        self.max_retries = int(os.getenv("mcp_max_retries", "2"))
+        self.retry_backoff = float(os.getenv("mcp_retry_backoff", "0.2"))
+        self.counters = {"calls": 0, "failures": 0, "timeouts": 0, "retries": 0}
+        self.cache = ToolResultCache(
+            ttl=float(os.getenv("schedule_cache_ttl", "300")),
+            max_entries=int(os.getenv("schedule_cache_size", "1024")),
+        )
+        # only successful calls are remembered, failures can be retried at once
+        self.dedupe = ToolResultCache(
+            ttl=float(os.getenv("mcp_dedupe_window", "600")),
+            max_entries=int(os.getenv("mcp_dedupe_size", "4096")),
+            key=ToolResultCache.payload_key,
+        )
 
     async def init(self):
-        tools = await self.client.get_tools()
-        self.tools_map = {tool.name: tool for tool in tools}
-        print("this is toolsmap " , self.tools_map)
+        await self.discover()
+        log.info("mcp tools discovered", tools=sorted(self.tools_map))
+
+    async def discover(self):
+        async with self.client.session(self.server_key) as session:
+            tools, cursor = [], None
+            while True:
+                page = await session.list_tools(cursor=cursor)
+                tools += page.tools
+                cursor = page.nextCursor
+                if not cursor:
+                    break
+        self._set_tools(tools, source="server")
+        await asyncio.to_thread(self._save_manifest, tools)
+
+    def _set_tools(self, tools: list[MCPTool], source: str):
+        # tools run without a bound session: invoke_tool goes through the pool,
+        # and with mcp_pool_size=0 each tool opens its own connection
+        self.tools_map = {tool.name: convert_mcp_tool_to_langchain_tool(None, tool, connection=self.connection) for tool in tools}
+        self.tools_source = source
+        self.tools_refreshed_at = time.time()
+        self.discovery_error = None
+        if self.tools_map:
+            self.ready.set()
+
+    def _save_manifest(self, tools: list[MCPTool]):
+        manifest = {"saved_at": time.time(), "tools": [tool.model_dump(mode="json") for tool in tools]}
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def load_manifest(self) -> bool:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            tools = [MCPTool.model_validate(tool) for tool in manifest["tools"]]
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            log.warning("ignoring unreadable tool manifest", path=self.manifest_path, error=str(e))
+            return False
+        self._set_tools(tools, source="manifest")
+        self.tools_refreshed_at = manifest.get("saved_at", self.tools_refreshed_at)
+        return bool(self.tools_map)
+
+    async def _discovery_loop(self):
+        backoff = 1.0
+        while True:
+            try:
+                await self.discover()
+                log.info("mcp tools discovered", tools=sorted(self.tools_map))
+                backoff = 1.0
+                await asyncio.sleep(self.refresh_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.discovery_error = f"{e.__class__.__name__}: {e}"
+                log.warning("mcp tool discovery failed", retry_in=backoff, error=self.discovery_error)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.refresh_interval)
+
+    def start_discovery(self):
+        """Serve from the persisted manifest right away and discover/refresh
+        the tool map in the background."""
+        self.load_manifest()
+        if self.discovery_task is None or self.discovery_task.done():
+            self.discovery_task = asyncio.get_running_loop().create_task(self._discovery_loop())
 
     def get_tool(self, name: str):
         if name not in self.tools_map:
             raise ValueError(f"Tool '{name}' not found. Did you run `await init()`?")
         return self.tools_map[name]
 
-    async def invoke_tool(self, name: str, input_data: dict):
-        tool = self.get_tool(name)
-        return await tool.ainvoke(input_data)
+    async def invoke_tool(self, name: str, input_data: dict) -> ToolResult:
+        """Call a tool; the answer comes back parsed, see src/services/mcp_results.py."""
+        if not metrics.enabled:
+            return await self._invoke_tool(name, input_data)
+        started, error = time.perf_counter(), None
+        try:
+            return await self._invoke_tool(name, input_data)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            metrics.tool_seconds.observe(time.perf_counter() - started, name, metrics.outcome_of(error))
+
+    async def _invoke_tool(self, name: str, input_data: dict):
+        if not self.ready.is_set():
+            try:
+                await asyncio.wait_for(self.ready.wait(), self.ready_timeout)
+            except asyncio.TimeoutError:
+                raise ValueError(f"Tool '{name}' unavailable, MCP tool discovery has not completed: {self.discovery_error}")
+        self.get_tool(name)
+        if name in CACHEABLE_TOOLS:
+            return await self.cache.get_or_call(name, input_data, lambda: self._call(name, input_data))
+        if name in SIDE_EFFECT_TOOLS:
+            return await self.dedupe.get_or_call(name, input_data, lambda: self._call(name, input_data))
+        return await self._call(name, input_data)
+
+    def health(self) -> dict:
+        age = time.time() - self.tools_refreshed_at if self.tools_refreshed_at else None
+        return {
+            "ready": self.ready.is_set(),
+            "tools": sorted(self.tools_map),
+            "tools_source": self.tools_source,
+            "tools_age_seconds": round(age, 1) if age is not None else None,
+            "stale": age is None or age > 2 * self.refresh_interval,
+            "discovery_error": self.discovery_error,
+            "circuit": self.breaker.state,
+        }
+
+    async def _call(self, name: str, input_data: dict):
+        timeout = float(os.getenv(f"mcp_timeout_{name}", TOOL_TIMEOUTS.get(name, 30)))
+        attempts = 1 + (self.max_retries if name in IDEMPOTENT_TOOLS else 0)
+        for attempt in range(attempts):
+            trial = self.breaker.check()
+            self.counters["calls"] += 1
+            started = time.perf_counter()
+            try:
+                if self.pool:
+                    result = await asyncio.wait_for(self.pool.call_tool(name, input_data), timeout)
+                else:
+                    result = await asyncio.wait_for(self.get_tool(name).ainvoke(input_data), timeout)
+            except ToolException as e:
+                # the server answered, so the transport is healthy
+                self.breaker.record_success()
+                log.warning("tool error", tool=name, error=str(e))
+                raise
+            except asyncio.CancelledError:
+                # neither success nor failure; a half-open trial must not stay claimed
+                if trial:
+                    self.breaker.end_trial()
+                raise
+            except Exception as e:
+                self.counters["failures"] += 1
+                if isinstance(e, asyncio.TimeoutError):
+                    self.counters["timeouts"] += 1
+                self.breaker.record_failure()
+                log.warning("tool call failed", tool=name, attempt=attempt + 1, error=f"{e.__class__.__name__}: {e}")
+                if attempt + 1 >= attempts:
+                    raise
+                self.counters["retries"] += 1
+                # exponential backoff with full jitter
+                await asyncio.sleep(random.uniform(0, self.retry_backoff * 2 ** attempt))
+            else:
+                self.breaker.record_success()
+                log.debug("tool call", tool=name, attempt=attempt + 1, seconds=round(time.perf_counter() - started, 4))
+                # parsed here, once, so the caches hold records rather than text
+                return parse_result(name, result)
+
+    async def close(self):
+        if self.discovery_task:
+            self.discovery_task.cancel()
+            try:
+                await self.discovery_task
+            except asyncio.CancelledError:
+                pass
+        if self.pool:
+            await self.pool.close()
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "circuit": self.breaker.state,
+            "rejected": self.breaker.rejected,
+            "pool": self.pool.stats() if self.pool else None,
+            "cache": self.cache.stats(),
+            "dedupe": self.dedupe.stats(),
+        }
+
+    def invalidate_cache(self, name: str | None = None, input_data: dict | None = None):
+        if name is None or name in CACHEABLE_TOOLS:
+            self.cache.invalidate(name, input_data)
+        if name is None or name in SIDE_EFFECT_TOOLS:
+            self.dedupe.invalidate(name, input_data)
 
     # def list_tools(self):
     #     return list(self.tools_map.keys())
@@ -43,7 +337,13 @@ async def get_mcpInstance():
 async def init_tool_service():
     global mcp_client, tools
     mcp_client = McpClient()  # your SSE or HTTP client
-    await mcp_client.init()
-    print("initial toolmap : ",  mcp_client.tools_map)
+    # discovery runs in the background so a slow MCP server can't block startup
+    mcp_client.start_discovery()
+    log.info("mcp tool service started", tools=sorted(mcp_client.tools_map))
     # result = await mcp_client.invoke_tool("schedule" , {'airportid': 'SIA', 'direction': 'A', 'traveldate': '20250608', 'flightId': 'AF2859' , "sessionid":'00081400083250224448591690'})
     # print("printing result - " , result)
+
+async def close_tool_service():
+    if mcp_client:
+        await mcp_client.close()
+
@@ -0,0 +1,103 @@
+# mcp_results.py
+# Typed views of MCP tool results. Tools answer JSON text; McpClient parses
+# each answer once into one of these records, which the result caches then
+# hold, so nodes read attributes instead of json.loads-ing the same string
+# again. Records keep the parsed payload in `data`; state stores
+# `as_dict()` (plain dicts the checkpointer can serialize), never raw text.
+import json
+from typing import Any
+
+
+class ToolResult:
+    __slots__ = ("data", "error")
+
+    def __init__(self, data: dict, error: str | None = None):
+        self.data = data
+        # why the answer could not be read, None when it parsed
+        self.error = error
+
+    @classmethod
+    def parse(cls, result: Any) -> "ToolResult":
+        if isinstance(result, ToolResult):
+            return result if type(result) is cls else cls(result.data, result.error)
+        if isinstance(result, (str, bytes, bytearray)):
+            try:
+                result = json.loads(result)
+            except ValueError:
+                return cls({}, "Invalid response format")
+        if not isinstance(result, dict):
+            return cls({}, "Invalid response format")
+        return cls(result)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def as_dict(self) -> dict:
+        # records are shared through the result caches, callers get their own copy
+        return dict(self.data)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.data!r})" if self.ok else f"{type(self).__name__}(error={self.error!r})"
+
+
+class ScheduleResult(ToolResult):
+    __slots__ = ("schedule_id",)
+
+    def __init__(self, data: dict, error: str | None = None):
+        super().__init__(data, error)
+        self.schedule_id = data.get("scheduleId")
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and bool(self.schedule_id)
+
+
+class ReservationResult(ToolResult):
+    __slots__ = ("is_standby", "cartitemid")
+
+    def __init__(self, data: dict, error: str | None = None):
+        super().__init__(data, error)
+        self.is_standby = bool(data.get("isStandBy"))
+        self.cartitemid = (data.get("data") or {}).get("cartitemid")
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.is_standby and bool(self.cartitemid)
+
+
+class ContactResult(ToolResult):
+    __slots__ = ()
+
+    @property
+    def ok(self) -> bool:
+        # the backend answers status 0 when the contact was saved
+        return self.error is None and bool(self.data) and not self.data.get("error") and self.data.get("status", 0) == 0
+
+    @property
+    def error_message(self) -> str:
+        return self.error or self.data.get("error") or self.data.get("statusMessage") or "Unknown contact error"
+
+
+class PaymentResult(ToolResult):
+    __slots__ = ()
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and bool(self.data) and not self.data.get("error")
+
+    @property
+    def error_message(self) -> str:
+        return self.error or self.data.get("error") or "Unknown payment error"
+
+
+RESULT_TYPES = {
+    "schedule": ScheduleResult,
+    "reservation": ReservationResult,
+    "contact": ContactResult,
+    "payment2": PaymentResult,
+}
+
+
+def parse_result(name: str, result: Any) -> ToolResult:
+    return RESULT_TYPES.get(name, ToolResult).parse(result)
@@ -0,0 +1,177 @@
+# mcp_transport.py
+# Pooled MCP sessions and a circuit breaker used by McpClient.
+#
+# MultiServerMCPClient tools open a fresh SSE connection (and run the MCP
+# initialize handshake) for every call. SessionPool keeps up to `size`
+# initialized sessions open and spreads calls over them; MCP sessions
+# multiplex requests, so `max_concurrency` bounds total in-flight calls.
+import asyncio
+import time
+
+from langchain_core.tools import ToolException
+from langchain_mcp_adapters.sessions import Connection, create_session
+from mcp.shared.exceptions import McpError
+from mcp.types import TextContent
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures and fails fast for
+    `reset_timeout` seconds, then lets a single trial call through."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.trial_running = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def check(self) -> bool:
+        """Raises while open; returns True when this call is the half-open trial."""
+        state = self.state
+        if state == "open" or (state == "half_open" and self.trial_running):
+            self.rejected += 1
+            raise CircuitOpenError("MCP backend unavailable, circuit breaker is open")
+        if state == "half_open":
+            self.trial_running = True
+            return True
+        return False
+
+    def end_trial(self):
+        # a trial that was cancelled proved nothing either way, the next call
+        # becomes the trial
+        self.trial_running = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_running = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class PooledSession:
+    def __init__(self):
+        self.session = None
+        self.in_flight = 0
+        self.alive = True
+        self.closed = asyncio.Event()
+        self.task: asyncio.Task | None = None
+
+
+class SessionPool:
+    def __init__(self, connection: Connection, size: int = 4, max_concurrency: int = 32):
+        self.connection = connection
+        self.size = size
+        self.max_concurrency = max_concurrency
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.sessions: list[PooledSession] = []
+        self.open_lock = asyncio.Lock()
+        self.counters = {"opened": 0, "discarded": 0, "calls": 0, "errors": 0, "waiting": 0}
+
+    async def _open(self) -> PooledSession:
+        pooled = PooledSession()
+        ready = asyncio.get_running_loop().create_future()
+
+        # the session context has to be entered and exited by the same task,
+        # so every pooled session is owned by a task that holds it open
+        async def hold():
+            try:
+                async with create_session(self.connection) as session:
+                    await session.initialize()
+                    pooled.session = session
+                    ready.set_result(pooled)
+                    await pooled.closed.wait()
+            except BaseException as e:
+                if not ready.done():
+                    ready.set_exception(e)
+            finally:
+                pooled.alive = False
+
+        pooled.task = asyncio.get_running_loop().create_task(hold())
+        await ready
+        self.counters["opened"] += 1
+        return pooled
+
+    async def _session(self) -> PooledSession:
+        self.sessions = [pooled for pooled in self.sessions if pooled.alive]
+        idle = min(self.sessions, key=lambda pooled: pooled.in_flight, default=None)
+        if idle and (idle.in_flight == 0 or len(self.sessions) >= self.size):
+            return idle
+        async with self.open_lock:
+            if len(self.sessions) < self.size:
+                pooled = await self._open()
+                self.sessions.append(pooled)
+                return pooled
+        return min(self.sessions, key=lambda pooled: pooled.in_flight)
+
+    def _discard(self, pooled: PooledSession):
+        if pooled.alive:
+            pooled.alive = False
+            pooled.closed.set()
+            self.counters["discarded"] += 1
+
+    async def call_tool(self, name: str, arguments: dict):
+        self.counters["waiting"] += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.counters["waiting"] -= 1
+        try:
+            pooled = await self._session()
+            pooled.in_flight += 1
+            self.counters["calls"] += 1
+            try:
+                result = await pooled.session.call_tool(name, arguments)
+            except McpError as e:
+                # an error response: the session answered and stays usable
+                self.counters["errors"] += 1
+                raise ToolException(str(e)) from e
+            except Exception:
+                # a broken session is not reused; cancellation (a caller's
+                # timeout) leaves the session and its other calls alone
+                self.counters["errors"] += 1
+                self._discard(pooled)
+                raise
+            finally:
+                pooled.in_flight -= 1
+        finally:
+            self.semaphore.release()
+
+        text = [content.text for content in result.content if isinstance(content, TextContent)]
+        content = text[0] if len(text) == 1 else ("" if not text else text)
+        if result.isError:
+            raise ToolException(content)
+        return content
+
+    async def close(self):
+        for pooled in self.sessions:
+            self._discard(pooled)
+        await asyncio.gather(*(pooled.task for pooled in self.sessions if pooled.task), return_exceptions=True)
+        self.sessions = []
+
+    def stats(self) -> dict:
+        alive = [pooled for pooled in self.sessions if pooled.alive]
+        return {
+            "size": self.size,
+            "max_concurrency": self.max_concurrency,
+            "open_sessions": len(alive),
+            "in_flight": sum(pooled.in_flight for pooled in alive),
+            **self.counters,
+        }
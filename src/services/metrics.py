@@ -0,0 +1,188 @@
+# metrics.py
+# Latency histograms and token counters rendered in the Prometheus text
+# format for /metrics:
+#   obi_node_duration_seconds{node,outcome}        every graph node
+#   obi_llm_duration_seconds{step,outcome}         every chat model call
+#   obi_llm_tokens_total{step,kind}                prompt / completion tokens
+#   obi_tool_duration_seconds{tool,outcome}        McpClient.invoke_tool
+#   obi_checkpoint_duration_seconds{op}            checkpointer reads / writes
+# With metrics_enabled=false the wrappers stay in place but only check a flag.
+import bisect
+import inspect
+import os
+import time
+from uuid import UUID
+
+from dotenv import load_dotenv
+from langchain_core.callbacks import BaseCallbackHandler
+from langgraph.errors import GraphInterrupt
+
+load_dotenv()
+
+enabled = os.getenv("metrics_enabled", "true").lower() == "true"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def percentile(samples, q: float) -> float:
+    """Nearest-rank percentile of `samples`, 0.0 when there are none."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def label_text(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, *labels):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{label_text(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts (last is +Inf), sum, count]
+        self.series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{label_text(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{label_text(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{label_text(self.labelnames, labels)} {count}")
+        return lines
+
+
+node_seconds = Histogram("obi_node_duration_seconds", "Graph node run time.", ("node", "outcome"))
+llm_seconds = Histogram("obi_llm_duration_seconds", "Chat model call time per graph step.", ("step", "outcome"))
+llm_tokens = Counter("obi_llm_tokens_total", "Tokens reported by the chat model per graph step.", ("step", "kind"))
+tool_seconds = Histogram("obi_tool_duration_seconds", "McpClient.invoke_tool time, cache hits included.", ("tool", "outcome"))
+checkpoint_seconds = Histogram("obi_checkpoint_duration_seconds", "Checkpointer call time.", ("op",))
+registry = [node_seconds, llm_seconds, llm_tokens, tool_seconds, checkpoint_seconds]
+
+
+def render() -> str:
+    return "\n".join(line for metric in registry for line in metric.render()) + "\n"
+
+
+def outcome_of(error: BaseException | None) -> str:
+    if error is None:
+        return "ok"
+    return "interrupt" if isinstance(error, GraphInterrupt) else "error"
+
+
+def timed_node(name: str, node):
+    """Wrap a graph node; keeps the (state) / (state, config) signature langgraph inspects."""
+    takes_config = "config" in inspect.signature(node).parameters
+
+    async def run(state, config):
+        if not enabled:
+            return await (node(state, config) if takes_config else node(state))
+        started, error = time.perf_counter(), None
+        try:
+            return await (node(state, config) if takes_config else node(state))
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            node_seconds.observe(time.perf_counter() - started, name, outcome_of(error))
+
+    run.__name__ = node.__name__
+    return run
+
+
+def instrument_checkpointer(saver):
+    """Time the async checkpointer calls a graph run makes."""
+    for op in ("aget_tuple", "aput", "aput_writes", "aflush"):
+        method = getattr(saver, op, None)
+        if method is None:
+            continue
+
+        async def timed(*args, _method=method, _op=op, **kwargs):
+            if not enabled:
+                return await _method(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return await _method(*args, **kwargs)
+            finally:
+                checkpoint_seconds.observe(time.perf_counter() - started, _op)
+
+        setattr(saver, op, timed)
+    return saver
+
+
+class LlmUsageHandler(BaseCallbackHandler):
+    """Chat model latency and token usage, labeled with the graph node that made the call."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.runs: dict[UUID, tuple[str, float]] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata: dict | None = None, **kwargs):
+        if enabled:
+            self.runs[run_id] = ((metadata or {}).get("langgraph_node", "unknown"), time.perf_counter())
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        if run_id not in self.runs:
+            return
+        step, started = self.runs.pop(run_id)
+        llm_seconds.observe(time.perf_counter() - started, step, "ok")
+        prompt = completion = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                prompt += usage.get("input_tokens", 0)
+                completion += usage.get("output_tokens", 0)
+        if not prompt and not completion:
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            prompt, completion = usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+        if prompt:
+            llm_tokens.inc(prompt, step, "prompt")
+        if completion:
+            llm_tokens.inc(completion, step, "completion")
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        if run_id in self.runs:
+            step, started = self.runs.pop(run_id)
+            llm_seconds.observe(time.perf_counter() - started, step, "error")
+
+
+llm_usage = LlmUsageHandler()
@@ -0,0 +1,201 @@
+# serde.py
+# Compact checkpoint serialization, selected with `checkpoint_serde`
+# (compact by default, "default" writes what LangGraph's own serializer
+# writes).
+#
+# CompactSerializer keeps LangGraph's msgpack encoding (JsonPlusSerializer)
+# and compresses payloads of at least `checkpoint_compress_min_bytes` with
+# `checkpoint_compression` (zstd when `zstandard` is installed, otherwise
+# zlib, or none). The codec is part of the type tag and both settings
+# decode it, so rows written under any setting, or by LangGraph's
+# serializer, stay readable when the setting changes (zstd rows need
+# `zstandard` installed).
+#
+# Sharing is the structural-sharing half, used by the SQLite checkpointer:
+# sub-objects (dicts, lists, messages) of at least
+# `checkpoint_share_min_bytes` are replaced by a reference to their content
+# hash and stored once per thread. The cart, the schedule / contact copies
+# inside every cart item and each message are then written the first time
+# they appear rather than in every checkpoint and write that carries them.
+import hashlib
+import os
+import threading
+import zlib
+from typing import Any, Callable, Iterable
+
+from dotenv import load_dotenv
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+try:
+    import zstandard
+except ImportError:  # optional: zlib is always available
+    zstandard = None
+
+load_dotenv()
+
+# value standing in for a shared sub-object
+REF = "__obi_shared__"
+SHARED_PREFIX = "shared:"
+
+
+class CompactSerializer(SerializerProtocol):
+    def __init__(
+        self,
+        compression: str = os.getenv("checkpoint_compression", "zstd" if zstandard else "zlib"),
+        min_bytes: int = int(os.getenv("checkpoint_compress_min_bytes", "512")),
+        level: int = int(os.getenv("checkpoint_compress_level", "3")),
+    ):
+        if compression not in ("zstd", "zlib", "none"):
+            raise ValueError(f"Unknown checkpoint compression '{compression}'. Use 'zstd', 'zlib' or 'none'.")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("checkpoint_compression=zstd needs the zstandard package")
+        self.inner = JsonPlusSerializer()
+        self.compression = compression
+        self.min_bytes = min_bytes
+        self.level = level
+        # zstd contexts are not thread-safe and checkpointer reads run in
+        # worker threads, so every thread gets its own pair
+        self.local = threading.local()
+
+    def zstd(self):
+        if not hasattr(self.local, "zstd"):
+            self.local.zstd = (zstandard.ZstdCompressor(level=self.level), zstandard.ZstdDecompressor())
+        return self.local.zstd
+
+    def pack(self, type_: str, data: bytes) -> tuple[str, bytes]:
+        if self.compression == "none" or len(data) < self.min_bytes:
+            return type_, data
+        if self.compression == "zstd":
+            return f"{type_}+zstd", self.zstd()[0].compress(data)
+        return f"{type_}+zlib", zlib.compress(data, self.level)
+
+    def unpack(self, type_: str, data: bytes) -> tuple[str, bytes]:
+        type_, _, codec = type_.partition("+")
+        if codec == "zstd":
+            if zstandard is None:
+                raise ValueError("checkpoint was written with zstd; install zstandard to read it")
+            return type_, self.zstd()[1].decompress(data)
+        if codec == "zlib":
+            return type_, zlib.decompress(data)
+        return type_, data
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        return self.pack(*self.inner.dumps_typed(obj))
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        return self.inner.loads_typed(self.unpack(*data))
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.inner.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.inner.loads(data)
+
+
+class Sharing:
+    """Splits values into a root holding references and content-addressed shared objects."""
+
+    def __init__(
+        self,
+        serde: SerializerProtocol,
+        min_bytes: int = int(os.getenv("checkpoint_share_min_bytes", "128")),
+        max_depth: int = int(os.getenv("checkpoint_share_depth", "2")),
+    ):
+        self.serde = serde
+        # sub-objects are sized and hashed uncompressed; pack() compresses
+        # the ones that get stored
+        self.raw = getattr(serde, "inner", serde)
+        self.min_bytes = min_bytes
+        # deeper sub-objects are only encoded as part of their parent; every
+        # level split costs one more encode of everything below it
+        self.max_depth = max_depth
+
+    def pack(self, type_: str, data: bytes) -> tuple[str, bytes]:
+        return self.serde.pack(type_, data) if hasattr(self.serde, "pack") else (type_, data)
+
+    def split(self, value: Any, objects: dict, depth: int = 0) -> Any:
+        """`value` with large sub-objects replaced by references; adds hash -> (type, raw bytes, hashes below it) to `objects`."""
+        if depth >= self.max_depth:
+            return value
+        if type(value) is dict:
+            return {k: self._share(v, objects, depth + 1) for k, v in value.items()}
+        if type(value) is list:
+            return [self._share(v, objects, depth + 1) for v in value]
+        return value
+
+    def _share(self, value: Any, objects: dict, depth: int) -> Any:
+        if value is None or isinstance(value, (str, bytes, int, float, bool)):
+            return value
+        children: dict = {}
+        value = self.split(value, children, depth)
+        objects.update(children)
+        type_, data = self.raw.dumps_typed(value)
+        if len(data) < self.min_bytes:
+            return value
+        digest = hashlib.blake2b(type_.encode() + data, digest_size=12).hexdigest()
+        objects[digest] = (type_, data, tuple(children))
+        return {REF: digest}
+
+    def join(self, value: Any, rows: dict) -> Any:
+        """Inverse of split(); `rows` maps every referenced hash to its (type, bytes)."""
+        if type(value) is dict:
+            if len(value) == 1 and REF in value:
+                # decoded per occurrence so no two places share one object
+                return self.join(self.serde.loads_typed(rows[value[REF]][:2]), rows)
+            return {k: self.join(v, rows) for k, v in value.items()}
+        if type(value) is list:
+            return [self.join(v, rows) for v in value]
+        return value
+
+    @staticmethod
+    def refs(value: Any, found: set | None = None) -> set:
+        found = set() if found is None else found
+        if type(value) is dict:
+            if len(value) == 1 and REF in value:
+                found.add(value[REF])
+            else:
+                for v in value.values():
+                    Sharing.refs(v, found)
+        elif type(value) is list:
+            for v in value:
+                Sharing.refs(v, found)
+        return found
+
+    def load(self, type_: str, data: bytes, fetch: Callable[[Iterable[str]], dict]) -> Any:
+        """Decode a stored value; `fetch(hashes)` returns hash -> (type, bytes, child hashes)."""
+        if not type_.startswith(SHARED_PREFIX):
+            return self.serde.loads_typed((type_, data))
+        value = self.serde.loads_typed((type_[len(SHARED_PREFIX):], data))
+        rows: dict = {}
+        todo = self.refs(value)
+        while todo:
+            fetched = fetch(todo)
+            if missing := todo - fetched.keys():
+                raise KeyError(f"shared checkpoint objects missing: {sorted(missing)[:3]}")
+            rows.update(fetched)
+            todo = {child for row in fetched.values() for child in row[2]} - rows.keys()
+        return self.join(value, rows)
+
+    def dump(self, value: Any, objects: dict) -> tuple[str, bytes]:
+        """Encode `value` for storage, collecting its shared objects into `objects`."""
+        if not self.min_bytes:
+            return self.serde.dumps_typed(value)
+        found: dict = {}
+        root = self.split(value, found)
+        if not found:
+            return self.serde.dumps_typed(value)
+        objects.update(found)
+        type_, data = self.serde.dumps_typed(root)
+        return SHARED_PREFIX + type_, data
+
+
+def get_serde(name: str | None = None) -> SerializerProtocol:
+    """Serializer for `checkpoint_serde`."""
+    name = (name or os.getenv("checkpoint_serde", "compact")).lower()
+    if name == "compact":
+        return CompactSerializer()
+    if name == "default":
+        # writes uncompressed, still reads rows compact wrote
+        return CompactSerializer(compression="none")
+    raise ValueError(f"Unknown checkpoint serde '{name}'. Use 'compact' or 'default'.")
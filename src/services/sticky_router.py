@@ -0,0 +1,116 @@
+# sticky_router.py
+# Front process for `invoke prod --workers N --routing sticky`. Each request
+# is pinned to a worker by hashing its checkpoint_id, so every turn of a
+# conversation reaches the same process and that worker's thread locks,
+# idempotency store and caches see all of them. Requests without a
+# checkpoint_id go round-robin. When the pinned worker refuses connections
+# (restarting) the next one takes the turn; the state is in the shared
+# checkpointer, so any worker can serve it.
+#
+# Upstreams come from `router_upstreams` ("http://127.0.0.1:8001,...").
+import itertools
+import json
+import os
+import zlib
+from contextlib import asynccontextmanager
+
+import httpx
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+load_dotenv()
+
+# connection-level headers are not forwarded
+HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade", "host", "content-length",
+}
+
+
+def checkpoint_key(request: Request, body: bytes):
+    if body and request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        if isinstance(payload, dict) and payload.get("checkpoint_id") is not None:
+            return str(payload["checkpoint_id"])
+    return request.query_params.get("checkpoint_id")
+
+
+class StickyRouter:
+    def __init__(self, upstreams: list[str], connect_timeout: float = float(os.getenv("router_connect_timeout", "5"))):
+        self.upstreams = upstreams
+        self.clients = [
+            httpx.AsyncClient(base_url=upstream, timeout=httpx.Timeout(None, connect=connect_timeout),
+                              limits=httpx.Limits(max_connections=None, max_keepalive_connections=256))
+            for upstream in upstreams
+        ]
+        self.round_robin = itertools.cycle(range(len(upstreams)))
+        self.counters = {"sticky": 0, "round_robin": 0, "failovers": 0, "unavailable": 0}
+
+    def pick(self, key) -> int:
+        if key is None:
+            self.counters["round_robin"] += 1
+            return next(self.round_robin)
+        self.counters["sticky"] += 1
+        # crc32, not hash(): the mapping must not change between restarts
+        return zlib.crc32(key.encode()) % len(self.clients)
+
+    async def forward(self, request: Request):
+        body = await request.body()
+        first = self.pick(checkpoint_key(request, body))
+        headers = [(name, value) for name, value in request.headers.raw if name.decode().lower() not in HOP_HEADERS]
+        for attempt in range(len(self.clients)):
+            client = self.clients[(first + attempt) % len(self.clients)]
+            upstream = client.build_request(request.method, request.url.path, params=request.query_params, headers=headers, content=body)
+            try:
+                response = await client.send(upstream, stream=True)
+            except httpx.ConnectError:
+                # nothing reached the worker, so another one can take the turn
+                self.counters["failovers"] += 1
+                continue
+            return StreamingResponse(
+                response.aiter_raw(),
+                status_code=response.status_code,
+                headers={name: value for name, value in response.headers.items() if name.lower() not in HOP_HEADERS},
+                background=BackgroundTask(response.aclose),
+            )
+        self.counters["unavailable"] += 1
+        return JSONResponse({"detail": "no worker available"}, status_code=503)
+
+    def stats(self) -> dict:
+        return {"upstreams": self.upstreams, **self.counters}
+
+    async def close(self):
+        for client in self.clients:
+            await client.aclose()
+
+
+def build_app(upstreams: list[str]) -> Starlette:
+    router = StickyRouter(upstreams)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        if not upstreams:
+            raise RuntimeError("router_upstreams is not set")
+        yield
+        await router.close()
+
+    async def router_stats(request: Request):
+        return JSONResponse(router.stats())
+
+    methods = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"]
+    app = Starlette(
+        routes=[Route("/router/stats", router_stats), Route("/{path:path}", router.forward, methods=methods)],
+        lifespan=lifespan,
+    )
+    app.state.router = router
+    return app
+
+
+app = build_app([upstream.strip() for upstream in os.getenv("router_upstreams", "").split(",") if upstream.strip()])
@@ -0,0 +1,119 @@
+# thread_locks.py
+# One graph run at a time per thread_id. Runs for the same thread queue on a
+# FIFO lock; an identical request (same thread and message) that arrives
+# while the first is still running shares its result instead of resuming the
+# same interrupt twice. Lock entries only exist while a thread has runs
+# queued or in flight, so memory tracks concurrency, not total threads.
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+
+from src.services.metrics import percentile
+
+load_dotenv()
+
+
+class ThreadBusyError(Exception):
+    pass
+
+
+class ThreadLock:
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class Inflight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class ThreadLocks:
+    def __init__(
+        self,
+        enabled: bool = os.getenv("thread_locks_enabled", "true").lower() == "true",
+        max_queued: int = int(os.getenv("thread_max_queued", "16")),
+    ):
+        self.enabled = enabled
+        self.max_queued = max_queued
+        self.locks: dict[str, ThreadLock] = {}
+        self.inflight: dict[tuple, Inflight] = {}
+        self.waits = deque(maxlen=2000)
+        self.counters = {"runs": 0, "queued": 0, "coalesced": 0, "rejected": 0}
+
+    @asynccontextmanager
+    async def hold(self, thread_id):
+        """Serialize the enclosed block with every other holder of `thread_id`."""
+        if not self.enabled or thread_id is None:
+            yield
+            return
+        entry = self.locks.get(thread_id)
+        if entry is None:
+            entry = self.locks[thread_id] = ThreadLock()
+        if entry.users >= self.max_queued:
+            self.counters["rejected"] += 1
+            raise ThreadBusyError(f"too many requests queued for thread {thread_id}")
+        entry.users += 1
+        started = time.perf_counter()
+        try:
+            if entry.lock.locked():
+                self.counters["queued"] += 1
+            async with entry.lock:
+                self.waits.append(time.perf_counter() - started)
+                self.counters["runs"] += 1
+                yield
+        finally:
+            entry.users -= 1
+            if entry.users == 0 and self.locks.get(thread_id) is entry:
+                del self.locks[thread_id]
+
+    def busy(self, thread_id) -> bool:
+        """True while a run for `thread_id` is queued or in flight."""
+        return thread_id in self.locks
+
+    async def run(self, thread_id, key, fn):
+        """Run `fn()` under the thread lock, sharing the result with identical in-flight requests."""
+        if not self.enabled or thread_id is None:
+            return await fn()
+        inflight_key = (thread_id, key)
+        entry = self.inflight.get(inflight_key)
+        if entry is None:
+            entry = self.inflight[inflight_key] = Inflight(asyncio.get_running_loop().create_task(self._locked(thread_id, fn)))
+            entry.task.add_done_callback(lambda _: self.inflight.pop(inflight_key, None) if self.inflight.get(inflight_key) is entry else None)
+        else:
+            self.counters["coalesced"] += 1
+
+        entry.waiters += 1
+        try:
+            # a caller giving up (timeout, disconnect) doesn't cancel the run
+            # for the others; the last one to leave does
+            return await asyncio.shield(entry.task)
+        except asyncio.CancelledError:
+            if entry.waiters == 1 and not entry.task.done():
+                entry.task.cancel()
+            raise
+        finally:
+            entry.waiters -= 1
+
+    async def _locked(self, thread_id, fn):
+        async with self.hold(thread_id):
+            return await fn()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "active_threads": len(self.locks),
+            "inflight_requests": len(self.inflight),
+            **self.counters,
+            "lock_wait_p50_ms": percentile(self.waits, 0.5) * 1000,
+            "lock_wait_p99_ms": percentile(self.waits, 0.99) * 1000,
+            "lock_wait_max_ms": max(self.waits, default=0.0) * 1000,
+        }
+
+
+thread_locks = ThreadLocks()
@@ -0,0 +1,146 @@
+# thread_reaper.py
+# Evicts conversation threads from the checkpointer once they are idle for
+# longer than `thread_ttl_seconds`, or least-recently-used first once more
+# than `max_threads` are live.
+import asyncio
+import itertools
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+from src.services.checkpointer import checkpoint_bytes, checkpoint_thread_ids
+from src.services.logger import get_logger
+from src.services.thread_locks import thread_locks
+
+load_dotenv()
+
+log = get_logger("thread_reaper")
+
+
+class ThreadReaper:
+    def __init__(
+        self,
+        checkpointer: BaseCheckpointSaver,
+        ttl: float = float(os.getenv("thread_ttl_seconds", "3600")),
+        max_threads: int = int(os.getenv("max_threads", "10000")),
+        sweep_interval: float = float(os.getenv("thread_sweep_interval", "60")),
+    ):
+        self.checkpointer = checkpointer
+        self.ttl = ttl
+        self.max_threads = max_threads
+        self.sweep_interval = sweep_interval
+        # thread_id -> last access, oldest first
+        self.last_seen: OrderedDict[str, float] = OrderedDict()
+        self.evictions = {"ttl": 0, "lru": 0}
+        self.bytes_held = 0
+        self.task: asyncio.Task | None = None
+
+    async def touch(self, thread_id):
+        thread_id = str(thread_id)
+        self.last_seen[thread_id] = time.monotonic()
+        self.last_seen.move_to_end(thread_id)
+        overflow = len(self.last_seen) - self.max_threads
+        if overflow > 0:
+            await self.evict_lru(overflow)
+
+    def finish(self, thread_id):
+        """Called once a turn's checkpoints are written, so they count as seen."""
+        thread_id = str(thread_id)
+        if thread_id in self.last_seen:
+            self.last_seen[thread_id] = time.monotonic()
+            self.last_seen.move_to_end(thread_id)
+
+    async def evict_lru(self, overflow: int):
+        now = time.monotonic()
+        oldest = list(itertools.islice(self.last_seen.items(), overflow + 1))
+        # the least recent access that stays
+        cutoff = oldest[overflow][1] if len(oldest) > overflow else now
+        candidates = {}
+        for thread_id, seen in oldest[:overflow]:
+            if thread_locks.busy(thread_id):
+                continue
+            # another worker may have served this thread since we last saw it
+            age = await self.last_write_age(thread_id)
+            if age is not None and now - age > cutoff:
+                if self.last_seen.get(thread_id) == seen:
+                    self.last_seen[thread_id] = now - age
+                    self.last_seen.move_to_end(thread_id)
+                continue
+            candidates[thread_id] = seen
+        await self.evict(candidates, reason="lru")
+
+    async def evict(self, candidates: dict[str, float], reason: str):
+        """Delete each thread unless it was seen again or is busy since it was picked."""
+        for thread_id, seen in candidates.items():
+            if self.last_seen.get(thread_id) != seen or thread_locks.busy(thread_id):
+                continue
+            # a run arriving meanwhile waits for the delete instead of racing it
+            async with thread_locks.hold(thread_id):
+                self.last_seen.pop(thread_id, None)
+                await self.checkpointer.adelete_thread(thread_id)
+            self.evictions[reason] += 1
+            log.info("thread evicted", thread_id=thread_id, reason=reason)
+
+    async def last_write_age(self, thread_id: str) -> float | None:
+        checkpoint = await self.checkpointer.aget_tuple({"configurable": {"thread_id": thread_id}})
+        if checkpoint is None:
+            return None
+        return (datetime.now(timezone.utc) - datetime.fromisoformat(checkpoint.checkpoint["ts"])).total_seconds()
+
+    async def sweep(self):
+        now = time.monotonic()
+        cutoff = now - self.ttl
+        expired = {}
+        for thread_id, seen in list(self.last_seen.items()):
+            if seen > cutoff:
+                break
+            if thread_locks.busy(thread_id):
+                continue
+            # with several workers on one checkpointer another worker may
+            # have served this thread since we last saw it
+            age = await self.last_write_age(thread_id)
+            if age is not None and age < self.ttl:
+                if self.last_seen.get(thread_id) == seen:
+                    self.last_seen[thread_id] = now - age
+                    self.last_seen.move_to_end(thread_id)
+                continue
+            expired[thread_id] = seen
+        await self.evict(expired, reason="ttl")
+        self.bytes_held = await asyncio.to_thread(checkpoint_bytes, self.checkpointer)
+
+    async def run(self):
+        # threads persisted by a previous process start their TTL now
+        for thread_id in await asyncio.to_thread(checkpoint_thread_ids, self.checkpointer):
+            self.last_seen.setdefault(thread_id, time.monotonic())
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                log.exception("thread sweep failed")
+            await asyncio.sleep(self.sweep_interval)
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def stats(self) -> dict:
+        return {
+            "live_threads": len(self.last_seen),
+            "evictions": dict(self.evictions),
+            "bytes_held": self.bytes_held,
+            "ttl_seconds": self.ttl,
+            "max_threads": self.max_threads,
+        }
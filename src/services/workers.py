@@ -0,0 +1,152 @@
+# workers.py
+# Multi-worker production mode (`invoke prod --workers N`). Conversation
+# state is shared through the sqlite checkpointer; every worker process has
+# its own MCP client pool, tool caches and thread locks.
+#
+#   sticky     N uvicorn workers on internal ports (worker_base_port, +1, ...)
+#              behind sticky_router, which pins each checkpoint_id to one
+#              worker. Crashed workers are restarted.
+#   stateless  `uvicorn --workers N` on the public port. Any worker serves
+#              any turn; thread locks and idempotency keys only hold inside
+#              one worker, so two concurrent turns of a thread on different
+#              workers are not serialized.
+#
+# SIGTERM / SIGINT drains: the router stops accepting and finishes its
+# in-flight requests first, then the workers finish theirs, each within
+# `drain` seconds.
+#
+#   python -m src.services.workers --workers 4 --port 8000
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from dotenv import load_dotenv
+
+from src.services.logger import get_logger
+
+load_dotenv()
+
+log = get_logger("workers")
+
+
+def uvicorn_command(app: str, host: str, port: int, drain: float, *extra: str) -> list[str]:
+    return [sys.executable, "-m", "uvicorn", app, "--host", host, "--port", str(port),
+            "--timeout-graceful-shutdown", str(int(drain)), *extra]
+
+
+def shared_state_env() -> dict:
+    backend = os.getenv("checkpoint_backend", "sqlite").lower()
+    if backend == "memory":
+        raise SystemExit("checkpoint_backend=memory keeps conversations inside one process; "
+                         "multi-worker mode needs checkpoint_backend=sqlite")
+    return {**os.environ, "checkpoint_backend": backend}
+
+
+class Supervisor:
+    def __init__(
+        self,
+        app: str = "app:app",
+        workers: int = 2,
+        host: str = "0.0.0.0",
+        port: int = 8000,
+        routing: str = "sticky",
+        drain: float = float(os.getenv("worker_drain_seconds", "30")),
+        base_port: int | None = None,
+    ):
+        if routing not in ("sticky", "stateless"):
+            raise ValueError(f"unknown routing {routing!r}")
+        self.app = app
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.routing = routing
+        self.drain = drain
+        self.base_port = base_port or int(os.getenv("worker_base_port", str(port + 1)))
+        self.env = shared_state_env()
+        self.procs: dict[str, subprocess.Popen] = {}
+        self.commands: dict[str, tuple[list[str], dict]] = {}
+        self.stopping = False
+        self.restarts = 0
+
+    def worker_urls(self) -> list[str]:
+        return [f"http://127.0.0.1:{self.base_port + i}" for i in range(self.workers)]
+
+    def plan(self):
+        if self.routing == "stateless":
+            self.commands["workers"] = (uvicorn_command(self.app, self.host, self.port, self.drain, "--workers", str(self.workers)), self.env)
+            return
+        for i in range(self.workers):
+            self.commands[f"worker-{i}"] = (uvicorn_command(self.app, "127.0.0.1", self.base_port + i, self.drain),
+                                            {**self.env, "worker_id": str(i)})
+        self.commands["router"] = (uvicorn_command("src.services.sticky_router:app", self.host, self.port, self.drain),
+                                   {**self.env, "router_upstreams": ",".join(self.worker_urls())})
+
+    def spawn(self, name: str):
+        command, env = self.commands[name]
+        self.procs[name] = subprocess.Popen(command, env=env)
+        log.info("process started", process=name, pid=self.procs[name].pid)
+
+    def start(self):
+        self.plan()
+        for name in self.commands:
+            self.spawn(name)
+
+    def watch(self):
+        while not self.stopping:
+            for name, proc in list(self.procs.items()):
+                if proc.poll() is not None and not self.stopping:
+                    log.warning("process exited, restarting", process=name, code=proc.returncode)
+                    self.restarts += 1
+                    self.spawn(name)
+            time.sleep(0.5)
+
+    def terminate(self, names: list[str]):
+        procs = [self.procs[name] for name in names if self.procs[name].poll() is None]
+        for proc in procs:
+            proc.send_signal(signal.SIGTERM)
+        deadline = time.monotonic() + self.drain + 5
+        for proc in procs:
+            try:
+                proc.wait(timeout=max(0.1, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+
+    def stop(self, *_):
+        if self.stopping:
+            return
+        self.stopping = True
+        log.info("draining", routing=self.routing)
+        # the router first, so no new turns reach workers that are draining
+        if "router" in self.procs:
+            self.terminate(["router"])
+        self.terminate([name for name in self.procs if name != "router"])
+
+    def serve(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.start()
+        try:
+            self.watch()
+        finally:
+            self.stop()
+
+
+def serve(app: str = "app:app", workers: int = 2, host: str = "0.0.0.0", port: int = 8000,
+          routing: str = "sticky", drain: float = 30):
+    Supervisor(app, workers, host, port, routing, drain).serve()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="app:app")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--routing", choices=("sticky", "stateless"), default="sticky")
+    parser.add_argument("--drain", type=float, default=float(os.getenv("worker_drain_seconds", "30")))
+    args = parser.parse_args()
+    serve(args.app, args.workers, args.host, args.port, args.routing, args.drain)
@@ -1,7 +1,11 @@
 from src.utils.states import State
+from collections import OrderedDict
 import re
 import src.utils.constants as constants
+import hashlib
 import json
+import os
+import ormsgpack
 
 lounge_lables = {
     "SIA":{"value":"SIA" , "label":"Club Mobay / Sangster Intl" }, 
@@ -33,132 +37,163 @@ def extract_flight_date(target_date: str) -> str:
         return f"{month}/{day}/{year}"
     return ""
 
-def cart_formulator(cartData:dict):
-     cart_items = []
-     cart = {"cartData":[] , "cartItemId":""}
-     for item_key, cart_item in cartData.items():
-         schedule = cart_item["intermidiate"]["schedule"]
-         reservation = cart_item["intermidiate"]["reservation"]
-         schedule_info = cart_item["intermidiate"]["schedule_info"]
-         contact_info = cart_item["intermidiate"]["contact_info"]
-         isBundle = cart_item["summary"]["product"] == constants.BUNDLE
-         
-         if isBundle:
-            # Extract flight date in YY/MM/DD format from targetDate
-       
-            bundleItem = {
-                "key":item_key,
-                "value": {
-                    "sessionId":cart_item["intermidiate"]["sessionId"],
-                    "bookingDetail":{
-                        0:{
-                            "lounge":lounge_lables[schedule["arrival"]["airportId"]],
-                            "airlineName":{"value":get_prefix(schedule["arrival"]["flightId"]) , "label":schedule["arrival"]["airline"]},
-                            "airlineId":get_prefix(schedule["arrival"]["flightId"]),
-                            "flightNumber":{"value":schedule["arrival"]["flightNumber"] , "label":schedule["arrival"]["flightNumber"]},
-                            "flightTime_hour":get_time_lowercase(schedule["arrival"]["targetDate"]),
-                            "flightDate": extract_flight_date(schedule["arrival"]["targetDate"]),
-                        }, 
-                        1:{
-                            "lounge":lounge_lables[schedule["departure"]["airportId"]],
-                            "airlineName":{"value":get_prefix(schedule["departure"]["flightId"]) , "label":schedule["departure"]["airline"]},
-                            "airlineId":get_prefix(schedule["departure"]["flightId"]),
-                            "flightNumber":{"value":schedule["departure"]["flightNumber"] , "label":schedule["departure"]["flightNumber"]},
-                            "flightTime_hour":get_time_lowercase(schedule["departure"]["targetDate"]),
-                            "flightDate": extract_flight_date(schedule["departure"]["targetDate"])
-                        }
+def formulate_item(item_key, cart_item: dict) -> dict:
+    schedule = cart_item["intermidiate"]["schedule"]
+    reservation = cart_item["intermidiate"]["reservation"]
+    schedule_info = cart_item["intermidiate"]["schedule_info"]
+    contact_info = cart_item["intermidiate"]["contact_info"]
+    isBundle = cart_item["summary"]["product"] == constants.BUNDLE
+
+    if isBundle:
+        # Extract flight date in YY/MM/DD format from targetDate
+
+        bundleItem = {
+            "key":item_key,
+            "value": {
+                "sessionId":cart_item["intermidiate"]["sessionId"],
+                "bookingDetail":{
+                    0:{
+                        "lounge":lounge_lables[schedule["arrival"]["airportId"]],
+                        "airlineName":{"value":get_prefix(schedule["arrival"]["flightId"]) , "label":schedule["arrival"]["airline"]},
+                        "airlineId":get_prefix(schedule["arrival"]["flightId"]),
+                        "flightNumber":{"value":schedule["arrival"]["flightNumber"] , "label":schedule["arrival"]["flightNumber"]},
+                        "flightTime_hour":get_time_lowercase(schedule["arrival"]["targetDate"]),
+                        "flightDate": extract_flight_date(schedule["arrival"]["targetDate"]),
                     },
-                    "currentCartItem": reservation,
-                    "adultCount":schedule_info["pessanger_count"].get("adult" , 0),
-                    "childCount":schedule_info["pessanger_count"].get("children" , 0),
-                    "infantCount":schedule_info["pessanger_count"].get("infant" , 0),
-                    "data":{
-                        "passengerInfo":{
-                            "adults":contact_info["passengerDetails"].get("adults", []),
-                            "childs":contact_info["passengerDetails"].get("children", []),
-                            "infant":contact_info["passengerDetails"].get("infant", []),
-                        "primaryContactDetails":{
-                            "title":title_lables[contact_info["contact"]["title"]],
-                            "firstName":contact_info["contact"]["firstName"],
-                            "lastName":contact_info["contact"]["lastName"],
-                            "email":contact_info["contact"]["email"],
-                            "confirmEmail":contact_info["contact"]["email"],
-                            "phone":contact_info["contact"]["phone"],
-                        },
-                        "secondaryContactDetails":{
-                            "heading":"",
-                            "title":{"value":"","label":""},
-                            "firstName":"",
-                            "lastName":"",
-                            "email":"",
-                            "confirmEmail":"",
-                            "phone":"",
-                        },
-                        "greetingDetail":{
-                            0:{"name":"" , "occasion":{"value":"" , "label":""},"occasionDetail":"" },
-                        },
-                        },
-                        "productid":cart_item["summary"]["product"],
-                        "cartItemId":item_key,
+                    1:{
+                        "lounge":lounge_lables[schedule["departure"]["airportId"]],
+                        "airlineName":{"value":get_prefix(schedule["departure"]["flightId"]) , "label":schedule["departure"]["airline"]},
+                        "airlineId":get_prefix(schedule["departure"]["flightId"]),
+                        "flightNumber":{"value":schedule["departure"]["flightNumber"] , "label":schedule["departure"]["flightNumber"]},
+                        "flightTime_hour":get_time_lowercase(schedule["departure"]["targetDate"]),
+                        "flightDate": extract_flight_date(schedule["departure"]["targetDate"])
                     }
+                },
+                "currentCartItem": reservation,
+                "adultCount":schedule_info["pessanger_count"].get("adult" , 0),
+                "childCount":schedule_info["pessanger_count"].get("children" , 0),
+                "infantCount":schedule_info["pessanger_count"].get("infant" , 0),
+                "data":{
+                    "passengerInfo":{
+                        "adults":contact_info["passengerDetails"].get("adults", []),
+                        "childs":contact_info["passengerDetails"].get("children", []),
+                        "infant":contact_info["passengerDetails"].get("infant", []),
+                    "primaryContactDetails":{
+                        "title":title_lables[contact_info["contact"]["title"]],
+                        "firstName":contact_info["contact"]["firstName"],
+                        "lastName":contact_info["contact"]["lastName"],
+                        "email":contact_info["contact"]["email"],
+                        "confirmEmail":contact_info["contact"]["email"],
+                        "phone":contact_info["contact"]["phone"],
+                    },
+                    "secondaryContactDetails":{
+                        "heading":"",
+                        "title":{"value":"","label":""},
+                        "firstName":"",
+                        "lastName":"",
+                        "email":"",
+                        "confirmEmail":"",
+                        "phone":"",
+                    },
+                    "greetingDetail":{
+                        0:{"name":"" , "occasion":{"value":"" , "label":""},"occasionDetail":"" },
+                    },
+                    },
+                    "productid":cart_item["summary"]["product"],
+                    "cartItemId":item_key,
                 }
             }
-            cart_items.append(bundleItem)
-            cart["cartItemId"] = item_key
-         else:
-            single_item  = {
-                "key":item_key,
-                "value": {
-                    "sessionId":cart_item["intermidiate"]["sessionId"],
-                    "bookingDetail":{
-                        "lounge":lounge_lables[schedule["airportId"]],
-                        "airlineName":{"value":get_prefix(schedule["flightId"]) , "label":schedule["airline"]},
-                        "airlineId":get_prefix(schedule["flightId"]),
-                        "flightNumber":{"value":schedule["flightNumber"] , "label":schedule["flightNumber"]},
-                        "flightTime_hour":get_time_lowercase(schedule["targetDate"]),
-                        "flightDate": extract_flight_date(schedule["targetDate"]),
+        }
+        return bundleItem
+    else:
+        single_item  = {
+            "key":item_key,
+            "value": {
+                "sessionId":cart_item["intermidiate"]["sessionId"],
+                "bookingDetail":{
+                    "lounge":lounge_lables[schedule["airportId"]],
+                    "airlineName":{"value":get_prefix(schedule["flightId"]) , "label":schedule["airline"]},
+                    "airlineId":get_prefix(schedule["flightId"]),
+                    "flightNumber":{"value":schedule["flightNumber"] , "label":schedule["flightNumber"]},
+                    "flightTime_hour":get_time_lowercase(schedule["targetDate"]),
+                    "flightDate": extract_flight_date(schedule["targetDate"]),
+                },
+                "currentCartItem": reservation,
+                "adultCount":schedule_info["pessanger_count"].get("adult" , 0),
+                "childCount":schedule_info["pessanger_count"].get("children" , 0),
+                "infantCount":schedule_info["pessanger_count"].get("infant" , 0),
+                "data":{
+                    "passengerInfo":{
+                        "adults":contact_info["passengerDetails"].get("adults", []),
+                        "childs":contact_info["passengerDetails"].get("children", []),
+                        "infant":contact_info["passengerDetails"].get("infant", []) ,
+
+                    "primaryContactDetails":{
+                        "title":title_lables[contact_info["contact"]["title"]],
+                        "firstName":contact_info["contact"]["firstName"],
+                        "lastName":contact_info["contact"]["lastName"],
+                        "email":contact_info["contact"]["email"],
+                        "confirmEmail":contact_info["contact"]["email"],
+                        "phone":contact_info["contact"]["phone"],
                     },
-                    "currentCartItem": reservation,
-                    "adultCount":schedule_info["pessanger_count"].get("adult" , 0),
-                    "childCount":schedule_info["pessanger_count"].get("children" , 0),
-                    "infantCount":schedule_info["pessanger_count"].get("infant" , 0),
-                    "data":{
-                        "passengerInfo":{
-                            "adults":contact_info["passengerDetails"].get("adults", []),
-                            "childs":contact_info["passengerDetails"].get("children", []),
-                            "infant":contact_info["passengerDetails"].get("infant", []) , 
-                            
-                        "primaryContactDetails":{
-                            "title":title_lables[contact_info["contact"]["title"]],
-                            "firstName":contact_info["contact"]["firstName"],
-                            "lastName":contact_info["contact"]["lastName"],
-                            "email":contact_info["contact"]["email"],
-                            "confirmEmail":contact_info["contact"]["email"],
-                            "phone":contact_info["contact"]["phone"],
-                        },
-                        "secondaryContactDetails":{
-                            "heading":"",
-                            "title":{"value":"","label":""},
-                            "firstName":"",
-                            "lastName":"",
-                            "email":"",
-                            "confirmEmail":"",
-                            "phone":"",
-                        },
-                        "greetingDetail":{
-                            0:{"name":"" , "occasion":{"value":"" , "label":""},"occasionDetail":"" },
-                        },
-                        },
-                        
-                        "productid":cart_item["summary"]["product"],
-                        "cartItemId":item_key,
-                    }
+                    "secondaryContactDetails":{
+                        "heading":"",
+                        "title":{"value":"","label":""},
+                        "firstName":"",
+                        "lastName":"",
+                        "email":"",
+                        "confirmEmail":"",
+                        "phone":"",
+                    },
+                    "greetingDetail":{
+                        0:{"name":"" , "occasion":{"value":"" , "label":""},"occasionDetail":"" },
+                    },
+                    },
+
+                    "productid":cart_item["summary"]["product"],
+                    "cartItemId":item_key,
                 }
             }
-            cart_items.append(single_item)
-            cart["cartItemId"] = item_key
-            
-    
-     cart["cartData"] = cart_items
-     
-     return cart
\ No newline at end of file
+        }
+        return single_item
+
+
+def cart_item_digest(cart_item: dict) -> bytes | None:
+    """Content hash of a cart item, computed on every lookup; None when it can't be encoded."""
+    try:
+        # msgpack keeps key order, an item read back from a checkpoint hashes the same
+        return hashlib.blake2b(ormsgpack.packb(cart_item, option=ormsgpack.OPT_NON_STR_KEYS), digest_size=12).digest()
+    except TypeError:
+        return None
+
+
+# (cartitemid, content hash) -> formulated item, least recently used first.
+# show_cart's re-prompts and every later add_to_cart only build items that
+# are new or changed, whichever worker changed them. Entries are shared by
+# every payload built from them and must be treated as read-only; nothing
+# downstream changes them, they are only sent to the client and checkpointed.
+formulated: OrderedDict[tuple, dict] = OrderedDict()
+formulated_size = int(os.getenv("cart_cache_size", "4096"))
+
+
+def formulated_item(item_key, cart_item: dict) -> dict:
+    digest = cart_item_digest(cart_item)
+    if digest is None:
+        return formulate_item(item_key, cart_item)
+    key = (item_key, digest)
+    item = formulated.get(key)
+    if item is None:
+        item = formulated[key] = formulate_item(item_key, cart_item)
+        if len(formulated) > formulated_size:
+            formulated.popitem(last=False)
+    else:
+        formulated.move_to_end(key)
+    return item
+
+
+def cart_formulator(cartData:dict):
+     cart = {"cartData":[] , "cartItemId":""}
+     for item_key, cart_item in cartData.items():
+         cart["cartData"].append(formulated_item(item_key, cart_item))
+         cart["cartItemId"] = item_key
+     return cart
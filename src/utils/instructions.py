@@ -365,6 +365,18 @@ IMPORTANT: Include all user-provided details from the conversation history (flig
 The summary will be used as a system message to maintain context.
 """
 
+# Rolling history summary - older turns are folded into this so prompts
+# only carry the latest turns verbatim
+history_summary_instruction = PromptTemplate.from_template(
+"""Update the running summary of this lounge booking conversation with the messages below.
+
+Current summary:
+{summary}
+
+Keep every user-provided detail (lounge type, airports, flight numbers, dates, passenger counts, names, contact details, cart items and prices) and any decision the user has made. Drop greetings and repeated questions. Write plain, compact sentences in the message field.
+"""
+)
+
 # Mapping
 inst_map = {
     constants.DIRECTION: direction_instruction,
@@ -372,5 +384,6 @@ inst_map = {
     constants.SCHEDULE_INFO: get_schedule_instruction,
     constants.CONTACT_INFO: contact_instruction, 
     constants.CART: cart_summary_instruction_prompt,
-    "summarize": summarize_response
+    "summarize": summarize_response,
+    "history_summary": history_summary_instruction,
 }
@@ -1,5 +1,8 @@
 import src.utils.constants as constants
 import copy
+from src.services.logger import get_logger
+
+log = get_logger("schema")
 
 direction_schema = {
     "title": "Classify_Schema",
@@ -109,7 +112,7 @@ common_schema_without_human_input = {
 
 
 def schedule_schema(productType):
-    print('schedule schema triggered ' , productType)
+    log.debug('schedule schema built', product_type=productType)
     isBundle = productType == constants.BUNDLE
     pessanger_count = {
         "type":"object",
@@ -426,5 +429,6 @@ schema_map = {
     constants.FAILURE_HANDLER: failure_schema,
     constants.CONTACT_INFO: generate_contact_schema , 
     constants.CART: cart_summary_schema,
+    "history_summary": common_schema_without_human_input,
 }
 
@@ -1,19 +1,28 @@
 from pydantic import BaseModel
 from typing import Optional , Any
 from typing import TypedDict, Annotated, Optional, Literal , List , Dict
+from langchain_core.messages import RemoveMessage
 from langgraph.graph import add_messages 
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
 
 # request / response
 class ChatRequest(BaseModel):
     message: str
     checkpoint_id: Optional[str | int] = None
+    # also accepted as the Idempotency-Key header
+    idempotency_key: Optional[str] = None
+    # include state / full_data in the response (default: chat_response_debug)
+    debug: Optional[bool] = None
 
 class ChatResponse(BaseModel):
     content: Any
     checkpoint_id: Optional[str | int] = None
-    status: str = "complete",
-    state: Optional[Any] = None  # To include the full content of the response
-    full_data: Optional[Any] = None  # To include the full content of the response
+    status: str = "complete"  # "pending" while a background job holds the turn
+    job: Optional[Any] = None  # id and poll / events urls of that job
+    current_step: Optional[str] = None
+    cart: Optional[Any] = None  # item summaries, count and total
+    state: Optional[Any] = None  # debug only: the graph's data
+    full_data: Optional[Any] = None  # debug only: the full graph state
 
 # workflow
 
@@ -46,12 +55,25 @@ class ClientEvent(TypedDict):
     event: str
     payload: Dict[str, Any]
     
+def replace_messages(*messages) -> list:
+    """A `messages` update that drops the history instead of appending to it."""
+    return [RemoveMessage(id=REMOVE_ALL_MESSAGES), *messages]
+
+def reset_messages(*messages) -> dict:
+    """State updates that replace the history; the rolling summary of the old one goes too."""
+    return {"messages": replace_messages(*messages), "summary": "", "summarized_count": 0}
+
 # state
 class State(TypedDict):
-    messages: List
+    # nodes return only new messages; add_messages appends them (same id
+    # replaces) so a step writes its delta, reset_messages() resets
+    messages: Annotated[List, add_messages]
     current_step:str
     failure_step:bool = False
     executionFlow:List
     data:Data = None
     client_events: List[ClientEvent]
+    # rolling summary of messages[:summarized_count], see src/services/history.py
+    summary: str
+    summarized_count: int
     
\ No newline at end of file
@@ -6,7 +6,15 @@ def dev(c):
     """Run in development with auto-reload"""
     c.run("uvicorn app:app --reload --host 0.0.0.0 --port 8000")
 
-@task
-def prod(c):
+@task(help={
+    "workers": "worker processes; more than 1 shares conversations through the sqlite checkpointer",
+    "routing": "sticky (router pins each checkpoint_id to a worker) or stateless (uvicorn --workers)",
+    "drain": "seconds each process gets to finish in-flight requests on shutdown",
+})
+def prod(c, workers=1, routing="sticky", port=8000, drain=30):
     """Run in production mode"""
-    c.run("uvicorn app:app --host 0.0.0.0 --port 8000")
\ No newline at end of file
+    if workers <= 1:
+        c.run(f"uvicorn app:app --host 0.0.0.0 --port {port} --timeout-graceful-shutdown {drain}")
+        return
+    from src.services.workers import serve
+    serve("app:app", workers, "0.0.0.0", port, routing, drain)
@@ -0,0 +1,34 @@
+# tests/test_cart_formulator.py
+# The per-item cart memo serves an item only while its content is unchanged,
+# also when the change was made elsewhere (another worker) under the same id.
+#
+#   python -m pytest tests/test_cart_formulator.py
+import src.utils.helpers as helpers
+from benchmarks.cart_formulator import cart_item, rebuild, round_trip
+from src.utils.helpers import cart_formulator
+
+
+def test_memoized_payload_matches_a_rebuild():
+    helpers.formulated.clear()
+    cart = round_trip(dict(cart_item(i) for i in range(4)))
+    assert cart_formulator(cart) == rebuild(cart)
+    # a re-prompt after a checkpoint round trip is served from the memo
+    assert cart_formulator(round_trip(cart)) == rebuild(cart)
+    assert len(helpers.formulated) == 4
+
+
+def test_changed_item_with_the_same_id_is_built_again():
+    helpers.formulated.clear()
+    key, item = cart_item(1)
+    cart = round_trip({key: item})
+    before = cart_formulator(cart)
+
+    changed = round_trip(cart)
+    changed[key]["intermidiate"]["schedule_info"]["pessanger_count"]["adult"] = 5
+    changed[key]["intermidiate"]["reservation"]["retail"] = 999
+    after = cart_formulator(changed)
+
+    assert after == rebuild(changed)
+    assert after != before
+    assert after["cartData"][0]["value"]["adultCount"] == 5
+    assert after["cartData"][0]["value"]["currentCartItem"]["retail"] == 999
@@ -0,0 +1,54 @@
+# tests/test_checkpointer.py
+# A failed delete_thread rolls back, so the write-behind connection it
+# shares with the flusher isn't left inside an open transaction.
+#
+#   python -m pytest tests/test_checkpointer.py
+import sqlite3
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+
+from src.services.checkpointer import SqliteCheckpointer
+
+
+class FailingDeletes:
+    """sqlite3 connection stand-in whose DELETE FROM writes fails."""
+
+    def __init__(self, conn, table: str):
+        self.conn = conn
+        self.table = table
+
+    def execute(self, sql, *args):
+        if sql.startswith(f"DELETE FROM {self.table}"):
+            raise sqlite3.OperationalError("disk I/O error")
+        return self.conn.execute(sql, *args)
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+
+def config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+
+
+def test_failed_delete_rolls_back(tmp_path):
+    saver = SqliteCheckpointer(path=str(tmp_path / "checkpoints.sqlite"))
+    try:
+        saver.put(config("a"), empty_checkpoint(), {}, {})
+        saver.flush()
+        conn = saver.conn
+        saver.conn = FailingDeletes(conn, "writes")
+        with pytest.raises(sqlite3.OperationalError):
+            saver.delete_thread("a")
+        saver.conn = conn
+
+        assert not conn.in_transaction
+        # nothing was deleted and the flusher can still commit
+        assert saver.get_tuple(config("a")) is not None
+        saver.put(config("b"), empty_checkpoint(), {}, {})
+        saver.flush()
+        assert saver.get_tuple(config("b")) is not None
+        saver.delete_thread("a")
+        assert saver.get_tuple(config("a")) is None
+    finally:
+        saver.close()
@@ -0,0 +1,50 @@
+# tests/test_fast_path.py
+# The fast path reads a second cart item's details once contact() has reset
+# the messages, and nothing of the first item's.
+#
+#   python -m pytest tests/test_fast_path.py
+from datetime import date
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph.message import add_messages
+
+import src.utils.constants as constants
+from src.services.fast_path import FastPathExtractor
+from src.utils.states import reset_messages
+
+TODAY = date(2030, 1, 1)
+
+
+def test_second_cart_item_after_reset():
+    first_item = [
+        HumanMessage(content="arrival"),
+        AIMessage(content="Which flight?"),
+        HumanMessage(content="AF2859 into SIA on 8 June 2030, 2 adults"),
+    ]
+    # contact() puts the first item in the cart and resets the messages
+    messages = add_messages(first_item, reset_messages()["messages"])
+    messages = add_messages(messages, [
+        HumanMessage(content="add another, arrival"),
+        AIMessage(content="Which flight?"),
+        HumanMessage(content="BA123 into NMIA on 12 July 2030, 1 adult and 2 children"),
+    ])
+    state = {"messages": messages, "data": {"product_type": constants.ARRIVAL, "cart": {"1": {}}}}
+
+    response = FastPathExtractor(enabled=True).extract(constants.SCHEDULE_INFO, state, today=TODAY)
+
+    assert response[constants.SCHEDULE_INFO] == {
+        "airportid": "NMIA",
+        "direction": "A",
+        "traveldate": "20300712",
+        "flightId": "BA123",
+        "pessanger_count": {"adult": 1, "children": 2},
+    }
+
+
+def test_without_the_reset_both_items_conflict():
+    messages = [
+        HumanMessage(content="AF2859 into SIA on 8 June 2030, 2 adults"),
+        HumanMessage(content="BA123 into NMIA on 12 July 2030, 1 adult and 2 children"),
+    ]
+    state = {"messages": messages, "data": {"product_type": constants.ARRIVAL, "cart": {"1": {}}}}
+    assert FastPathExtractor(enabled=True).extract(constants.SCHEDULE_INFO, state, today=TODAY) is None
@@ -0,0 +1,42 @@
+# tests/test_history.py
+# A replaced message list takes the rolling summary with it, also when the
+# new list is as long as the part the old summary covered.
+#
+#   python -m pytest tests/test_history.py
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.services.history import HistoryManager
+from src.utils.states import State, reset_messages
+
+
+async def summarize(summary: str, messages: list) -> str:
+    return "old summary"
+
+
+def test_reset_clears_the_summary_in_state():
+    def old_conversation(state):
+        return {"messages": [HumanMessage(content="hi"), AIMessage(content="hello")], "summary": "old summary", "summarized_count": 1}
+
+    def item_added(state):
+        # the list is reset to one message, no longer than summarized_count
+        return reset_messages(AIMessage(content="added to cart"))
+
+    graph = StateGraph(State)
+    graph.add_node("old", old_conversation)
+    graph.add_node("reset", item_added)
+    graph.add_edge(START, "old")
+    graph.add_edge("old", "reset")
+    graph.add_edge("reset", END)
+    state = asyncio.run(graph.compile(MemorySaver()).ainvoke({"messages": []}, {"configurable": {"thread_id": "t"}}))
+
+    assert [m.content for m in state["messages"]] == ["added to cart"]
+    assert state["summary"] == ""
+    assert state["summarized_count"] == 0
+    history = HistoryManager(summarize)
+    sm = SystemMessage(content="system")
+    assert history.prompt(sm, state) == [sm, *state["messages"]]
+    assert asyncio.run(history.fold(state, "contact")) == {}
@@ -0,0 +1,25 @@
+# tests/test_logger.py
+# Records carry the fields as they were when logged, not as the caller
+# changed them before the writer thread got to them.
+#
+#   python -m pytest tests/test_logger.py
+import io
+import json
+
+import src.services.logger as logger
+
+
+def test_fields_are_snapshotted_when_logged():
+    stream = io.StringIO()
+    logger.configure(level="DEBUG", stream=stream)
+    try:
+        log = logger.get_logger("test")
+        payload = {"cart": {"items": [1]}, "step": "contact"}
+        log.info("cart", payload=payload)
+        payload["cart"]["items"].append(2)
+        payload["step"] = "payment"
+        del payload["cart"]
+    finally:
+        logger.stop()
+    entry = json.loads(stream.getvalue().splitlines()[-1])
+    assert entry["payload"] == {"cart": {"items": [1]}, "step": "contact"}
@@ -0,0 +1,59 @@
+# tests/test_mcp_client.py
+# ToolResultCache call sharing: callers that joined an in-flight call keep
+# it when the caller that started it gives up.
+#
+#   python -m pytest tests/test_mcp_client.py
+import asyncio
+
+import pytest
+
+from src.services.mcp_client import ToolResultCache
+
+SCHEDULE = {"airportid": "SIA", "direction": "A", "traveldate": "20260101", "flightId": "AF2859"}
+
+
+def test_leader_cancellation_does_not_reach_followers():
+    async def scenario():
+        cache = ToolResultCache()
+        release = asyncio.Event()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await release.wait()
+            return "answer"
+
+        leader = asyncio.create_task(cache.get_or_call("schedule", SCHEDULE, call))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get_or_call("schedule", SCHEDULE, call))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        release.set()
+        assert await follower == "answer"
+        assert len(calls) == 1
+        assert cache.stats()["inflight"] == 0
+        # the finished call is cached for the next caller
+        assert await cache.get_or_call("schedule", SCHEDULE, call) == "answer"
+        assert len(calls) == 1
+
+    asyncio.run(scenario())
+
+
+def test_failed_call_is_shared_but_not_cached():
+    async def scenario():
+        cache = ToolResultCache()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0)
+            raise ConnectionError("down")
+
+        results = await asyncio.gather(*(cache.get_or_call("schedule", SCHEDULE, call) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, ConnectionError) for result in results)
+        assert len(calls) == 1
+        assert cache.stats()["entries"] == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,133 @@
+# tests/test_mcp_results.py
+# The typed records McpClient parses tool answers into: ok and error
+# answers, standby reservations, non-JSON text and bundle legs stored as JSON
+# strings by checkpoints written before results were parsed once.
+#
+#   python -m pytest tests/test_mcp_results.py
+import json
+
+import pytest
+
+from benchmarks.fakes import fake_reservation, fake_schedule
+from src.services.mcp_results import ContactResult, PaymentResult, ReservationResult, ScheduleResult, ToolResult, parse_result
+
+ARRIVAL = fake_schedule({"direction": "A", "airportid": "SIA", "flightId": "AF2859"})
+DEPARTURE = fake_schedule({"direction": "D", "airportid": "SIA", "flightId": "BA123"})
+RESERVATION = fake_reservation({"adulttickets": 2, "productid": "BUNDLE"})
+
+
+@pytest.mark.parametrize("answer", [json.dumps(ARRIVAL), ARRIVAL, json.dumps(ARRIVAL).encode()])
+def test_schedule_ok(answer):
+    result = parse_result("schedule", answer)
+    assert type(result) is ScheduleResult
+    assert result.ok
+    assert result.schedule_id == ARRIVAL["scheduleId"]
+    assert result.as_dict() == ARRIVAL
+
+
+@pytest.mark.parametrize("answer", [json.dumps({"scheduleId": 0}), json.dumps({"error": "no flight"}), "{}"])
+def test_schedule_without_id_is_not_ok(answer):
+    result = parse_result("schedule", answer)
+    assert not result.ok
+    assert result.error is None
+
+
+@pytest.mark.parametrize("answer", ["<html>bad gateway</html>", "", json.dumps([1, 2]), None])
+def test_schedule_non_json(answer):
+    result = parse_result("schedule", answer)
+    assert not result.ok
+    assert result.error == "Invalid response format"
+    assert result.data == {}
+
+
+def test_schedule_legacy_string_bundle_legs():
+    # bundle legs in old checkpoints are the tool's JSON text
+    legs = {"arrival": json.dumps(ARRIVAL), "departure": json.dumps(DEPARTURE)}
+    assert ScheduleResult.parse(legs["arrival"]).schedule_id == ARRIVAL["scheduleId"]
+    assert ScheduleResult.parse(legs["departure"]).schedule_id == DEPARTURE["scheduleId"]
+    # and legs stored as dicts since read the same
+    assert ScheduleResult.parse(DEPARTURE).schedule_id == DEPARTURE["scheduleId"]
+    assert ScheduleResult.parse({}).schedule_id is None
+
+
+def test_reservation_ok():
+    result = parse_result("reservation", json.dumps(RESERVATION))
+    assert type(result) is ReservationResult
+    assert result.ok
+    assert not result.is_standby
+    assert result.cartitemid == RESERVATION["data"]["cartitemid"]
+
+
+def test_reservation_standby():
+    result = parse_result("reservation", json.dumps({"isStandBy": True, "data": {"cartitemid": 7}}))
+    assert result.is_standby
+    assert result.cartitemid == 7
+    assert not result.ok
+
+
+@pytest.mark.parametrize("answer", [
+    json.dumps({"isStandBy": False, "data": {}}),
+    json.dumps({"isStandBy": False, "data": None, "statusMessage": "sold out"}),
+    json.dumps({"statusMessage": "sold out"}),
+])
+def test_reservation_error(answer):
+    result = parse_result("reservation", answer)
+    assert result.cartitemid is None
+    assert not result.ok
+    assert result.as_dict() == json.loads(answer)
+
+
+def test_reservation_non_json():
+    result = parse_result("reservation", "Internal Server Error")
+    assert not result.ok
+    assert result.error == "Invalid response format"
+    assert not result.is_standby
+
+
+def test_payment_ok():
+    result = parse_result("payment2", json.dumps({"status": 0, "statusMessage": "Success"}))
+    assert type(result) is PaymentResult
+    assert result.ok
+
+
+@pytest.mark.parametrize("answer, message", [
+    (json.dumps({"error": "card declined"}), "card declined"),
+    (json.dumps({}), "Unknown payment error"),
+    ("timeout", "Invalid response format"),
+    (json.dumps("declined"), "Invalid response format"),
+])
+def test_payment_error(answer, message):
+    result = parse_result("payment2", answer)
+    assert not result.ok
+    assert result.error_message == message
+
+
+def test_contact_ok():
+    result = parse_result("contact", json.dumps({"status": 0, "statusMessage": "Success"}))
+    assert type(result) is ContactResult
+    assert result.ok
+
+
+@pytest.mark.parametrize("answer, message", [
+    (json.dumps({"status": 1, "statusMessage": "Invalid email"}), "Invalid email"),
+    (json.dumps({"error": "cart item not found"}), "cart item not found"),
+    (json.dumps({"status": 2}), "Unknown contact error"),
+    (json.dumps({}), "Unknown contact error"),
+    ("Bad Gateway", "Invalid response format"),
+])
+def test_contact_error(answer, message):
+    result = parse_result("contact", answer)
+    assert not result.ok
+    assert result.error_message == message
+
+
+def test_records_are_shared_safely():
+    record = parse_result("schedule", ARRIVAL)
+    assert not hasattr(record, "__dict__")
+    assert ScheduleResult.parse(record) is record
+    copy = record.as_dict()
+    copy["scheduleId"] = 0
+    assert record.data["scheduleId"] == ARRIVAL["scheduleId"]
+    # a generic record handed to a typed parse is retyped
+    assert type(ReservationResult.parse(parse_result("other", json.dumps(RESERVATION)))) is ReservationResult
+    assert type(parse_result("unknown_tool", "{}")) is ToolResult
@@ -0,0 +1,122 @@
+# tests/test_mcp_transport.py
+# Circuit breaker trials and SessionPool bookkeeping under cancellation and
+# server errors, without an MCP server.
+#
+#   python -m pytest tests/test_mcp_transport.py
+import asyncio
+import time
+
+import pytest
+from langchain_core.tools import ToolException
+from mcp.shared.exceptions import McpError
+from mcp.types import CallToolResult, ErrorData, TextContent
+
+from src.services.mcp_client import McpClient
+from src.services.mcp_transport import CircuitOpenError, PooledSession, SessionPool
+
+
+class HangingPool:
+    """Stands in for SessionPool: the first call hangs, later calls answer."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def call_tool(self, name, arguments):
+        self.calls += 1
+        if self.calls == 1:
+            await asyncio.Event().wait()
+        return '{"status": 0}'
+
+
+def half_open_client() -> McpClient:
+    client = McpClient(server_url="http://127.0.0.1:1/sse")
+    client.pool = HangingPool()
+    client.breaker.opened_at = time.monotonic() - client.breaker.reset_timeout - 1
+    client.breaker.failures = client.breaker.failure_threshold
+    return client
+
+
+def test_cancelled_half_open_trial_lets_the_next_call_through():
+    async def scenario():
+        client = half_open_client()
+        trial = asyncio.create_task(client._call("contact", {}))
+        await asyncio.sleep(0)
+        assert client.breaker.trial_running
+        with pytest.raises(CircuitOpenError):
+            await client._call("contact", {})
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        assert not client.breaker.trial_running
+        assert client.breaker.state == "half_open"
+        result = await client._call("contact", {})
+        assert result.ok
+        assert client.breaker.state == "closed"
+
+    asyncio.run(scenario())
+
+
+def pool_with(session) -> SessionPool:
+    pool = SessionPool({"url": "http://127.0.0.1:1/sse", "transport": "sse"}, size=1, max_concurrency=1)
+    pooled = PooledSession()
+    pooled.session = session
+    pool.sessions = [pooled]
+    return pool
+
+
+class ErrorSession:
+    async def call_tool(self, name, arguments):
+        raise McpError(ErrorData(code=-32602, message="unknown tool"))
+
+
+class BrokenSession:
+    async def call_tool(self, name, arguments):
+        raise ConnectionError("stream closed")
+
+
+class SlowSession:
+    async def call_tool(self, name, arguments):
+        await asyncio.sleep(0.05)
+        return CallToolResult(content=[TextContent(type="text", text="{}")])
+
+
+def test_server_error_keeps_the_session():
+    async def scenario():
+        pool = pool_with(ErrorSession())
+        with pytest.raises(ToolException):
+            await pool.call_tool("contact", {})
+        assert pool.sessions[0].alive
+        assert pool.counters["discarded"] == 0
+        assert pool.counters["errors"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_transport_error_discards_the_session():
+    async def scenario():
+        pool = pool_with(BrokenSession())
+        with pytest.raises(ConnectionError):
+            await pool.call_tool("contact", {})
+        assert not pool.sessions[0].alive
+        assert pool.counters["discarded"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_while_waiting_does_not_leak_counters():
+    async def scenario():
+        pool = pool_with(SlowSession())
+        running = asyncio.create_task(pool.call_tool("contact", {}))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(pool.call_tool("contact", {}))
+        await asyncio.sleep(0)
+        assert pool.counters["waiting"] == 1
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert pool.counters["waiting"] == 0
+        assert await running == "{}"
+        assert pool.semaphore._value == 1
+        assert pool.sessions[0].in_flight == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,29 @@
+# tests/test_serde.py
+# Switching checkpoint_serde keeps existing rows readable both ways.
+#
+#   python -m pytest tests/test_serde.py
+import pytest
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from src.services.serde import CompactSerializer, get_serde, zstandard
+
+VALUE = {"messages": [AIMessage(content="hello " * 200)], "data": {"cart": {"1": {"amount": 120}}}}
+CODECS = ["zlib", "none"] + (["zstd"] if zstandard else [])
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_default_reads_compact_rows(codec):
+    row = CompactSerializer(codec, min_bytes=0).dumps_typed(VALUE)
+    assert row[0].endswith(f"+{codec}") or codec == "none"
+    assert get_serde("default").loads_typed(row) == VALUE
+
+
+def test_default_writes_what_langgraph_writes():
+    assert get_serde("default").dumps_typed(VALUE) == JsonPlusSerializer().dumps_typed(VALUE)
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_compact_reads_default_rows(codec):
+    row = get_serde("default").dumps_typed(VALUE)
+    assert CompactSerializer(codec).loads_typed(row) == VALUE
@@ -0,0 +1,85 @@
+# tests/test_thread_locks.py
+# Concurrent turns hammering one thread id (benchmarks.thread_hammer as a
+# test): graph runs for the thread never overlap, every distinct answer is
+# recorded exactly once and every request gets an answer.
+#
+#   python -m pytest tests/test_thread_locks.py
+import asyncio
+import os
+import random
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+import src.controller.chat as chat
+import src.scripts.workflow as workflow
+from benchmarks.fakes import FakeChatModel
+from src.services.thread_locks import thread_locks
+
+# answers that never settle the product type keep the thread at the interrupt
+RESPONSES = {
+    "Classify_Schema": {"direction": "booking"},
+    "product_type_schema": {"product_type": "ARRIVALONLY", "message": "Which lounge would you like?", "human_input": True},
+}
+
+
+class RunProbe:
+    """compiled_graph stand-in that records how many runs overlap."""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.running = 0
+        self.most = 0
+
+    async def ainvoke(self, *args, **kwargs):
+        self.running += 1
+        self.most = max(self.most, self.running)
+        try:
+            return await self.graph.ainvoke(*args, **kwargs)
+        finally:
+            self.running -= 1
+
+    def __getattr__(self, name):
+        return getattr(self.graph, name)
+
+
+@pytest.fixture
+def probe(monkeypatch):
+    monkeypatch.setattr(workflow, "llm", FakeChatModel(latency=0.01, responses=RESPONSES))
+    monkeypatch.setattr(thread_locks, "enabled", True)
+    probe = RunProbe(chat.compiled_graph)
+    monkeypatch.setattr(chat, "compiled_graph", probe)
+    return probe
+
+
+def test_hammered_thread_records_every_answer_once(probe):
+    answers, duplicates = 10, 3
+    thread_id = "test-hammer"
+
+    async def scenario():
+        await chat.Chat(message="hello, lounge please", checkpoint_id=thread_id).run()
+        requests = [f"answer {i}" for i in range(answers) for _ in range(duplicates)]
+        random.Random(3).shuffle(requests)
+        results = await asyncio.gather(*(chat.Chat(message=m, checkpoint_id=thread_id).run() for m in requests))
+        snapshot = await probe.aget_state({"configurable": {"thread_id": thread_id}})
+        return results, snapshot
+
+    results, snapshot = asyncio.run(scenario())
+
+    assert probe.most == 1
+    assert len(results) == answers * duplicates
+    assert all(isinstance(result, dict) for result in results)
+    humans = [m.content for m in snapshot.values["messages"] if isinstance(m, HumanMessage)]
+    # answers recorded=10/10, duplicates recorded=0
+    assert sorted(humans[1:]) == sorted(f"answer {i}" for i in range(answers))
+    assert not thread_locks.locks
+
+
+def test_other_threads_run_alongside(probe):
+    async def scenario():
+        await asyncio.gather(*(chat.Chat(message="hello, lounge please", checkpoint_id=f"test-parallel-{i}").run() for i in range(4)))
+
+    asyncio.run(scenario())
+    assert probe.most > 1
@@ -0,0 +1,87 @@
+# tests/test_thread_reaper.py
+# LRU eviction leaves alone threads that another worker wrote to recently,
+# threads with a run queued or in flight, and threads seen again while the
+# eviction was underway.
+#
+#   python -m pytest tests/test_thread_reaper.py
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.services.thread_locks import thread_locks
+from src.services.thread_reaper import ThreadReaper
+
+
+async def write(saver: MemorySaver, thread_id: str, age: float):
+    config: RunnableConfig = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    checkpoint = empty_checkpoint()
+    checkpoint["ts"] = (datetime.now(timezone.utc) - timedelta(seconds=age)).isoformat()
+    await saver.aput(config, checkpoint, {}, {})
+
+
+def reaper_with(threads: list[str], max_threads: int) -> ThreadReaper:
+    """Threads seen and last written oldest first, 100s apart."""
+    saver = MemorySaver()
+    reaper = ThreadReaper(saver, ttl=3600, max_threads=max_threads)
+
+    async def setup():
+        for i, thread_id in enumerate(threads):
+            age = 100.0 * (len(threads) - i)
+            await write(saver, thread_id, age - 1)
+            reaper.last_seen[thread_id] = time.monotonic() - age
+
+    asyncio.run(setup())
+    return reaper
+
+
+def test_lru_evicts_the_oldest_idle_thread():
+    reaper = reaper_with(["a", "b"], max_threads=2)
+    asyncio.run(reaper.touch("c"))
+    assert list(reaper.last_seen) == ["b", "c"]
+    assert reaper.evictions["lru"] == 1
+    assert "a" not in reaper.checkpointer.storage
+
+
+def test_lru_keeps_a_thread_written_since_it_was_last_seen():
+    reaper = reaper_with(["a", "b"], max_threads=2)
+
+    async def scenario():
+        # a was last seen here before b, but another worker wrote to it since
+        await write(reaper.checkpointer, "a", 10)
+        await reaper.touch("c")
+
+    asyncio.run(scenario())
+    assert "a" in reaper.checkpointer.storage
+    assert reaper.evictions["lru"] == 0
+    assert list(reaper.last_seen) == ["b", "c", "a"]
+
+
+def test_lru_skips_a_busy_thread():
+    reaper = reaper_with(["a"], max_threads=1)
+
+    async def scenario():
+        async with thread_locks.hold("a"):
+            await reaper.evict_lru(1)
+        assert "a" in reaper.checkpointer.storage
+        await reaper.evict_lru(1)
+        assert "a" not in reaper.checkpointer.storage
+
+    asyncio.run(scenario())
+
+
+def test_evict_skips_a_thread_seen_again():
+    reaper = reaper_with(["a", "b"], max_threads=10)
+
+    async def scenario():
+        picked = dict(reaper.last_seen)
+        reaper.last_seen["a"] = time.monotonic()
+        await reaper.evict(picked, reason="ttl")
+
+    asyncio.run(scenario())
+    assert "a" in reaper.checkpointer.storage
+    assert "b" not in reaper.checkpointer.storage
+    assert reaper.evictions["ttl"] == 1